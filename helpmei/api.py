@@ -0,0 +1,307 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+import tornado.web
+from helpmei.armazenamento import CAMINHO_BANCO, BancoLivros, DiarioSQLite
+from helpmei.importacao import importar_tarde
+from helpmei.indicadores import INDICADORES, medias_anuais
+from helpmei.metricas import REGISTRO, medir
+from helpmei.plano_contas import CONTAS
+from helpmei.publicacao import INDICADORES_PUBLICADOS
+from helpmei.relatorios import gerar_demonstracoes
+
+# API somente leitura para as ferramentas internas: os mesmos indicadores do
+# Painel e os agregados dos livros da Calculadora, em JSON ou Arrow, com ETag,
+# filtros por período e gzip. python -m helpmei.api --porta 8600
+
+pa = importar_tarde("pyarrow")
+
+PORTA = int(os.environ.get("HELPMEI_API_PORTA", "8600"))
+
+# Livros: a URL leva só o id numérico, nunca o nome (o e-mail de quem fez login),
+# e cada pedido traz "Authorization: Bearer <chave>", o HMAC do id com o segredo
+# do servidor. Sem segredo configurado, as rotas de livros ficam desligadas.
+SEGREDO = os.environ.get("HELPMEI_API_SEGREDO", "")
+
+# Respostas prontas guardadas por (versão dos dados, consulta, formato)
+MAX_RESPOSTAS = 256
+
+TIPO_JSON = "application/json; charset=UTF-8"
+TIPO_ARROW = "application/vnd.apache.arrow.stream"
+
+
+class Respostas:
+    # LRU pequeno de corpos já serializados
+
+    def __init__(self, maximo=MAX_RESPOSTAS):
+        self.maximo = maximo
+        self._trava = threading.Lock()
+        self._itens = OrderedDict()
+
+    def obter(self, chave, gerar):
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                return self._itens[chave]
+        corpo = gerar()
+        with self._trava:
+            self._itens[chave] = corpo
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+        return corpo
+
+
+def serializar(df, formato):
+    if formato == "arrow":
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        saida = pa.BufferOutputStream()
+        with pa.ipc.new_stream(saida, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        return saida.getvalue().to_pybytes()
+    return df.to_json(orient="records", date_format="iso", date_unit="s", force_ascii=False).encode()
+
+
+class GzipComArrow(tornado.web.GZipContentEncoding):
+    # O gzip do tornado só comprime texto e JSON; o Arrow também comprime bem
+    CONTENT_TYPES = tornado.web.GZipContentEncoding.CONTENT_TYPES | {TIPO_ARROW}
+
+
+def chave_livro(livro_id, segredo=SEGREDO):
+    return hmac.new(segredo.encode(), f"livro:{int(livro_id)}".encode(), hashlib.sha256).hexdigest()
+
+
+class Base(tornado.web.RequestHandler):
+    def initialize(self, indicadores, banco, respostas, segredo):
+        self.indicadores = indicadores
+        self.banco = banco
+        self.respostas = respostas
+        self.segredo = segredo
+
+    def compute_etag(self):
+        # A ETag vem da versão dos dados (responder), não de um hash do corpo
+        return None
+
+    def formato(self):
+        formato = self.get_query_argument("formato", None)
+        if formato is None:
+            formato = "arrow" if TIPO_ARROW in self.request.headers.get("Accept", "") else "json"
+        if formato not in ("json", "arrow"):
+            raise tornado.web.HTTPError(400, reason="formato deve ser json ou arrow")
+        return formato
+
+    def data(self, nome):
+        valor = self.get_query_argument(nome, None)
+        # ?ate= vazio vale como ausente (pd.Timestamp("") seria NaT)
+        if not valor:
+            return None
+        try:
+            return pd.Timestamp(valor)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason=f"{nome} inválido: use AAAA-MM-DD") from None
+
+    async def responder(self, versao, gerar):
+        # ETag = versão dos dados + consulta + formato; sem mudança, 304 sem gerar o corpo
+        formato = self.formato()
+        consulta = (self.request.path, tuple(sorted(
+            (chave, tuple(valores)) for chave, valores in self.request.query_arguments.items()
+        )), formato)
+        self.set_header("ETag", '"%s"' % hashlib.sha256(repr((versao, consulta)).encode()).hexdigest()[:32])
+        self.set_header("Cache-Control", "no-cache")
+        self.set_header("Vary", "Accept")
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        with medir("api", rota=self.rota):
+            corpo = await asyncio.get_running_loop().run_in_executor(
+                None, self.respostas.obter, (versao, consulta), lambda: serializar(gerar(), formato)
+            )
+        self.set_header("Content-Type", TIPO_ARROW if formato == "arrow" else TIPO_JSON)
+        self.write(corpo)
+
+    async def em_segundo_plano(self, funcao, *argumentos):
+        # SQLite e leitura de arquivos fora do loop do tornado
+        return await asyncio.get_running_loop().run_in_executor(None, funcao, *argumentos)
+
+    async def carregar_indicadores(self):
+        return await self.em_segundo_plano(self.indicadores.obter)
+
+    def write_error(self, status_code, **kwargs):
+        self.set_header("Content-Type", TIPO_JSON)
+        self.finish(json.dumps({"erro": self._reason, "status": status_code}, ensure_ascii=False))
+
+
+class Indicadores(Base):
+    # GET /indicadores?inicio=2020-01-01&fim=2024-12-31&colunas=SELIC,IPCA
+    rota = "indicadores"
+
+    async def get(self):
+        df, versao = await self.carregar_indicadores()
+        inicio, fim = self.data("inicio"), self.data("fim")
+        colunas = self.colunas()
+
+        def gerar():
+            mascara = pd.Series(True, index=df.index)
+            if inicio is not None:
+                mascara &= df["Date"] >= inicio
+            if fim is not None:
+                mascara &= df["Date"] <= fim
+            return df.loc[mascara, ["Date"] + colunas]
+
+        await self.responder(versao, gerar)
+
+    def colunas(self):
+        pedidas = self.get_query_argument("colunas", None)
+        colunas = INDICADORES if pedidas is None else pedidas.split(",")
+        desconhecidas = set(colunas) - set(INDICADORES)
+        if desconhecidas:
+            raise tornado.web.HTTPError(400, reason=f"indicadores desconhecidos: {', '.join(sorted(desconhecidas))}")
+        return colunas
+
+
+class IndicadoresAnuais(Indicadores):
+    # GET /indicadores/anual?inicio=2010-01-01&fim=2020-12-31: médias anuais, como no Painel
+    rota = "indicadores_anual"
+
+    async def get(self):
+        df, versao = await self.carregar_indicadores()
+        inicio, fim = self.data("inicio"), self.data("fim")
+        colunas = self.colunas()
+
+        def gerar():
+            anos = df["Ano"]
+            mascara = pd.Series(True, index=df.index)
+            if inicio is not None:
+                mascara &= anos >= inicio.year
+            if fim is not None:
+                mascara &= anos <= fim.year
+            return medias_anuais(df[mascara], colunas)
+
+        await self.responder(versao, gerar)
+
+
+class Livro(Base):
+    def autorizar(self, livro_id):
+        # A chave é conferida antes de olhar o banco: sem ela, não se descobre nem se o livro existe
+        if not self.segredo:
+            raise tornado.web.HTTPError(403, reason="rotas de livros desligadas: defina HELPMEI_API_SEGREDO")
+        esperado = f"Bearer {chave_livro(livro_id, self.segredo)}"
+        if not hmac.compare_digest(self.request.headers.get("Authorization", "").encode(), esperado.encode()):
+            self.set_header("WWW-Authenticate", 'Bearer realm="helpmei"')
+            raise tornado.web.HTTPError(401, reason="chave do livro ausente ou inválida")
+
+    def _abrir(self, livro_id):
+        linha = self.banco.conexao().execute("SELECT id FROM livros WHERE id = ?", (livro_id,)).fetchone()
+        if linha is None:
+            return None, None
+        diario = DiarioSQLite(self.banco, livro_id)
+        return diario, diario.versao
+
+    async def diario(self, livro_id):
+        # Devolve (diário, versão), com a consulta ao banco no executor
+        self.autorizar(livro_id)
+        diario, versao = await self.em_segundo_plano(self._abrir, int(livro_id))
+        if diario is None:
+            raise tornado.web.HTTPError(404, reason="livro não encontrado")
+        return diario, versao
+
+
+class Saldos(Livro):
+    # GET /livros/<id>/saldos?ate=2025-06-30
+    rota = "saldos"
+
+    async def get(self, livro_id):
+        diario, versao = await self.diario(livro_id)
+        ate = self.data("ate")
+
+        def gerar():
+            saldos = diario.saldos(ate=ate)
+            saldos = saldos[saldos != 0]
+            return pd.DataFrame({
+                "conta": saldos.index,
+                "descricao": [CONTAS.get(codigo, "") for codigo in saldos.index],
+                "saldo": saldos.to_numpy(),
+            })
+
+        await self.responder((diario.id, versao), gerar)
+
+
+class Demonstracoes(Livro):
+    # GET /livros/<id>/demonstracoes/<dre|fluxo_caixa|balanco>?inicio=...&fim=...
+    rota = "demonstracoes"
+
+    async def get(self, livro_id, demonstracao):
+        diario, versao = await self.diario(livro_id)
+        inicio, fim = self.data("inicio"), self.data("fim")
+
+        def gerar():
+            resultado = gerar_demonstracoes(diario, inicio, fim)[demonstracao]
+            if demonstracao == "balanco":
+                return pd.DataFrame({"Linha": list(resultado), "Valor": list(resultado.values())})
+            return resultado
+
+        await self.responder((diario.id, versao), gerar)
+
+
+class Saude(tornado.web.RequestHandler):
+    def get(self):
+        self.write({"status": "ok"})
+
+
+class Metricas(tornado.web.RequestHandler):
+    # Exposição Prometheus dos trechos medidos neste processo
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.write(REGISTRO.prometheus())
+
+
+def criar_app(indicadores=None, banco=None, segredo=None):
+    dependencias = {
+        "indicadores": indicadores or INDICADORES_PUBLICADOS,
+        "banco": banco or BancoLivros(CAMINHO_BANCO),
+        "respostas": Respostas(),
+        "segredo": SEGREDO if segredo is None else segredo,
+    }
+    return tornado.web.Application(
+        [
+            (r"/indicadores", Indicadores, dependencias),
+            (r"/indicadores/anual", IndicadoresAnuais, dependencias),
+            (r"/livros/(\d+)/saldos", Saldos, dependencias),
+            (r"/livros/(\d+)/demonstracoes/(dre|fluxo_caixa|balanco)", Demonstracoes, dependencias),
+            (r"/saude", Saude),
+            (r"/metricas", Metricas),
+        ],
+        transforms=[GzipComArrow],
+    )
+
+
+async def servir(porta, endereco):
+    app = criar_app()
+    app.listen(porta, address=endereco, xheaders=True)
+    print(f"API do Help MEI em http://{endereco}:{porta}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m helpmei.api", description="API somente leitura do Help MEI.")
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--endereco", default="127.0.0.1")
+    parser.add_argument("--chave", metavar="LIVRO",
+                        help="mostra o id e a chave de acesso de um livro (código da URL ou usuario:<e-mail>) e sai")
+    opcoes = parser.parse_args()
+    if opcoes.chave:
+        if not SEGREDO:
+            parser.error("defina HELPMEI_API_SEGREDO para gerar chaves")
+        linha = BancoLivros(CAMINHO_BANCO).conexao().execute(
+            "SELECT id FROM livros WHERE nome = ?", (opcoes.chave,)
+        ).fetchone()
+        if linha is None:
+            parser.error("livro não encontrado")
+        print(f"GET /livros/{linha[0]}/... com Authorization: Bearer {chave_livro(linha[0])}")
+    else:
+        asyncio.run(servir(opcoes.porta, opcoes.endereco))
@@ -0,0 +1,693 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import streamlit as st
+from helpmei.diario import (
+    SEPARADOR_CONTAS,
+    saldos_ate,
+    validar_fechamento,
+    validar_lote,
+    verificar_periodo_aberto,
+)
+
+# Arquivo SQLite com os livros de todos os usuários
+CAMINHO_BANCO = os.environ.get("HELPMEI_BANCO", os.path.join("dados", "livros.db"))
+
+# Cada item leva o banco da versão anterior para a seguinte (PRAGMA user_version)
+MIGRACOES = [
+    """
+    CREATE TABLE IF NOT EXISTS livros (
+        id INTEGER PRIMARY KEY,
+        nome TEXT NOT NULL UNIQUE,
+        versao INTEGER NOT NULL DEFAULT 0,
+        criado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS lancamentos (
+        id INTEGER PRIMARY KEY,
+        livro_id INTEGER NOT NULL REFERENCES livros(id) ON DELETE CASCADE,
+        data TEXT NOT NULL,
+        debito TEXT NOT NULL,
+        credito TEXT NOT NULL,
+        valor REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ix_lancamentos_data ON lancamentos(livro_id, data);
+    CREATE INDEX IF NOT EXISTS ix_lancamentos_debito ON lancamentos(livro_id, debito, data);
+    CREATE INDEX IF NOT EXISTS ix_lancamentos_credito ON lancamentos(livro_id, credito, data);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fechamentos (
+        livro_id INTEGER NOT NULL REFERENCES livros(id) ON DELETE CASCADE,
+        fim TEXT NOT NULL,
+        fechado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (livro_id, fim)
+    );
+    CREATE TABLE IF NOT EXISTS saldos_fechamento (
+        livro_id INTEGER NOT NULL,
+        fim TEXT NOT NULL,
+        conta TEXT NOT NULL,
+        saldo REAL NOT NULL,
+        PRIMARY KEY (livro_id, fim, conta),
+        FOREIGN KEY (livro_id, fim) REFERENCES fechamentos(livro_id, fim) ON DELETE CASCADE
+    );
+    """,
+    # Lançamentos compostos: o cabeçalho fica em `lancamentos` e cada débito
+    # ou crédito vira uma partida (valor positivo = débito, negativo = crédito).
+    # Livro e data são repetidos na partida para os agregados usarem só o índice.
+    """
+    CREATE TABLE partidas (
+        id INTEGER PRIMARY KEY,
+        lancamento_id INTEGER NOT NULL REFERENCES lancamentos(id) ON DELETE CASCADE,
+        livro_id INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        conta TEXT NOT NULL,
+        valor REAL NOT NULL
+    );
+    INSERT INTO partidas (lancamento_id, livro_id, data, conta, valor)
+        SELECT id, livro_id, data, debito, valor FROM lancamentos;
+    INSERT INTO partidas (lancamento_id, livro_id, data, conta, valor)
+        SELECT id, livro_id, data, credito, -valor FROM lancamentos;
+    CREATE TABLE lancamentos_novos (
+        id INTEGER PRIMARY KEY,
+        livro_id INTEGER NOT NULL REFERENCES livros(id) ON DELETE CASCADE,
+        data TEXT NOT NULL,
+        historico TEXT NOT NULL DEFAULT '',
+        valor REAL NOT NULL
+    );
+    INSERT INTO lancamentos_novos (id, livro_id, data, valor)
+        SELECT id, livro_id, data, valor FROM lancamentos;
+    DROP TABLE lancamentos;
+    ALTER TABLE lancamentos_novos RENAME TO lancamentos;
+    CREATE INDEX ix_lancamentos_data ON lancamentos(livro_id, data);
+    CREATE INDEX ix_partidas_conta ON partidas(livro_id, conta, data);
+    CREATE INDEX ix_partidas_data ON partidas(livro_id, data);
+    CREATE INDEX ix_partidas_lancamento ON partidas(lancamento_id);
+    """,
+    # Cache local de indicadores: expectativas do Focus e o horário da última
+    # atualização de cada fonte externa
+    """
+    CREATE TABLE expectativas_focus (
+        indicador TEXT NOT NULL,
+        data TEXT NOT NULL,
+        ano_referencia INTEGER NOT NULL,
+        media REAL,
+        mediana REAL,
+        minimo REAL,
+        maximo REAL,
+        respondentes INTEGER,
+        PRIMARY KEY (indicador, ano_referencia, data)
+    );
+    CREATE TABLE atualizacoes (
+        fonte TEXT PRIMARY KEY,
+        atualizado_em TEXT NOT NULL
+    );
+    """,
+    # Registro só de inserções: cada ação do usuário é uma operação, e desfazer,
+    # refazer e limpar gravam estornos em vez de apagar lançamentos. Uma operação
+    # é revertida no máximo uma vez (índice único em `origem`). Lançamentos
+    # anteriores a esta migração ficam sem operação e fora do desfazer.
+    # Os instantâneos guardam os saldos logo depois de um lançamento do registro.
+    """
+    CREATE TABLE operacoes (
+        id INTEGER PRIMARY KEY,
+        livro_id INTEGER NOT NULL REFERENCES livros(id) ON DELETE CASCADE,
+        tipo TEXT NOT NULL CHECK (tipo IN ('lancamento', 'limpeza', 'desfazer', 'refazer')),
+        origem INTEGER REFERENCES operacoes(id),
+        criado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX ix_operacoes_livro ON operacoes(livro_id, tipo, id);
+    CREATE UNIQUE INDEX ix_operacoes_origem ON operacoes(origem);
+    ALTER TABLE lancamentos ADD COLUMN operacao_id INTEGER REFERENCES operacoes(id);
+    ALTER TABLE lancamentos ADD COLUMN estorno_de INTEGER REFERENCES lancamentos(id);
+    CREATE INDEX ix_lancamentos_operacao ON lancamentos(operacao_id);
+    CREATE INDEX ix_lancamentos_livro ON lancamentos(livro_id, id);
+    CREATE INDEX ix_partidas_livro_lancamento ON partidas(livro_id, lancamento_id);
+    CREATE TABLE instantaneos (
+        livro_id INTEGER NOT NULL REFERENCES livros(id) ON DELETE CASCADE,
+        ate_lancamento INTEGER NOT NULL,
+        conta TEXT NOT NULL,
+        saldo REAL NOT NULL,
+        PRIMARY KEY (livro_id, ate_lancamento, conta)
+    );
+    """,
+    # Carteira de um contador: os livros de clientes acompanhados na consolidação.
+    # O contador é identificado como o dono de um livro (e-mail ou código da URL).
+    # O índice em estorno_de evita varrer os lançamentos ao apagar um livro.
+    """
+    CREATE TABLE carteiras (
+        contador TEXT NOT NULL,
+        livro_id INTEGER NOT NULL REFERENCES livros(id) ON DELETE CASCADE,
+        incluido_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (contador, livro_id)
+    );
+    CREATE INDEX ix_carteiras_livro ON carteiras(livro_id);
+    CREATE INDEX ix_lancamentos_estorno ON lancamentos(estorno_de);
+    """,
+    # Livros de usuários autenticados passam a ter o prefixo "usuario:", fora do
+    # espaço dos códigos de URL; o dono de cada carteira acompanha a mudança
+    """
+    UPDATE livros SET nome = 'usuario:' || nome WHERE nome LIKE '%@%' AND nome NOT LIKE 'usuario:%';
+    UPDATE carteiras SET contador = 'usuario:' || contador
+        WHERE contador LIKE '%@%' AND contador NOT LIKE 'usuario:%';
+    """,
+]
+
+# Livro sem login: código hexadecimal de 32 caracteres no parâmetro ?livro= da URL
+CODIGO_LIVRO = re.compile(r"[0-9a-f]{32}")
+
+# Livro de usuário autenticado: prefixo + e-mail, que nunca casa com CODIGO_LIVRO
+PREFIXO_USUARIO = "usuario:"
+
+# Tentativas de ligar o WAL ao abrir uma conexão
+TENTATIVAS_WAL = 100
+
+# Lançamentos entre dois instantâneos de saldos: limita o que um restauro soma
+INTERVALO_INSTANTANEO = 1_000
+
+HISTORICO_LIMPEZA = "Limpeza do livro"
+
+# Colunas aceitas em ORDER BY, a partir dos nomes exibidos na tabela
+ORDENACAO = {"Lançamento": "id", "Data": "data", "Valor": "valor"}
+
+
+def _comandos(script):
+    # executescript faria COMMIT antes de começar: os comandos vão um a um na transação aberta
+    comando = ""
+    for linha in script.splitlines(keepends=True):
+        comando += linha
+        if sqlite3.complete_statement(comando):
+            yield comando.strip()
+            comando = ""
+
+
+def _texto_data(data):
+    return pd.Timestamp(data).strftime("%Y-%m-%d")
+
+
+class BancoLivros:
+    # Banco SQLite em modo WAL: leitores não bloqueiam o escritor, e cada
+    # thread de sessão do Streamlit usa a sua própria conexão.
+
+    def __init__(self, caminho=CAMINHO_BANCO):
+        self.caminho = caminho
+        self._local = threading.local()
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self._migrar(self.conexao())
+
+    def conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=5.0, cached_statements=256)
+            # Num banco ainda sem WAL aberto por várias conexões ao mesmo tempo, a troca do
+            # modo pode falhar com "database is locked" sem esperar o timeout: tenta de novo
+            for tentativa in range(TENTATIVAS_WAL):
+                try:
+                    conexao.execute("PRAGMA journal_mode=WAL")
+                    break
+                except sqlite3.OperationalError:
+                    if tentativa == TENTATIVAS_WAL - 1:
+                        raise
+                    time.sleep(0.05)
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.execute("PRAGMA foreign_keys=ON")
+            self._local.conexao = conexao
+        return conexao
+
+    @contextmanager
+    def transacao(self):
+        # BEGIN IMMEDIATE reserva a escrita já na leitura dos ids, evitando corrida entre sessões
+        conexao = self.conexao()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            yield conexao
+        except BaseException:
+            conexao.rollback()
+            raise
+        conexao.commit()
+
+    def _migrar(self, conexao):
+        if conexao.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRACOES):
+            return
+        # Tabelas são recriadas nas migrações; sem isso o DROP apagaria as partidas em
+        # cascata. O pragma não muda dentro de uma transação, por isso vem antes do BEGIN.
+        conexao.execute("PRAGMA foreign_keys=OFF")
+        try:
+            # Dois processos abrindo um banco antigo ao mesmo tempo: o segundo espera a
+            # trava de escrita e relê a versão já migrada pelo primeiro
+            with self.transacao():
+                versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+                for numero in range(versao, len(MIGRACOES)):
+                    for comando in _comandos(MIGRACOES[numero]):
+                        conexao.execute(comando)
+                if versao < len(MIGRACOES):
+                    conexao.execute(f"PRAGMA user_version={len(MIGRACOES)}")
+        finally:
+            conexao.execute("PRAGMA foreign_keys=ON")
+
+    def livro_id(self, nome):
+        conexao = self.conexao()
+        with conexao:
+            conexao.execute("INSERT OR IGNORE INTO livros (nome) VALUES (?)", (nome,))
+        return conexao.execute("SELECT id FROM livros WHERE nome = ?", (nome,)).fetchone()[0]
+
+    def diario(self, nome):
+        return DiarioSQLite(self, self.livro_id(nome))
+
+    def diario_existente(self, nome):
+        # Só abre: None se o livro ainda não foi criado
+        linha = self.conexao().execute("SELECT id FROM livros WHERE nome = ?", (nome,)).fetchone()
+        return None if linha is None else DiarioSQLite(self, linha[0])
+
+    def apagar_livro(self, nome):
+        # Remove o livro com todo o registro; só para ferramentas (bancada, testes de carga)
+        with self.transacao() as conexao:
+            conexao.execute("DELETE FROM livros WHERE nome = ?", (nome,))
+
+
+class DiarioSQLite:
+    # Mesma interface do `Diario` em memória, mas com os lançamentos no banco.
+    # A sessão guarda apenas os agregados da versão atual do livro.
+
+    def __init__(self, banco, livro_id):
+        self.banco = banco
+        self.livro_id = livro_id
+        self.id = f"{banco.caminho}#{livro_id}"
+        self._cache = {}
+        self._versao_cache = None
+
+    @property
+    def versao(self):
+        return self._consultar_um("SELECT versao FROM livros WHERE id = ?", (self.livro_id,))
+
+    def __len__(self):
+        return self._memorizar("tamanho", lambda: self._consultar_um(
+            "SELECT COUNT(*) FROM lancamentos WHERE livro_id = ?", (self.livro_id,)
+        ))
+
+    def _consultar_um(self, sql, parametros):
+        return self.banco.conexao().execute(sql, parametros).fetchone()[0]
+
+    def _ler(self, sql, parametros):
+        return pd.read_sql_query(sql, self.banco.conexao(), params=parametros)
+
+    def _memorizar(self, chave, funcao):
+        versao = self.versao
+        if versao != self._versao_cache:
+            self._cache = {}
+            self._versao_cache = versao
+        if chave not in self._cache:
+            self._cache[chave] = funcao()
+        return self._cache[chave]
+
+    def _nova_versao(self, conexao):
+        conexao.execute("UPDATE livros SET versao = versao + 1 WHERE id = ?", (self.livro_id,))
+
+    def lancar(self, data, debito, credito, valor, historico=""):
+        self.lancar_lote([(data, [(debito, valor), (credito, -valor)], historico)])
+
+    def lancar_composto(self, data, debitos, creditos, historico=""):
+        partidas = [(conta, valor) for conta, valor in debitos] + [(conta, -valor) for conta, valor in creditos]
+        self.lancar_lote([(data, partidas, historico)])
+
+    def lancar_lote(self, lancamentos):
+        # Lote validado de uma vez e gravado numa única transação, com INSERTs preparados
+        datas, historicos, indices, contas, valores = validar_lote(lancamentos)
+        with self.banco.transacao() as conexao:
+            # Conferido já com a trava de escrita, como em _reverter: um fechamento de
+            # outra sessão não entra entre a conferência e a gravação
+            verificar_periodo_aberto(self, datas)
+            operacao = self._nova_operacao(conexao, "lancamento")
+            self._gravar(conexao, operacao, datas, historicos, indices, contas, valores)
+        self._instantanear()
+
+    def _nova_operacao(self, conexao, tipo, origem=None):
+        return conexao.execute(
+            "INSERT INTO operacoes (livro_id, tipo, origem) VALUES (?, ?, ?)", (self.livro_id, tipo, origem)
+        ).lastrowid
+
+    def _gravar(self, conexao, operacao, datas, historicos, indices, contas, valores, estornos=None):
+        textos = [_texto_data(data) for data in datas]
+        totais = np.bincount(indices, weights=np.clip(valores, 0, None), minlength=len(datas))
+        estornos = estornos or [None] * len(datas)
+        primeiro = conexao.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM lancamentos").fetchone()[0]
+        conexao.executemany(
+            "INSERT INTO lancamentos (id, livro_id, data, historico, valor, operacao_id, estorno_de) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (primeiro + posicao, self.livro_id, textos[posicao], historicos[posicao], total,
+                 operacao, estornos[posicao])
+                for posicao, total in enumerate(totais.tolist())
+            ),
+        )
+        conexao.executemany(
+            "INSERT INTO partidas (lancamento_id, livro_id, data, conta, valor) VALUES (?, ?, ?, ?, ?)",
+            (
+                (primeiro + posicao, self.livro_id, textos[posicao], conta, valor)
+                for posicao, conta, valor in zip(indices.tolist(), contas, valores.tolist())
+            ),
+        )
+        self._nova_versao(conexao)
+
+    def limpar(self):
+        # Zera o livro com um estorno por data (o saldo de cada conta naquele dia com o
+        # sinal trocado): relatórios de qualquer período ficam vazios e o desfazer traz
+        # tudo de volta. Os fechamentos são removidos e não voltam com o desfazer.
+        with self.banco.transacao() as conexao:
+            conexao.execute("DELETE FROM fechamentos WHERE livro_id = ?", (self.livro_id,))
+            movimento = pd.read_sql_query(
+                "SELECT data, conta, SUM(valor) AS valor FROM partidas WHERE livro_id = ? "
+                "GROUP BY data, conta ORDER BY data, conta",
+                conexao, params=(self.livro_id,),
+            )
+            movimento = movimento[movimento["valor"].round(2) != 0]
+            if movimento.empty:
+                self._nova_versao(conexao)
+                return None
+            codigos, datas = pd.factorize(movimento["data"])
+            operacao = self._nova_operacao(conexao, "limpeza")
+            self._gravar(
+                conexao, operacao, list(datas), [HISTORICO_LIMPEZA] * len(datas), codigos.astype(np.int64),
+                movimento["conta"].tolist(), np.round(-movimento["valor"].to_numpy(), 2),
+            )
+        self._instantanear()
+        return operacao
+
+    # Desfazer e refazer. Em vigor = não revertida por outra operação. Desfazer reverte
+    # a última operação em vigor que não seja um desfazer; refazer reverte o último
+    # desfazer em vigor, desde que nenhum lançamento ou limpeza tenha vindo depois.
+    _SQL_DESFAZER = """
+        SELECT id FROM operacoes o
+        WHERE livro_id = ? AND tipo != 'desfazer'
+          AND NOT EXISTS (SELECT 1 FROM operacoes r WHERE r.origem = o.id)
+        ORDER BY id DESC LIMIT 1
+    """
+    _SQL_REFAZER = """
+        SELECT id FROM operacoes o
+        WHERE livro_id = ? AND tipo = 'desfazer'
+          AND id > (SELECT COALESCE(MAX(id), 0) FROM operacoes
+                    WHERE livro_id = o.livro_id AND tipo IN ('lancamento', 'limpeza'))
+          AND NOT EXISTS (SELECT 1 FROM operacoes r WHERE r.origem = o.id)
+        ORDER BY id DESC LIMIT 1
+    """
+
+    def pode_desfazer(self):
+        return self._memorizar("pode_desfazer", lambda: bool(
+            self.banco.conexao().execute(self._SQL_DESFAZER, (self.livro_id,)).fetchone()
+        ))
+
+    def pode_refazer(self):
+        return self._memorizar("pode_refazer", lambda: bool(
+            self.banco.conexao().execute(self._SQL_REFAZER, (self.livro_id,)).fetchone()
+        ))
+
+    def desfazer(self):
+        # Devolve a operação de estorno gravada, ou None se não há o que desfazer
+        return self._reverter(self._SQL_DESFAZER, "desfazer")
+
+    def refazer(self):
+        return self._reverter(self._SQL_REFAZER, "refazer")
+
+    def _reverter(self, sql_alvo, tipo):
+        # Estorna cada lançamento da operação alvo com a mesma data e os valores com o
+        # sinal trocado. No refazer, o estorno de um estorno leva o histórico original.
+        with self.banco.transacao() as conexao:
+            alvo = conexao.execute(sql_alvo, (self.livro_id,)).fetchone()
+            if alvo is None:
+                return None
+            partidas = pd.read_sql_query(
+                """
+                SELECT p.lancamento_id, l.data, l.historico, e.historico AS historico_estornado, p.conta, p.valor
+                FROM lancamentos l
+                JOIN partidas p ON p.lancamento_id = l.id
+                LEFT JOIN lancamentos e ON e.id = l.estorno_de
+                WHERE l.operacao_id = ?
+                ORDER BY l.id, p.id
+                """,
+                conexao, params=(alvo[0],),
+            )
+            codigos, estornados = pd.factorize(partidas["lancamento_id"])
+            primeiros = partidas.drop_duplicates("lancamento_id")
+            datas = primeiros["data"].tolist()
+            verificar_periodo_aberto(self, datas)
+            if tipo == "refazer":
+                historicos = primeiros["historico_estornado"].fillna(primeiros["historico"]).tolist()
+            else:
+                historicos = [f"Estorno do lançamento {numero}" for numero in estornados.tolist()]
+            operacao = self._nova_operacao(conexao, tipo, alvo[0])
+            self._gravar(
+                conexao, operacao, datas, historicos, codigos.astype(np.int64), partidas["conta"].tolist(),
+                -partidas["valor"].to_numpy(dtype="float64"), estornados.tolist(),
+            )
+        self._instantanear()
+        return operacao
+
+    def _instantanear(self):
+        # A cada INTERVALO_INSTANTANEO lançamentos, grava os saldos do fim do registro.
+        # O registro só cresce, então um instantâneo nunca precisa ser refeito.
+        conexao = self.banco.conexao()
+        base = self._consultar_um(
+            "SELECT COALESCE(MAX(ate_lancamento), 0) FROM instantaneos WHERE livro_id = ?", (self.livro_id,)
+        )
+        ultimo, novos = conexao.execute(
+            "SELECT MAX(id), COUNT(*) FROM lancamentos WHERE livro_id = ? AND id > ?", (self.livro_id, base)
+        ).fetchone()
+        if novos < INTERVALO_INSTANTANEO:
+            return
+        saldos = self.saldos_em(ultimo)
+        with self.banco.transacao() as conexao:
+            conexao.executemany(
+                "INSERT OR IGNORE INTO instantaneos (livro_id, ate_lancamento, conta, saldo) VALUES (?, ?, ?, ?)",
+                [(self.livro_id, ultimo, conta, float(saldo)) for conta, saldo in saldos.items()],
+            )
+
+    def _formatar(self, df):
+        df = df.rename(columns={"id": "Lançamento", "data": "Data", "historico": "Histórico",
+                                "debito": "Débito", "credito": "Crédito", "valor": "Valor"})
+        df["Data"] = pd.to_datetime(df["Data"], format="%Y-%m-%d")
+        return df.set_index("Lançamento")
+
+    # Contas de cada lado do lançamento, calculadas só para as linhas lidas
+    _SELECT_LANCAMENTOS = f"""
+        SELECT l.id, l.data, l.historico,
+            (SELECT group_concat(conta, '{SEPARADOR_CONTAS}') FROM partidas
+             WHERE lancamento_id = l.id AND valor > 0) AS debito,
+            (SELECT group_concat(conta, '{SEPARADOR_CONTAS}') FROM partidas
+             WHERE lancamento_id = l.id AND valor < 0) AS credito,
+            l.valor
+        FROM lancamentos l
+    """
+
+    def frame(self):
+        return self._memorizar("frame", lambda: self._formatar(self._ler(
+            self._SELECT_LANCAMENTOS + " WHERE l.livro_id = ? ORDER BY l.id",
+            (self.livro_id,),
+        )))
+
+    def partidas(self):
+        def ler():
+            df = self._ler(
+                'SELECT lancamento_id AS "Lançamento", data AS Data, conta AS Conta, valor AS Valor '
+                "FROM partidas WHERE livro_id = ? ORDER BY id",
+                (self.livro_id,),
+            )
+            df["Data"] = pd.to_datetime(df["Data"], format="%Y-%m-%d")
+            return df
+        return self._memorizar("partidas", ler)
+
+    def totais_entre(self, depois_de=None, ate=None):
+        # Débitos e créditos por conta com depois_de < data <= ate, pelo índice (livro, data)
+        def calcular():
+            df = self._ler(
+                """
+                SELECT conta,
+                       SUM(MAX(valor, 0)) AS "Débitos", SUM(MAX(-valor, 0)) AS "Créditos"
+                FROM partidas WHERE livro_id = ? AND data > ? AND data <= ?
+                GROUP BY conta
+                """,
+                (
+                    self.livro_id,
+                    "" if depois_de is None else _texto_data(depois_de),
+                    "9999-12-31" if ate is None else _texto_data(ate),
+                ),
+            )
+            return df.set_index("conta").astype("float64")
+        return self._memorizar(("totais", depois_de, ate), calcular)
+
+    def periodos_fechados(self):
+        return self._memorizar("fechamentos", lambda: [
+            pd.Timestamp(fim) for (fim,) in self.banco.conexao().execute(
+                "SELECT fim FROM fechamentos WHERE livro_id = ? ORDER BY fim", (self.livro_id,)
+            )
+        ])
+
+    def saldos_fechamento(self, fim):
+        def ler():
+            df = self._ler(
+                "SELECT conta, saldo FROM saldos_fechamento WHERE livro_id = ? AND fim = ?",
+                (self.livro_id, _texto_data(fim)),
+            )
+            return df.set_index("conta")["saldo"].astype("float64")
+        return self._memorizar(("fechamento", fim), ler)
+
+    def saldos_em(self, lancamento=None):
+        # Saldos logo depois de um lançamento do registro (no fim dele, se None): parte
+        # do instantâneo mais próximo e soma só as partidas gravadas depois dele
+        def calcular():
+            limite = lancamento if lancamento is not None else np.iinfo(np.int64).max
+            conexao = self.banco.conexao()
+            base_id = conexao.execute(
+                "SELECT MAX(ate_lancamento) FROM instantaneos WHERE livro_id = ? AND ate_lancamento <= ?",
+                (self.livro_id, limite),
+            ).fetchone()[0] or 0
+            base = self._ler(
+                "SELECT conta, saldo FROM instantaneos WHERE livro_id = ? AND ate_lancamento = ?",
+                (self.livro_id, base_id),
+            ).set_index("conta")["saldo"]
+            cauda = self._ler(
+                "SELECT conta, SUM(valor) AS valor FROM partidas "
+                "WHERE livro_id = ? AND lancamento_id > ? AND lancamento_id <= ? GROUP BY conta",
+                (self.livro_id, base_id, limite),
+            ).set_index("conta")["valor"]
+            return base.add(cauda, fill_value=0.0).astype("float64").round(2).rename("Valor")
+        return self._memorizar(("saldos_em", lancamento), calcular)
+
+    def _datas_extremas(self):
+        return self._memorizar("datas_extremas", lambda: self.banco.conexao().execute(
+            "SELECT MIN(data), MAX(data) FROM partidas WHERE livro_id = ?", (self.livro_id,)
+        ).fetchone())
+
+    def _tem_instantaneo(self):
+        return self._memorizar("tem_instantaneo", lambda: self.banco.conexao().execute(
+            "SELECT 1 FROM instantaneos WHERE livro_id = ? LIMIT 1", (self.livro_id,)
+        ).fetchone() is not None)
+
+    def saldos(self, ate=None):
+        # Sem fechamento antes de `ate` e com a data mais perto do fim do livro que do
+        # começo, sai mais barato partir dos saldos atuais (instantâneo + cauda) e tirar
+        # o movimento com data posterior a `ate` do que somar tudo até ela
+        def calcular():
+            if ate is None:
+                return self.saldos_em()
+            limite = pd.Timestamp(ate).normalize()
+            primeira, ultima = self._datas_extremas()
+            if (
+                primeira is None
+                or not self._tem_instantaneo()
+                or any(fim <= limite for fim in self.periodos_fechados())
+                or limite - pd.Timestamp(primeira) < pd.Timestamp(ultima) - limite
+            ):
+                return saldos_ate(self, ate)
+            depois = self.totais_entre(limite, None)
+            return self.saldos_em().sub(depois["Débitos"] - depois["Créditos"], fill_value=0.0).round(2).rename("Valor")
+        return self._memorizar(("saldos", ate), calcular)
+
+    def fechar_periodo(self, fim):
+        # Guarda os saldos de encerramento; relatórios posteriores partem deles
+        fim = validar_fechamento(self, fim)
+        saldos = self.saldos(ate=fim)
+        texto_fim = _texto_data(fim)
+        with self.banco.transacao() as conexao:
+            conexao.execute("INSERT INTO fechamentos (livro_id, fim) VALUES (?, ?)", (self.livro_id, texto_fim))
+            conexao.executemany(
+                "INSERT INTO saldos_fechamento (livro_id, fim, conta, saldo) VALUES (?, ?, ?, ?)",
+                [(self.livro_id, texto_fim, conta, float(saldo)) for conta, saldo in saldos.items()],
+            )
+            self._nova_versao(conexao)
+
+    def reabrir_periodo(self):
+        with self.banco.transacao() as conexao:
+            conexao.execute(
+                "DELETE FROM fechamentos WHERE livro_id = ? AND fim = "
+                "(SELECT MAX(fim) FROM fechamentos WHERE livro_id = ?)",
+                (self.livro_id, self.livro_id),
+            )
+            self._nova_versao(conexao)
+
+    def resumo_contas(self):
+        def calcular():
+            df = self._ler(
+                """
+                SELECT conta,
+                       SUM(MAX(valor, 0)) AS "Débitos", SUM(MAX(-valor, 0)) AS "Créditos",
+                       SUM(valor > 0) AS "Qtd D", SUM(valor < 0) AS "Qtd C"
+                FROM partidas WHERE livro_id = ?
+                GROUP BY conta ORDER BY conta
+                """,
+                (self.livro_id,),
+            )
+            resumo = df.set_index("conta")
+            resumo.index.name = "Código"
+            return resumo
+        return self._memorizar("resumo", calcular)
+
+    def movimentos(self, conta, inicio=0, fim=None):
+        # Só a janela pedida sai do banco, pelo índice (livro, conta, data)
+        def ler():
+            limite = -1 if fim is None else fim - inicio
+            lados = {}
+            for lado, sinal in (('débito', 1), ('crédito', -1)):
+                df = self._ler(
+                    "SELECT data AS Data, ? * valor AS Valor FROM partidas "
+                    "WHERE livro_id = ? AND conta = ? AND ? * valor > 0 ORDER BY id LIMIT ? OFFSET ?",
+                    (sinal, self.livro_id, conta, sinal, limite, inicio),
+                )
+                df["Data"] = pd.to_datetime(df["Data"], format="%Y-%m-%d")
+                lados[lado] = df
+            return lados
+        return self._memorizar(("movimentos", conta, inicio, fim), ler)
+
+    def consultar(self, ordenar_por="Lançamento", crescente=True, conta=None,
+                  inicio=None, fim=None, pagina=0, tamanho=50):
+        condicoes = ["l.livro_id = ?"]
+        parametros = [self.livro_id]
+        if conta:
+            condicoes.append("l.id IN (SELECT lancamento_id FROM partidas WHERE livro_id = ? AND conta = ?)")
+            parametros += [self.livro_id, conta]
+        if inicio is not None:
+            condicoes.append("l.data >= ?")
+            parametros.append(_texto_data(inicio))
+        if fim is not None:
+            condicoes.append("l.data <= ?")
+            parametros.append(_texto_data(fim))
+        onde = " AND ".join(condicoes)
+
+        total = self._memorizar(
+            ("total", conta, inicio, fim),
+            lambda: self._consultar_um(f"SELECT COUNT(*) FROM lancamentos l WHERE {onde}", parametros),
+        )
+        direcao = "ASC" if crescente else "DESC"
+        pagina_df = self._memorizar(
+            ("consulta", ordenar_por, crescente, conta, inicio, fim, pagina, tamanho),
+            lambda: self._formatar(self._ler(
+                self._SELECT_LANCAMENTOS + f" WHERE {onde} "
+                f"ORDER BY l.{ORDENACAO[ordenar_por]} {direcao}, l.id {direcao} LIMIT ? OFFSET ?",
+                parametros + [tamanho, pagina * tamanho],
+            )),
+        )
+        return pagina_df, total
+
+
+@st.cache_resource
+def banco_compartilhado():
+    # Uma instância por processo, compartilhada entre todas as sessões
+    return BancoLivros()
+
+
+def nome_livro_sessao():
+    # Usuário autenticado usa o próprio e-mail, com PREFIXO_USUARIO; sem login, o livro
+    # fica no parâmetro ?livro= da URL para sobreviver a recarregamentos da página.
+    # Um ?livro= que não seja um código (um e-mail, por exemplo) ganha um livro novo.
+    if st.user.get("is_logged_in"):
+        return PREFIXO_USUARIO + st.user.get("email")
+    codigo = st.query_params.get("livro", "")
+    if not CODIGO_LIVRO.fullmatch(codigo):
+        codigo = uuid.uuid4().hex
+        st.query_params["livro"] = codigo
+    return codigo
@@ -0,0 +1,96 @@
+import glob
+import hashlib
+import logging
+import os
+from functools import lru_cache
+import streamlit as st
+from helpmei.importacao import importar_tarde
+
+# O Pillow só é necessário quando uma variante precisa ser gerada
+Image = importar_tarde("PIL.Image")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_ATIVOS = os.path.join(RAIZ, "assets")
+
+# Variantes geradas ficam na pasta servida pelo Streamlit (server.enableStaticServing)
+PASTA_VARIANTES = os.path.join(RAIZ, "static", "ativos")
+URL_VARIANTES = "app/static/ativos"
+
+# Imagens geradas com o dobro da largura exibida, para telas de alta densidade
+DENSIDADE = 2
+
+# Nome usado no código -> (arquivo em assets/, largura exibida em px, ativo usado se o arquivo faltar)
+ATIVOS = {
+    "logo": ("logo.png", 64, None),
+    "logo_grande": ("HELPMEI.png", 64, "logo"),
+    "icone_indicadores": ("bar_chart_financial_graph_graphic_icon (2).png", 80, None),
+    "icone_calculadora": ("calculator_business_finance_office_marketing_icon.png", 80, None),
+    "icone_visual": ("app_browser_essential_object_ui_icon.png", 80, None),
+    "icone_analises": ("progress_growth_graph_analysis_success_icon.png", 80, None),
+}
+
+log = logging.getLogger(__name__)
+
+
+def validar_ativos():
+    # Confere se todo arquivo referenciado existe; ausentes com alternativa só geram aviso
+    ausentes = [nome for nome, (arquivo, _, _) in ATIVOS.items() if not os.path.isfile(os.path.join(PASTA_ATIVOS, arquivo))]
+    sem_alternativa = [nome for nome in ausentes if ATIVOS[nome][2] is None or ATIVOS[nome][2] in ausentes]
+    if sem_alternativa:
+        raise FileNotFoundError(
+            "Arquivos de imagem ausentes em assets/: "
+            + ", ".join(ATIVOS[nome][0] for nome in sem_alternativa)
+        )
+    for nome in ausentes:
+        log.warning("assets/%s não encontrado; usando %s no lugar.", ATIVOS[nome][0], ATIVOS[ATIVOS[nome][2]][0])
+    return ausentes
+
+
+def gerar_variante(arquivo, largura):
+    # WebP redimensionado com o hash do original no nome; só é regerado se o original mudar
+    origem = os.path.join(PASTA_ATIVOS, arquivo)
+    with open(origem, "rb") as conteudo:
+        versao = hashlib.sha256(conteudo.read()).hexdigest()[:10]
+    base = os.path.splitext(arquivo)[0].replace(" ", "_").replace("(", "").replace(")", "")
+    destino = os.path.join(PASTA_VARIANTES, f"{base}-{largura}.{versao}.webp")
+    if not os.path.isfile(destino):
+        os.makedirs(PASTA_VARIANTES, exist_ok=True)
+        with Image.open(origem) as imagem:
+            imagem = imagem.convert("RGBA")
+            alvo = min(largura * DENSIDADE, imagem.width)
+            imagem = imagem.resize((alvo, round(imagem.height * alvo / imagem.width)), Image.LANCZOS)
+            temporario = destino + ".tmp"
+            imagem.save(temporario, "WEBP", quality=85, method=6)
+        os.replace(temporario, destino)
+        for antigo in glob.glob(os.path.join(PASTA_VARIANTES, f"{glob.escape(base)}-{largura}.*.webp")):
+            if antigo != destino:
+                os.remove(antigo)
+    return destino, versao
+
+
+@lru_cache(maxsize=None)
+def preparar_ativos():
+    # Uma vez por processo: valida os arquivos e gera as variantes que faltam
+    ausentes = validar_ativos()
+    variantes = {}
+    for nome, (arquivo, largura, alternativa) in ATIVOS.items():
+        if nome in ausentes:
+            arquivo = ATIVOS[alternativa][0]
+        variantes[nome] = gerar_variante(arquivo, largura)
+    return variantes
+
+
+def url_ativo(nome):
+    # URL absoluta com ?v=<hash>, que o Streamlit serve com cache de longa duração.
+    # Fora do navegador (AppTest, scripts) devolve o caminho do arquivo gerado.
+    caminho, versao = preparar_ativos()[nome]
+    base = st.context.url
+    if not base or not base.startswith(("http://", "https://")):
+        return caminho
+    return f"{base.rstrip('/')}/{URL_VARIANTES}/{os.path.basename(caminho)}?v={versao}"
+
+
+if __name__ == "__main__":
+    # python -m helpmei.ativos: gera as variantes antes do deploy
+    for nome, (caminho, _) in preparar_ativos().items():
+        print(f"{nome}: {os.path.relpath(caminho, RAIZ)}")
@@ -0,0 +1,104 @@
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from helpmei.diario import SEPARADOR_CONTAS
+from helpmei.plano_contas import CONTAS_ANALITICAS
+
+
+def normalizar(texto):
+    # Minúsculas e sem acentos: "Água" e "agua" devem se encontrar
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def trigramas(texto):
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceContas:
+    # Índice de busca sobre código e descrição, montado uma vez por processo.
+    # Faixas de relevância: código exato, prefixo de código, prefixo de
+    # palavras da descrição, trecho da descrição e, por fim, trigramas.
+
+    def __init__(self, contas):
+        self.codigos = list(contas)
+        self.descricoes = [contas[codigo] for codigo in self.codigos]
+        self._digitos = [codigo.replace(".", "") for codigo in self.codigos]
+        self._textos = [normalizar(descricao) for descricao in self.descricoes]
+        self._palavras = [texto.replace("(", " ").replace(")", " ").split() for texto in self._textos]
+        self._trigramas = defaultdict(list)
+        for posicao, texto in enumerate(self._textos):
+            for trigrama in trigramas(texto):
+                self._trigramas[trigrama].append(posicao)
+
+    def _faixa(self, posicao, consulta, digitos, termos):
+        codigo = self.codigos[posicao]
+        if consulta == codigo or (digitos and digitos == self._digitos[posicao]):
+            return 0
+        if codigo.startswith(consulta) or (digitos and self._digitos[posicao].startswith(digitos)):
+            return 1
+        palavras = self._palavras[posicao]
+        if termos and all(any(palavra.startswith(termo) for palavra in palavras) for termo in termos):
+            return 2
+        if consulta in self._textos[posicao]:
+            return 3
+        return None
+
+    def buscar(self, consulta="", recentes=(), limite=None):
+        # Devolve códigos ordenados por relevância; contas recentes vêm antes dentro da mesma faixa
+        ordem_recente = {codigo: i for i, codigo in enumerate(recentes)}
+        consulta = normalizar(consulta.strip())
+
+        if not consulta:
+            resultado = sorted(
+                range(len(self.codigos)),
+                key=lambda posicao: (ordem_recente.get(self.codigos[posicao], len(ordem_recente)), posicao),
+            )
+            return [self.codigos[posicao] for posicao in resultado][:limite]
+
+        digitos = consulta.replace(".", "") if consulta.replace(".", "").isdigit() else ""
+        termos = consulta.split()
+        chaves = {}
+        for posicao in range(len(self.codigos)):
+            faixa = self._faixa(posicao, consulta, digitos, termos)
+            if faixa is not None:
+                chaves[posicao] = (faixa, 0)
+
+        # Aproximação por trigramas para erros de digitação ("aluges", "depreciaçao")
+        if not digitos:
+            consulta_trigramas = trigramas(consulta)
+            contagem = Counter(
+                posicao
+                for trigrama in consulta_trigramas
+                for posicao in self._trigramas.get(trigrama, ())
+            )
+            minimo = max(2, len(consulta_trigramas) // 2)
+            for posicao, comuns in contagem.items():
+                if posicao not in chaves and comuns >= minimo:
+                    chaves[posicao] = (4, -comuns)
+
+        resultado = sorted(
+            chaves,
+            key=lambda posicao: (
+                chaves[posicao][0],
+                ordem_recente.get(self.codigos[posicao], len(ordem_recente)),
+                chaves[posicao][1],
+                posicao,
+            ),
+        )
+        return [self.codigos[posicao] for posicao in resultado][:limite]
+
+
+@lru_cache(maxsize=None)
+def indice_contas():
+    return IndiceContas(CONTAS_ANALITICAS)
+
+
+def contas_recentes(diario, lancamentos=20):
+    # Contas dos últimos lançamentos do livro, da mais recente para a mais antiga
+    ultimos, _ = diario.consultar(ordenar_por="Lançamento", crescente=False, tamanho=lancamentos)
+    contas = []
+    for campo in ultimos[["Débito", "Crédito"]].to_numpy().ravel():
+        contas.extend(campo.split(SEPARADOR_CONTAS))
+    return list(dict.fromkeys(contas))
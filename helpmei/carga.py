@@ -0,0 +1,440 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from helpmei.focus import URL_FOCUS, obter_fixture
+from helpmei.importacao import RAIZ
+from helpmei.indicadores import caminho_fixture_sgs
+
+# Teste de carga: N sessões simultâneas falando com um `streamlit run` de verdade
+# pelo mesmo websocket do navegador. Cada passo do roteiro é uma nova execução do
+# script, medida do envio do BackMsg até o script_finished do servidor.
+
+SESSOES = 10
+REPETICOES = 3
+PAUSA_MS = 500            # tempo de "leitura" entre dois passos, com variação aleatória
+RAMPA_S = 5.0             # as sessões entram espalhadas nesse intervalo
+TEMPO_LIMITE_S = 120.0    # por execução do script
+
+# Tipos de elemento com estado no Streamlit
+WIDGETS = {"slider", "selectbox", "multiselect", "button", "date_input", "number_input",
+           "text_input", "checkbox", "radio"}
+
+# Nome do componente do gráfico do Painel, como o Streamlit o registra
+GRAFICO_PAINEL = "helpmei.graficos.grafico_indicadores"
+
+FINALIZACOES = {
+    ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR,
+}
+
+
+class BacenLocal:
+    # Substituto local das APIs SGS e Olinda, servindo as fixtures gravadas.
+    # latencia_ms simula o tempo de resposta do BACEN.
+
+    def __init__(self, latencia_ms=0):
+        self.latencia = latencia_ms / 1000
+        obter_focus = obter_fixture()
+        series = {}
+        latencia = self.latencia
+
+        class Tratador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                endereco = urlparse(self.path)
+                if "bcdata.sgs." in endereco.path:
+                    codigo = endereco.path.split("bcdata.sgs.")[1].split("/")[0]
+                    if codigo not in series:
+                        if not os.path.isfile(caminho_fixture_sgs(codigo)):
+                            self.send_error(404)
+                            return
+                        with open(caminho_fixture_sgs(codigo), "rb") as arquivo:
+                            series[codigo] = arquivo.read()
+                    corpo = series[codigo]
+                elif endereco.path.startswith("/focus"):
+                    params = {chave: valores[0] for chave, valores in parse_qs(endereco.query).items()}
+                    params["$top"] = int(params["$top"])
+                    params["$skip"] = int(params["$skip"])
+                    corpo = json.dumps(obter_focus(URL_FOCUS, params).json()).encode()
+                else:
+                    self.send_error(404)
+                    return
+                time.sleep(latencia)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Tratador)
+        self.servidor.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.servidor.server_port}"
+        threading.Thread(target=self.servidor.serve_forever, name="bacen-local", daemon=True).start()
+
+    def ambiente(self):
+        return {
+            "HELPMEI_URL_SGS": self.url + "/dados/serie/bcdata.sgs.{codigo}/dados?formato=json",
+            "HELPMEI_URL_FOCUS": self.url + "/focus",
+        }
+
+    def parar(self):
+        self.servidor.shutdown()
+
+
+def porta_livre():
+    with socket.socket() as soquete:
+        soquete.bind(("127.0.0.1", 0))
+        return soquete.getsockname()[1]
+
+
+def iniciar_app(porta, ambiente):
+    # `streamlit run` do app num processo próprio; espera o health check responder
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "🏠Home.py",
+         "--server.headless=true", f"--server.port={porta}", "--server.fileWatcherType=none",
+         "--browser.gatherUsageStats=false"],
+        cwd=RAIZ, env={**os.environ, **ambiente},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError("O servidor do Streamlit encerrou antes de ficar pronto.")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1):
+                return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError("O servidor do Streamlit não respondeu em 60 s.")
+
+
+class Amostrador:
+    # CPU (utime + stime) e RSS do processo do servidor, lidos de /proc (Linux)
+
+    def __init__(self, pid, intervalo=0.2):
+        self.pid = pid
+        self.intervalo = intervalo
+        self.rss_pico = 0
+        self._parar = threading.Event()
+
+    def cpu(self):
+        with open(f"/proc/{self.pid}/stat") as arquivo:
+            campos = arquivo.read().rsplit(")", 1)[1].split()
+        return (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+
+    def rss(self):
+        with open(f"/proc/{self.pid}/status") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) * 1024
+        return 0
+
+    def iniciar(self):
+        self.cpu_inicial = self.cpu()
+        self.rss_inicial = self.rss_pico = self.rss()
+        self.inicio = time.monotonic()
+
+        def amostrar():
+            while not self._parar.wait(self.intervalo):
+                self.rss_pico = max(self.rss_pico, self.rss())
+
+        self._thread = threading.Thread(target=amostrar, name="amostrador", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+        return {
+            "cpu_s": self.cpu() - self.cpu_inicial,
+            "duracao_s": time.monotonic() - self.inicio,
+            "rss_inicial": self.rss_inicial,
+            "rss_pico": max(self.rss_pico, self.rss()),
+        }
+
+
+class Sessao:
+    # Cliente mínimo do protocolo do navegador: manda rerun_script com o estado dos
+    # widgets e lê os ForwardMsg até o fim da execução, guardando os widgets exibidos
+
+    def __init__(self, url, livro):
+        self.url = url
+        self.url_app = url.replace("ws", "http", 1).rsplit("/_stcore/", 1)[0]
+        self.query = f"livro={livro}"
+        self.paginas = {}
+        self.pagina = ""
+        self.widgets = {}
+        self.estados = {}
+        self.latencias = []
+        self.mensagens = {}
+
+    async def conectar(self):
+        self.ws = await websocket_connect(self.url, subprotocols=["streamlit"], max_message_size=256 * 2**20)
+
+    def fechar(self):
+        self.ws.close()
+
+    async def executar(self, passo, gatilho=None):
+        mensagem = BackMsg()
+        cliente = mensagem.rerun_script
+        cliente.query_string = self.query
+        cliente.page_script_hash = self.pagina
+        # O navegador informa a própria URL; st.context.url (e as URLs das imagens) dependem dela
+        cliente.context_info.url = f"{self.url_app}/?{self.query}"
+        cliente.context_info.timezone = "America/Sao_Paulo"
+        cliente.context_info.locale = "pt-BR"
+        cliente.widget_states.widgets.extend(self.estados.values())
+        if gatilho is not None:
+            cliente.widget_states.widgets.append(gatilho)
+
+        inicio = time.perf_counter()
+        await self.ws.write_message(mensagem.SerializeToString(), binary=True)
+        widgets = {}
+        while True:
+            dados = await asyncio.wait_for(self.ws.read_message(), TEMPO_LIMITE_S)
+            if dados is None:
+                raise ConnectionError("O servidor fechou o websocket.")
+            recebida = ForwardMsg.FromString(dados)
+            tipo = recebida.WhichOneof("type")
+            # Mensagens grandes (ex.: os bytes do gráfico do Painel) vão uma vez por sessão;
+            # nas execuções seguintes chega só a referência, como o navegador espera
+            if tipo == "ref_hash":
+                recebida = self.mensagens[recebida.ref_hash]
+                tipo = recebida.WhichOneof("type")
+            elif recebida.metadata.cacheable:
+                self.mensagens[recebida.hash] = recebida
+            if tipo == "navigation":
+                self.paginas = {pagina.url_pathname: pagina.page_script_hash for pagina in recebida.navigation.app_pages}
+                self.pagina = recebida.navigation.page_script_hash
+            elif tipo == "delta" and recebida.delta.WhichOneof("type") == "new_element":
+                elemento = recebida.delta.new_element
+                if elemento.WhichOneof("type") in WIDGETS:
+                    proto = getattr(elemento, elemento.WhichOneof("type"))
+                    widgets[proto.label] = (elemento.WhichOneof("type"), proto)
+                elif elemento.WhichOneof("type") == "component_instance":
+                    # Componentes não têm rótulo: ficam pelo nome do componente
+                    proto = elemento.component_instance
+                    widgets[proto.component_name] = ("component_instance", proto)
+            elif tipo == "script_finished" and recebida.script_finished in FINALIZACOES:
+                break
+        self.latencias.append((passo, time.perf_counter() - inicio))
+        self.widgets = widgets
+        # Estados de widgets que sumiram da página não são mais enviados
+        ids = {proto.id for _, proto in widgets.values()}
+        self.estados = {id_: estado for id_, estado in self.estados.items() if id_ in ids}
+
+    async def abrir(self, pagina):
+        if pagina:
+            self.pagina = self.paginas[pagina]
+        self.estados = {}
+        await self.executar(f"abrir {pagina or 'Home'}")
+
+    def preencher(self, rotulo, valor):
+        # Guarda o novo valor do widget sem executar o script (campos de formulário)
+        tipo, proto = self.widgets[rotulo]
+        estado = WidgetState(id=proto.id)
+        if tipo == "slider":
+            estado.double_array_value.data.extend(float(item) for item in valor)
+        elif tipo in ("selectbox", "text_input"):
+            estado.string_value = valor
+        elif tipo == "multiselect":
+            estado.string_array_value.data.extend(valor)
+        elif tipo == "number_input":
+            estado.double_value = float(valor)
+        elif tipo == "date_input":
+            estado.string_array_value.data.append(f"{valor:%Y/%m/%d}")
+        elif tipo == "checkbox":
+            estado.bool_value = bool(valor)
+        elif tipo == "radio":
+            estado.int_value = list(proto.options).index(valor)
+        elif tipo == "component_instance":
+            estado.json_value = json.dumps(valor)
+        else:
+            raise ValueError(f"Widget {rotulo!r} ({tipo}) não pode ser preenchido.")
+        self.estados[proto.id] = estado
+
+    async def definir(self, rotulo, valor, passo=None):
+        self.preencher(rotulo, valor)
+        await self.executar(passo or f"definir {rotulo}")
+
+    async def clicar(self, rotulo, passo=None):
+        _, proto = self.widgets[rotulo]
+        await self.executar(passo or f"clicar {rotulo}", WidgetState(id=proto.id, trigger_value=True))
+
+    def opcoes(self, rotulo):
+        return list(self.widgets[rotulo][1].options)
+
+
+async def pausar(pausa_ms):
+    await asyncio.sleep(random.uniform(0.5, 1.5) * pausa_ms / 1000)
+
+
+# As abas do st.tabs trocam só no navegador, sem nova execução; os roteiros
+# usam os widgets de dentro das abas (correlação e Focus), que executam o script.
+
+async def roteiro_painel(sessao, repeticoes, pausa_ms):
+    await sessao.abrir("Painel")
+    for _ in range(repeticoes):
+        # Arrastar o período e marcar indicadores não falam com o servidor; só o botão
+        # "Usar este período nas outras abas" do gráfico executa o script
+        await pausar(pausa_ms)
+        await sessao.definir(
+            GRAFICO_PAINEL,
+            {"inicio": random.choice((2008, 2014, 2020)), "fim": 2025, "indicadores": ["SELIC", "IPCA", "Inadimplencia"]},
+            "usar período do gráfico",
+        )
+        await pausar(pausa_ms)
+        await sessao.definir("Eixo X", random.choice(sessao.opcoes("Eixo X")), "aba correlação")
+        if "Ano de referência" in sessao.widgets:
+            await pausar(pausa_ms)
+            await sessao.definir("Ano de referência", random.choice(sessao.opcoes("Ano de referência")), "aba projeções")
+
+
+async def roteiro_calculadora(sessao, repeticoes, pausa_ms):
+    await sessao.abrir("Calculadora_Contabil")
+    for repeticao in range(repeticoes):
+        for _ in range(3):
+            await pausar(pausa_ms)
+            opcoes = sessao.opcoes("Débito")
+            debito = next((opcao for opcao in opcoes if opcao.startswith("1.1.1.01.01")), opcoes[0])
+            credito = next((opcao for opcao in opcoes if opcao.startswith("3.1.1.01.01")), opcoes[1])
+            sessao.preencher("Valor", round(random.uniform(50, 2_000), 2))
+            sessao.preencher("Débito", debito)
+            sessao.preencher("Crédito", credito)
+            await sessao.clicar("Registrar", "lançar")
+        await pausar(pausa_ms)
+        await sessao.clicar("Gerar Balanço", "gerar balanço")
+
+
+ROTEIROS = {"painel": roteiro_painel, "calculadora": roteiro_calculadora}
+
+
+async def executar_sessao(numero, url, roteiro, repeticoes, pausa_ms, atraso):
+    await asyncio.sleep(atraso)
+    sessao = Sessao(url, f"carga-{os.getpid()}-{numero}")
+    try:
+        await sessao.conectar()
+        await sessao.abrir("")
+        await ROTEIROS[roteiro](sessao, repeticoes, pausa_ms)
+        return sessao.latencias, None
+    except Exception as erro:
+        # As execuções medidas antes da falha continuam no relatório
+        return sessao.latencias, erro
+    finally:
+        if hasattr(sessao, "ws"):
+            sessao.fechar()
+
+
+async def executar_carga(url, sessoes, roteiros, repeticoes, pausa_ms, rampa_s):
+    tarefas = [
+        executar_sessao(numero, url, roteiros[numero % len(roteiros)], repeticoes, pausa_ms,
+                        rampa_s * numero / max(sessoes, 1))
+        for numero in range(sessoes)
+    ]
+    resultados = await asyncio.gather(*tarefas)
+    erros = [erro for _, erro in resultados if erro is not None]
+    latencias = [medida for medidas, _ in resultados for medida in medidas]
+    return latencias, erros
+
+
+def percentis(valores):
+    if len(valores) < 2:
+        return {"p50": valores[0], "p95": valores[0], "p99": valores[0]}
+    cortes = statistics.quantiles(valores, n=100, method="inclusive")
+    return {"p50": cortes[49], "p95": cortes[94], "p99": cortes[98]}
+
+
+def relatorio(latencias, erros, sessoes, servidor):
+    linhas = [f"{'passo':<28}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)"]
+    passos = {}
+    for passo, segundos in latencias:
+        passos.setdefault(passo, []).append(1000 * segundos)
+    for passo, valores in sorted(passos.items()):
+        medida = percentis(valores)
+        linhas.append(f"{passo:<28}{len(valores):>6}{medida['p50']:>10,.0f}{medida['p95']:>10,.0f}{medida['p99']:>10,.0f}")
+    if latencias:
+        medida = percentis([1000 * segundos for _, segundos in latencias])
+        linhas.append(f"{'todas as execuções':<28}{len(latencias):>6}{medida['p50']:>10,.0f}{medida['p95']:>10,.0f}{medida['p99']:>10,.0f}")
+    if servidor:
+        mb = 2**20
+        linhas.append(
+            f"servidor: {servidor['cpu_s']:,.1f} s de CPU em {servidor['duracao_s']:,.1f} s "
+            f"({100 * servidor['cpu_s'] / servidor['duracao_s']:,.0f}% de um núcleo); "
+            f"RSS {servidor['rss_inicial'] / mb:,.0f} → {servidor['rss_pico'] / mb:,.0f} MB, "
+            f"{(servidor['rss_pico'] - servidor['rss_inicial']) / mb / max(sessoes, 1):,.1f} MB por sessão"
+        )
+    if erros:
+        linhas.append(f"{len(erros)} sessão(ões) com erro: {erros[0]!r}")
+    return "\n".join(linhas)
+
+
+def principal(argumentos=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m helpmei.carga",
+        description="Teste de carga com sessões simultâneas do Help MEI.",
+    )
+    parser.add_argument("--sessoes", type=int, default=SESSOES)
+    parser.add_argument("--roteiros", default="painel,calculadora",
+                        help="roteiros distribuídos entre as sessões: " + ", ".join(ROTEIROS))
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES, help="voltas do roteiro por sessão")
+    parser.add_argument("--pausa-ms", type=float, default=PAUSA_MS)
+    parser.add_argument("--rampa-s", type=float, default=RAMPA_S)
+    parser.add_argument("--latencia-bacen-ms", type=float, default=0.0)
+    parser.add_argument("--url", help="servidor já em execução (ex.: http://localhost:8501); sem ele, um é iniciado")
+    parser.add_argument("--pid", type=int, help="PID do servidor informado em --url, para medir CPU e RSS")
+    opcoes = parser.parse_args(argumentos)
+
+    roteiros = opcoes.roteiros.split(",")
+    bacen = processo = None
+    pid = opcoes.pid
+    if opcoes.url:
+        base = opcoes.url.rstrip("/")
+    else:
+        bacen = BacenLocal(opcoes.latencia_bacen_ms)
+        pasta = tempfile.mkdtemp(prefix="helpmei-carga-")
+        porta = porta_livre()
+        processo = iniciar_app(porta, {**bacen.ambiente(), "HELPMEI_BANCO": os.path.join(pasta, "livros.db")})
+        base = f"http://127.0.0.1:{porta}"
+        pid = processo.pid
+
+    amostrador = Amostrador(pid) if pid and os.path.isdir(f"/proc/{pid}") else None
+    try:
+        if amostrador:
+            amostrador.iniciar()
+        url_ws = base.replace("http", "ws", 1) + "/_stcore/stream"
+        latencias, erros = asyncio.run(executar_carga(
+            url_ws, opcoes.sessoes, roteiros, opcoes.repeticoes, opcoes.pausa_ms, opcoes.rampa_s,
+        ))
+        servidor = amostrador.parar() if amostrador else None
+    finally:
+        if processo:
+            processo.terminate()
+            processo.wait(timeout=30)
+        if bacen:
+            bacen.parar()
+
+    print(relatorio(latencias, erros, opcoes.sessoes, servidor))
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    # python -m helpmei.carga --sessoes 20: sobe o app com um BACEN local e mede as execuções
+    sys.exit(principal())
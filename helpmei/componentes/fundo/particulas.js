@@ -0,0 +1,272 @@
+// Fundo de partículas em canvas. Implementa o subconjunto da configuração
+// do particles.js usado pelas páginas (quantidade e densidade, cor,
+// opacidade, tamanho, ligações, movimento e interação repulse/push),
+// sem depender de CDN.
+//
+// `config.desempenho` controla o custo no navegador: a quantidade se adapta
+// ao aparelho e ao tempo medido de cada quadro, as ligações usam uma grade
+// espacial (só células vizinhas são comparadas), a animação para com a aba
+// oculta, fora da tela ou sem interação, e vira um quadro estático com
+// prefers-reduced-motion ou modo "estatico".
+(function () {
+    function corRgb(hex) {
+        var valor = parseInt(hex.replace("#", ""), 16);
+        return [(valor >> 16) & 255, (valor >> 8) & 255, valor & 255].join(",");
+    }
+
+    function fatorAparelho() {
+        // Aparelhos modestos e telas de toque recebem menos partículas
+        var fator = 1;
+        if (navigator.hardwareConcurrency && navigator.hardwareConcurrency <= 4) fator *= 0.6;
+        if (navigator.deviceMemory && navigator.deviceMemory <= 4) fator *= 0.7;
+        if (window.matchMedia && window.matchMedia("(pointer: coarse)").matches) fator *= 0.5;
+        return fator;
+    }
+
+    function movimentoReduzido() {
+        return window.matchMedia && window.matchMedia("(prefers-reduced-motion: reduce)").matches;
+    }
+
+    window.iniciarParticulas = function (canvas, config) {
+        var contexto = canvas.getContext("2d");
+        if (!contexto) return { parar: function () {} };
+        var p = config.particles;
+        var interacao = config.interactivity;
+        var d = config.desempenho || {};
+        var estatico = d.modo === "estatico" || movimentoReduzido();
+        var escala = config.retina_detect && window.devicePixelRatio > 1 ? Math.min(window.devicePixelRatio, 2) : 1;
+        var cor = corRgb(p.color.value);
+        var corLinha = corRgb(p.line_linked.color);
+        var intervalo = 1000 / (d.quadros_por_segundo || 60);
+        var largura = 0, altura = 0;
+        var particulas = [];
+        var limite = d.maximo || Infinity;
+        var mouse = null;
+        var quadro = null;
+        var ultimoQuadro = 0;
+        var custoMedio = 0;
+        var ultimaAtividade = performance.now();
+        var visivel = !document.hidden;
+        var naTela = true;
+
+        function nova(x, y) {
+            var angulo = Math.random() * 2 * Math.PI;
+            var velocidade = p.move.speed * escala;
+            return {
+                x: x === undefined ? Math.random() * largura : x,
+                y: y === undefined ? Math.random() * altura : y,
+                vx: Math.cos(angulo) * velocidade * Math.random(),
+                vy: Math.sin(angulo) * velocidade * Math.random(),
+                raio: (p.size.random ? Math.random() : 1) * p.size.value * escala,
+                opacidade: p.opacity.random ? Math.random() * p.opacity.value : p.opacity.value
+            };
+        }
+
+        function quantidade() {
+            var base = p.number.value;
+            if (p.number.density.enable) {
+                var area = (largura / escala) * (altura / escala) / 1000;
+                base = p.number.value * area / p.number.density.value_area;
+            }
+            return Math.max(d.minimo || 0, Math.min(limite, Math.round(base * fatorAparelho())));
+        }
+
+        function ajustarQuantidade(alvo) {
+            while (particulas.length < alvo) particulas.push(nova());
+            particulas.length = alvo;
+        }
+
+        function redimensionar() {
+            largura = canvas.width = canvas.offsetWidth * escala;
+            altura = canvas.height = canvas.offsetHeight * escala;
+            ajustarQuantidade(quantidade());
+            if (estatico) desenhar(false);
+        }
+
+        function mover(particula) {
+            particula.x += particula.vx;
+            particula.y += particula.vy;
+            var r = particula.raio;
+            if (particula.x - r > largura) particula.x = -r;
+            else if (particula.x + r < 0) particula.x = largura + r;
+            if (particula.y - r > altura) particula.y = -r;
+            else if (particula.y + r < 0) particula.y = altura + r;
+
+            if (mouse && interacao.events.onhover.enable && interacao.events.onhover.mode === "repulse") {
+                var dx = particula.x - mouse.x, dy = particula.y - mouse.y;
+                var distancia = Math.sqrt(dx * dx + dy * dy);
+                var alcance = interacao.modes.repulse.distance * escala;
+                if (distancia > 0 && distancia < alcance) {
+                    var forca = (alcance - distancia) / alcance;
+                    particula.x += dx / distancia * forca * 5;
+                    particula.y += dy / distancia * forca * 5;
+                }
+            }
+        }
+
+        function ligar(a, b, alcance, linha) {
+            var dx = a.x - b.x, dy = a.y - b.y;
+            var quadrado = dx * dx + dy * dy;
+            if (quadrado >= alcance * alcance) return;
+            contexto.strokeStyle = "rgba(" + corLinha + "," + linha.opacity * (1 - Math.sqrt(quadrado) / alcance) + ")";
+            contexto.beginPath();
+            contexto.moveTo(a.x, a.y);
+            contexto.lineTo(b.x, b.y);
+            contexto.stroke();
+        }
+
+        function desenharLigacoes() {
+            // Grade com células do tamanho do alcance: cada partícula só é
+            // comparada com a própria célula e com as quatro vizinhas "à frente"
+            var linha = p.line_linked;
+            var alcance = linha.distance * escala;
+            var colunas = Math.max(1, Math.ceil(largura / alcance));
+            var linhas = Math.max(1, Math.ceil(altura / alcance));
+            var celulas = new Array(colunas * linhas);
+            for (var i = 0; i < particulas.length; i++) {
+                var c = Math.min(colunas - 1, Math.max(0, Math.floor(particulas[i].x / alcance)));
+                var l = Math.min(linhas - 1, Math.max(0, Math.floor(particulas[i].y / alcance)));
+                var indice = l * colunas + c;
+                (celulas[indice] || (celulas[indice] = [])).push(particulas[i]);
+            }
+            var vizinhas = [[1, 0], [-1, 1], [0, 1], [1, 1]];
+            contexto.lineWidth = linha.width;
+            for (var l = 0; l < linhas; l++) {
+                for (var c = 0; c < colunas; c++) {
+                    var celula = celulas[l * colunas + c];
+                    if (!celula) continue;
+                    for (var a = 0; a < celula.length; a++) {
+                        for (var b = a + 1; b < celula.length; b++) ligar(celula[a], celula[b], alcance, linha);
+                    }
+                    for (var v = 0; v < vizinhas.length; v++) {
+                        var cv = c + vizinhas[v][0], lv = l + vizinhas[v][1];
+                        if (cv < 0 || cv >= colunas || lv >= linhas) continue;
+                        var outra = celulas[lv * colunas + cv];
+                        if (!outra) continue;
+                        for (var a2 = 0; a2 < celula.length; a2++) {
+                            for (var b2 = 0; b2 < outra.length; b2++) ligar(celula[a2], outra[b2], alcance, linha);
+                        }
+                    }
+                }
+            }
+        }
+
+        function desenhar(animar) {
+            contexto.clearRect(0, 0, largura, altura);
+            for (var i = 0; i < particulas.length; i++) {
+                var particula = particulas[i];
+                if (animar) mover(particula);
+                contexto.fillStyle = "rgba(" + cor + "," + particula.opacidade + ")";
+                contexto.beginPath();
+                contexto.arc(particula.x, particula.y, particula.raio, 0, 2 * Math.PI);
+                contexto.fill();
+            }
+            if (p.line_linked.enable) desenharLigacoes();
+        }
+
+        function ativo() {
+            return visivel && naTela && performance.now() - ultimaAtividade < (d.ocioso_apos_s || Infinity) * 1000;
+        }
+
+        function passo(instante) {
+            quadro = null;
+            if (!ativo()) return;
+            quadro = requestAnimationFrame(passo);
+            if (instante - ultimoQuadro < intervalo) return;
+            ultimoQuadro = instante;
+
+            var inicio = performance.now();
+            desenhar(true);
+            // Média móvel do custo do quadro; acima do orçamento, corta 15% das partículas
+            custoMedio = custoMedio * 0.9 + (performance.now() - inicio) * 0.1;
+            if (d.orcamento_quadro_ms && custoMedio > d.orcamento_quadro_ms && particulas.length > (d.minimo || 0)) {
+                limite = Math.max(d.minimo || 0, Math.floor(particulas.length * 0.85));
+                ajustarQuantidade(limite);
+                custoMedio = 0;
+            }
+        }
+
+        function retomar() {
+            if (!estatico && quadro === null && ativo()) quadro = requestAnimationFrame(passo);
+        }
+
+        function aoAtividade() {
+            ultimaAtividade = performance.now();
+            retomar();
+        }
+
+        function aoVisibilidade() {
+            visivel = !document.hidden;
+            if (visivel) aoAtividade();
+        }
+
+        function aoMover(evento) {
+            mouse = { x: evento.clientX * escala, y: evento.clientY * escala };
+            aoAtividade();
+        }
+
+        function aoSair() {
+            mouse = null;
+        }
+
+        function aoClicar(evento) {
+            aoAtividade();
+            if (!interacao.events.onclick.enable || interacao.events.onclick.mode !== "push") return;
+            for (var i = 0; i < interacao.modes.push.particles_nb && particulas.length < limite; i++) {
+                particulas.push(nova(evento.clientX * escala, evento.clientY * escala));
+            }
+        }
+
+        // A atividade do usuário acontece na página, fora do iframe; quando a
+        // origem é a mesma, os eventos da página também acordam a animação
+        var documentos = [document];
+        try {
+            if (window.parent !== window && window.parent.document) documentos.push(window.parent.document);
+        } catch (erro) {}
+        var eventosAtividade = ["pointermove", "keydown", "scroll", "touchstart"];
+
+        var observador = null;
+        if (window.IntersectionObserver) {
+            observador = new IntersectionObserver(function (entradas) {
+                naTela = entradas[0].isIntersecting;
+                retomar();
+            });
+            observador.observe(canvas);
+        }
+
+        redimensionar();
+        window.addEventListener("resize", redimensionar);
+        if (!estatico) {
+            document.addEventListener("visibilitychange", aoVisibilidade);
+            documentos.forEach(function (doc) {
+                eventosAtividade.forEach(function (nome) {
+                    doc.addEventListener(nome, aoAtividade, { passive: true, capture: true });
+                });
+            });
+            canvas.addEventListener("mousemove", aoMover);
+            canvas.addEventListener("mouseleave", aoSair);
+            canvas.addEventListener("click", aoClicar);
+            retomar();
+        }
+
+        return {
+            parar: function () {
+                if (quadro !== null) cancelAnimationFrame(quadro);
+                quadro = null;
+                estatico = true;
+                if (observador) observador.disconnect();
+                window.removeEventListener("resize", redimensionar);
+                document.removeEventListener("visibilitychange", aoVisibilidade);
+                documentos.forEach(function (doc) {
+                    eventosAtividade.forEach(function (nome) {
+                        doc.removeEventListener(nome, aoAtividade, { capture: true });
+                    });
+                });
+                canvas.removeEventListener("mousemove", aoMover);
+                canvas.removeEventListener("mouseleave", aoSair);
+                canvas.removeEventListener("click", aoClicar);
+                contexto.clearRect(0, 0, largura, altura);
+            }
+        };
+    };
+})();
@@ -0,0 +1,334 @@
+// Gráficos dos indicadores do Painel, desenhados em SVG no navegador.
+//
+// Os dados chegam uma vez por versão publicada, num buffer float64 (little-endian,
+// como o de todo navegador atual): a primeira linha são os meses (ano * 12 + mês - 1)
+// e cada linha seguinte é um indicador. Recorte do período, escolha dos indicadores,
+// médias anuais e classificação são feitos aqui; o Python só recebe a seleção quando
+// o usuário pede para usá-la nas outras abas.
+(function () {
+    var NS = "http://www.w3.org/2000/svg";
+    var ALTURA_GRAFICO = 220;
+    var MARGEM = { esquerda: 44, direita: 12, topo: 10, base: 26 };
+    var VISOES = { mensal: "Mensal", anual: "Média anual", comparar: "Comparar (anual)" };
+
+    function decodificar(bytes, quantidade) {
+        // slice() copia para um buffer próprio, alinhado para o Float64Array
+        var valores = new Float64Array(bytes.slice().buffer);
+        var n = valores.length / (quantidade + 1);
+        var series = [];
+        for (var i = 0; i < quantidade; i++) series.push(valores.subarray((i + 1) * n, (i + 2) * n));
+        return { meses: valores.subarray(0, n), series: series };
+    }
+
+    function primeiroMaiorOuIgual(ordenado, alvo) {
+        var baixo = 0, alto = ordenado.length;
+        while (baixo < alto) {
+            var meio = (baixo + alto) >> 1;
+            if (ordenado[meio] < alvo) baixo = meio + 1; else alto = meio;
+        }
+        return baixo;
+    }
+
+    function mediasAnuais(meses, serie, de, ate) {
+        // Média de cada ano do recorte, ignorando meses sem valor
+        var anos = [], medias = [], soma = 0, contagem = 0, anoAtual = null;
+        function fechar() {
+            anos.push(anoAtual);
+            medias.push(contagem ? soma / contagem : NaN);
+        }
+        for (var i = de; i < ate; i++) {
+            var ano = Math.floor(meses[i] / 12);
+            if (ano !== anoAtual) {
+                if (anoAtual !== null) fechar();
+                anoAtual = ano; soma = 0; contagem = 0;
+            }
+            if (!isNaN(serie[i])) { soma += serie[i]; contagem++; }
+        }
+        if (anoAtual !== null) fechar();
+        return { anos: anos, medias: medias };
+    }
+
+    function classificar(faixas, valor) {
+        // Mesmas faixas de classificar_indicador, vindas do Python
+        if (!faixas || isNaN(valor)) return "Indefinido";
+        for (var i = 0; i < faixas.length; i++) {
+            if (faixas[i][0] === null || valor <= faixas[i][0]) return faixas[i][1];
+        }
+        return "Indefinido";
+    }
+
+    function criar(tipo, atributos, pai, texto) {
+        var elemento = tipo === "div" || tipo === "span" || tipo === "h4" || tipo === "label" || tipo === "input" ||
+            tipo === "button" || tipo === "fieldset" || tipo === "legend"
+            ? document.createElement(tipo) : document.createElementNS(NS, tipo);
+        for (var nome in atributos || {}) elemento.setAttribute(nome, atributos[nome]);
+        if (texto !== undefined) elemento.textContent = texto;
+        if (pai) pai.appendChild(elemento);
+        return elemento;
+    }
+
+    function extremos(listas, comZero) {
+        var minimo = comZero ? 0 : Infinity, maximo = comZero ? 0 : -Infinity;
+        listas.forEach(function (valores) {
+            for (var i = 0; i < valores.length; i++) {
+                if (isNaN(valores[i])) continue;
+                if (valores[i] < minimo) minimo = valores[i];
+                if (valores[i] > maximo) maximo = valores[i];
+            }
+        });
+        if (!isFinite(minimo)) return [0, 1];
+        var folga = (maximo - minimo) * 0.05 || 1;
+        return [comZero && minimo >= 0 ? 0 : minimo - folga, maximo + folga];
+    }
+
+    function rotuloMes(mes) {
+        var numero = mes % 12 + 1;
+        return (numero < 10 ? "0" : "") + numero + "/" + Math.floor(mes / 12);
+    }
+
+    function desenhar(pai, largura, xs, series, tipo, rotuloX) {
+        // xs: posições no eixo x (meses ou anos); series: [{nome, cor, valores}];
+        // tipo "linha" ou "barra"; rotuloX(x) formata a dica
+        var caixa = criar("div", { class: "grafico-area" }, pai);
+        caixa.style.position = "relative";
+        var svg = criar("svg", { width: largura, height: ALTURA_GRAFICO }, caixa);
+        var dica = criar("div", { class: "dica" }, caixa);
+        var areaX = [MARGEM.esquerda, largura - MARGEM.direita];
+        var areaY = [ALTURA_GRAFICO - MARGEM.base, MARGEM.topo];
+        var n = xs.length;
+        if (!n) return;
+        var passo = (areaX[1] - areaX[0]) / n;
+        function posicaoX(i) { return areaX[0] + passo * (i + 0.5); }
+        var dominio = extremos(series.map(function (serie) { return serie.valores; }), tipo === "barra");
+        function posicaoY(valor) {
+            return areaY[0] + (valor - dominio[0]) / (dominio[1] - dominio[0]) * (areaY[1] - areaY[0]);
+        }
+
+        for (var marca = 0; marca <= 4; marca++) {
+            var valor = dominio[0] + (dominio[1] - dominio[0]) * marca / 4;
+            var y = posicaoY(valor);
+            criar("line", { x1: areaX[0], x2: areaX[1], y1: y, y2: y, stroke: "currentColor", "stroke-opacity": 0.12 }, svg);
+            criar("text", { x: areaX[0] - 6, y: y + 4, "text-anchor": "end" }, svg, valor.toFixed(1));
+        }
+        // Rótulos do eixo x: anos, no máximo uns dez
+        var anos = xs.map(function (x) { return tipo === "linha" && rotuloX === rotuloMes ? Math.floor(x / 12) : x; });
+        var salto = Math.max(1, Math.ceil(new Set(anos).size / 10));
+        var ultimoAno = null, contagem = 0;
+        for (var i = 0; i < n; i++) {
+            if (anos[i] === ultimoAno) continue;
+            ultimoAno = anos[i];
+            if (contagem++ % salto === 0) {
+                criar("text", { x: posicaoX(i), y: ALTURA_GRAFICO - 8, "text-anchor": "middle" }, svg, anos[i]);
+            }
+        }
+
+        series.forEach(function (serie, indice) {
+            if (tipo === "barra") {
+                var larguraBarra = passo * 0.7 / series.length;
+                for (var i = 0; i < n; i++) {
+                    if (isNaN(serie.valores[i])) continue;
+                    var topo = posicaoY(Math.max(serie.valores[i], 0)), base = posicaoY(Math.min(serie.valores[i], 0));
+                    criar("rect", {
+                        x: posicaoX(i) - passo * 0.35 + indice * larguraBarra, y: topo,
+                        width: larguraBarra, height: Math.max(base - topo, 1), fill: serie.cor,
+                    }, svg);
+                }
+                return;
+            }
+            var caminho = "", aberto = false;
+            for (var j = 0; j < n; j++) {
+                if (isNaN(serie.valores[j])) { aberto = false; continue; }
+                caminho += (aberto ? "L" : "M") + posicaoX(j).toFixed(1) + "," + posicaoY(serie.valores[j]).toFixed(1);
+                aberto = true;
+            }
+            criar("path", { d: caminho, fill: "none", stroke: serie.cor, "stroke-width": 2.5 }, svg);
+            if (n <= 40) {
+                for (var k = 0; k < n; k++) {
+                    if (isNaN(serie.valores[k])) continue;
+                    criar("circle", { cx: posicaoX(k), cy: posicaoY(serie.valores[k]), r: 3, fill: serie.cor }, svg);
+                }
+            }
+        });
+
+        // Dica com o valor mais próximo do cursor
+        var guia = criar("line", { y1: areaY[1], y2: areaY[0], stroke: "currentColor", "stroke-opacity": 0.4, visibility: "hidden" }, svg);
+        svg.addEventListener("mousemove", function (evento) {
+            var limites = svg.getBoundingClientRect();
+            var i = Math.floor((evento.clientX - limites.left - areaX[0]) / passo);
+            if (i < 0 || i >= n) { dica.style.display = "none"; guia.setAttribute("visibility", "hidden"); return; }
+            guia.setAttribute("x1", posicaoX(i));
+            guia.setAttribute("x2", posicaoX(i));
+            guia.setAttribute("visibility", "visible");
+            dica.textContent = rotuloX(xs[i]) + " · " + series.map(function (serie) {
+                return serie.nome + ": " + (isNaN(serie.valores[i]) ? "—" : serie.valores[i].toFixed(2) + "%");
+            }).join(" · ");
+            dica.style.display = "block";
+            dica.style.top = "0px";
+            dica.style.left = Math.min(posicaoX(i) + 8, Math.max(0, largura - dica.offsetWidth)) + "px";
+        });
+        svg.addEventListener("mouseleave", function () {
+            dica.style.display = "none";
+            guia.setAttribute("visibility", "hidden");
+        });
+    }
+
+    window.iniciarGraficos = function (raiz, retorno) {
+        var dados = null, versao = null, series = [], faixas = {};
+        var selecao = null, enviada = null;
+        var controles = criar("div", { class: "controles" }, raiz);
+        var area = criar("div", {}, raiz);
+        var botao = null;
+
+        function normalizada() {
+            return JSON.stringify({
+                inicio: selecao.inicio, fim: selecao.fim,
+                indicadores: series.map(function (serie) { return serie.nome; })
+                    .filter(function (nome) { return selecao.indicadores.indexOf(nome) >= 0; }),
+            });
+        }
+
+        function anosDisponiveis() {
+            var meses = dados.meses;
+            return [Math.floor(meses[0] / 12), Math.floor(meses[meses.length - 1] / 12)];
+        }
+
+        function montarControles() {
+            controles.textContent = "";
+            var limites = anosDisponiveis();
+            var periodo = criar("fieldset", {}, controles);
+            criar("legend", {}, periodo, "Período");
+            var rotulo = criar("span", {}, periodo);
+            ["inicio", "fim"].forEach(function (campo) {
+                var entrada = criar("input", { type: "range", min: limites[0], max: limites[1], step: 1 }, periodo);
+                entrada.value = selecao[campo];
+                // "input" dispara enquanto arrasta: o redesenho é local
+                entrada.addEventListener("input", function () {
+                    selecao[campo] = Number(entrada.value);
+                    if (selecao.inicio > selecao.fim) {
+                        selecao[campo === "inicio" ? "fim" : "inicio"] = selecao[campo];
+                        montarControles();
+                    }
+                    rotulo.textContent = selecao.inicio + " – " + selecao.fim;
+                    redesenhar();
+                });
+            });
+            rotulo.textContent = selecao.inicio + " – " + selecao.fim;
+
+            var escolha = criar("fieldset", {}, controles);
+            criar("legend", {}, escolha, "Indicadores");
+            series.forEach(function (serie) {
+                var item = criar("label", {}, escolha);
+                var caixa = criar("input", { type: "checkbox" }, item);
+                caixa.checked = selecao.indicadores.indexOf(serie.nome) >= 0;
+                criar("span", { class: "marcador", style: "background:" + serie.cor }, item);
+                item.appendChild(document.createTextNode(serie.nome));
+                caixa.addEventListener("change", function () {
+                    selecao.indicadores = selecao.indicadores.filter(function (nome) { return nome !== serie.nome; });
+                    if (caixa.checked) selecao.indicadores.push(serie.nome);
+                    redesenhar();
+                });
+            });
+
+            var visao = criar("fieldset", {}, controles);
+            criar("legend", {}, visao, "Visão");
+            Object.keys(VISOES).forEach(function (chave) {
+                var item = criar("label", {}, visao);
+                var opcao = criar("input", { type: "radio", name: "visao" }, item);
+                opcao.checked = selecao.visao === chave;
+                item.appendChild(document.createTextNode(" " + VISOES[chave]));
+                opcao.addEventListener("change", function () { selecao.visao = chave; redesenhar(); });
+            });
+
+            botao = criar("button", { type: "button" }, controles, "Usar este período nas outras abas");
+            botao.addEventListener("click", function () {
+                enviada = normalizada();
+                retorno.devolver(JSON.parse(enviada));
+                botao.disabled = true;
+            });
+        }
+
+        function cartao(pai, serie, de, ate) {
+            // Média do último ano do recorte, como os st.metric que havia antes
+            var anual = mediasAnuais(dados.meses, serie.valores, de, ate);
+            var media = anual.anos.length && anual.anos[anual.anos.length - 1] === selecao.fim
+                ? anual.medias[anual.medias.length - 1] : NaN;
+            var caixa = criar("div", { class: "cartao" }, pai);
+            criar("div", {}, caixa, serie.nome + " médio (" + selecao.fim + ")");
+            criar("div", { class: "valor" }, caixa, isNaN(media) ? "—" : media.toFixed(2) + "%");
+            criar("div", { class: "faixa" }, caixa, classificar(faixas[serie.nome], media));
+        }
+
+        function redesenhar() {
+            area.textContent = "";
+            if (botao) botao.disabled = normalizada() === enviada;
+            var de = primeiroMaiorOuIgual(dados.meses, selecao.inicio * 12);
+            var ate = primeiroMaiorOuIgual(dados.meses, selecao.fim * 12 + 12);
+            var escolhidas = series.filter(function (serie) { return selecao.indicadores.indexOf(serie.nome) >= 0; });
+            var largura = Math.max(raiz.clientWidth, 320);
+
+            if (selecao.visao === "comparar") {
+                var linha = criar("div", { class: "linha" }, area);
+                var grafico = criar("div", { class: "grafico" }, linha);
+                criar("h4", {}, grafico, "Evolução Anual dos Indicadores (Média)");
+                var anos = [];
+                var medias = escolhidas.map(function (serie) {
+                    var anual = mediasAnuais(dados.meses, serie.valores, de, ate);
+                    anos = anual.anos;
+                    return { nome: serie.nome, cor: serie.cor, valores: anual.medias };
+                });
+                desenhar(grafico, largura, anos, medias, "linha", String);
+            } else {
+                escolhidas.forEach(function (serie) {
+                    var linha = criar("div", { class: "linha" }, area);
+                    var grafico = criar("div", { class: "grafico" }, linha);
+                    var larguraGrafico = Math.floor(largura * 0.78);
+                    if (selecao.visao === "anual") {
+                        criar("h4", {}, grafico, "Média Anual de " + serie.nome);
+                        var anual = mediasAnuais(dados.meses, serie.valores, de, ate);
+                        desenhar(grafico, larguraGrafico, anual.anos,
+                                 [{ nome: serie.nome, cor: serie.cor, valores: anual.medias }], "barra", String);
+                    } else {
+                        criar("h4", {}, grafico, "Evolução de " + serie.nome);
+                        desenhar(grafico, larguraGrafico, Array.prototype.slice.call(dados.meses.subarray(de, ate)),
+                                 [{ nome: serie.nome, cor: serie.cor, valores: serie.valores.subarray(de, ate) }],
+                                 "linha", rotuloMes);
+                    }
+                    cartao(linha, serie, de, ate);
+                });
+            }
+            if (!escolhidas.length) criar("div", {}, area, "Escolha ao menos um indicador.");
+            retorno.altura(raiz.offsetHeight + 16);
+        }
+
+        var redimensionar = null;
+        window.addEventListener("resize", function () {
+            clearTimeout(redimensionar);
+            redimensionar = setTimeout(function () { if (dados) redesenhar(); }, 100);
+        });
+
+        return {
+            atualizar: function (args) {
+                if (args.versao !== versao) {
+                    var brutos = decodificar(args.dados, args.series.length);
+                    series = args.series.map(function (serie, i) {
+                        return { nome: serie.nome, cor: serie.cor, valores: brutos.series[i] };
+                    });
+                    dados = brutos;
+                    faixas = args.faixas;
+                    versao = args.versao;
+                    if (!selecao) {
+                        // A seleção inicial vem do Python só no primeiro desenho; depois é do navegador
+                        selecao = Object.assign({ visao: "mensal" }, args.selecao);
+                        selecao.indicadores = selecao.indicadores.slice();
+                        enviada = normalizada();
+                    }
+                    var limites = anosDisponiveis();
+                    selecao.inicio = Math.min(Math.max(selecao.inicio, limites[0]), limites[1]);
+                    selecao.fim = Math.min(Math.max(selecao.fim, selecao.inicio), limites[1]);
+                    montarControles();
+                }
+                redesenhar();
+            },
+        };
+    };
+})();
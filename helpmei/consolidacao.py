@@ -0,0 +1,232 @@
+import argparse
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+import pandas as pd
+from helpmei.armazenamento import CODIGO_LIVRO, BancoLivros, DiarioSQLite
+from helpmei.relatorios import LINHAS_DRE, balanco, calcular_demonstracoes
+
+# Consolidação da carteira de um contador: Balanço e DRE de muitos livros,
+# calculados num pool de processos e guardados por versão de cada livro.
+
+logger = logging.getLogger("helpmei.consolidacao")
+
+# Processos do pool; HELPMEI_PROCESSOS=1 calcula tudo no próprio processo
+PROCESSOS = int(os.environ.get("HELPMEI_PROCESSOS", os.cpu_count() or 1))
+
+# Abaixo disso o custo de despachar para o pool não compensa
+LIMIAR_PARALELO = 16
+
+# Lotes por processo: lotes menores equilibram livros de tamanhos diferentes
+LOTES_POR_PROCESSO = 4
+
+# Resultados guardados por (banco, livro, versão, período)
+MAX_RESULTADOS = 20_000
+
+# Uma coluna por linha das demonstrações
+COLUNAS_BALANCO = list(balanco(pd.Series(dtype="float64")))
+COLUNAS_DRE = [rotulo for rotulo, _ in LINHAS_DRE]
+COLUNA_CAIXA = "= Variação de Caixa e Equivalentes"
+COLUNAS = COLUNAS_BALANCO + COLUNAS_DRE + [COLUNA_CAIXA]
+
+# Só entram na carteira livros identificados pelo código da URL (?livro=, ver
+# CODIGO_LIVRO), que já funciona como chave de acesso; livros de usuários
+# autenticados ficam de fora
+
+_resultados = OrderedDict()
+_trava_resultados = threading.Lock()
+
+_pool = None
+_tamanho_pool = None
+_trava_pool = threading.Lock()
+
+# Bancos abertos em cada processo do pool, um por caminho
+_bancos = {}
+
+
+def demonstrativo(diario, inicio=None, fim=None):
+    # Linha da consolidação: valores na ordem de COLUNAS
+    resultado = calcular_demonstracoes(diario, inicio, fim)
+    return (
+        list(resultado["balanco"].values())
+        + resultado["dre"]["Valor"].tolist()
+        + [float(resultado["fluxo_caixa"]["Valor"].iloc[-1])]
+    )
+
+
+def _calcular_lote(caminho, livros, inicio, fim):
+    # Executa nos processos do pool (e no próprio processo, para poucos livros)
+    banco = _bancos.get(caminho)
+    if banco is None:
+        banco = _bancos[caminho] = BancoLivros(caminho)
+    return [demonstrativo(DiarioSQLite(banco, livro_id), inicio, fim) for livro_id in livros]
+
+
+def pool(processos=PROCESSOS):
+    # Um pool por processo do servidor, criado no primeiro uso. spawn em vez de fork:
+    # o servidor do Streamlit tem threads, e fork copiaria travas no meio do uso.
+    global _pool, _tamanho_pool
+    with _trava_pool:
+        if _pool is None or _tamanho_pool != processos:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"))
+            _tamanho_pool = processos
+        return _pool
+
+
+def encerrar_pool():
+    global _pool
+    with _trava_pool:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def calcular(caminho, livros, inicio=None, fim=None, processos=PROCESSOS):
+    if processos <= 1 or len(livros) < LIMIAR_PARALELO:
+        return _calcular_lote(caminho, livros, inicio, fim)
+    tamanho = math.ceil(len(livros) / (processos * LOTES_POR_PROCESSO))
+    lotes = [livros[posicao:posicao + tamanho] for posicao in range(0, len(livros), tamanho)]
+    try:
+        partes = pool(processos).map(_calcular_lote, repeat(caminho), lotes, repeat(inicio), repeat(fim))
+        return [linha for parte in partes for linha in parte]
+    except BrokenProcessPool:
+        # Um processo morreu (ex.: falta de memória): recria o pool na próxima vez
+        logger.warning("Pool da consolidação interrompido; calculando no próprio processo", exc_info=True)
+        encerrar_pool()
+        return _calcular_lote(caminho, livros, inicio, fim)
+
+
+def versoes(banco, livros):
+    # (nome, versão) de cada livro, numa consulta só
+    marcadores = ", ".join("?" * len(livros))
+    return {
+        livro_id: (nome, versao)
+        for livro_id, nome, versao in banco.conexao().execute(
+            f"SELECT id, nome, versao FROM livros WHERE id IN ({marcadores})", tuple(livros)
+        )
+    }
+
+
+def consolidar(banco, livros, inicio=None, fim=None, processos=PROCESSOS):
+    # Comparativo com uma linha por livro (índice = nome). Só vão para o pool os
+    # livros cuja versão mudou desde o último cálculo do mesmo período.
+    if not livros:
+        return pd.DataFrame(columns=COLUNAS, index=pd.Index([], name="Livro"), dtype="float64")
+    inicio = None if inicio is None else pd.Timestamp(inicio).normalize()
+    fim = None if fim is None else pd.Timestamp(fim).normalize()
+    atuais = versoes(banco, livros)
+    livros = [livro_id for livro_id in livros if livro_id in atuais]
+    chaves = {livro_id: (banco.caminho, livro_id, atuais[livro_id][1], inicio, fim) for livro_id in livros}
+
+    with _trava_resultados:
+        faltando = [livro_id for livro_id in livros if chaves[livro_id] not in _resultados]
+    if faltando:
+        calculados = calcular(banco.caminho, faltando, inicio, fim, processos)
+        with _trava_resultados:
+            for livro_id, linha in zip(faltando, calculados):
+                _resultados[chaves[livro_id]] = linha
+    with _trava_resultados:
+        linhas = []
+        for livro_id in livros:
+            _resultados.move_to_end(chaves[livro_id])
+            linhas.append(_resultados[chaves[livro_id]])
+        while len(_resultados) > MAX_RESULTADOS:
+            _resultados.popitem(last=False)
+
+    nomes = pd.Index([atuais[livro_id][0] for livro_id in livros], name="Livro")
+    return pd.DataFrame(linhas, index=nomes, columns=COLUNAS, dtype="float64")
+
+
+def consolidado(comparativo):
+    # As demonstrações são somas por prefixo de conta, então o consolidado é a soma das linhas
+    return comparativo.sum()
+
+
+def livros_da_carteira(banco, contador):
+    return [
+        livro_id for (livro_id,) in banco.conexao().execute(
+            "SELECT c.livro_id FROM carteiras c JOIN livros l ON l.id = c.livro_id "
+            "WHERE c.contador = ? ORDER BY l.nome", (contador,)
+        )
+    ]
+
+
+def adicionar_a_carteira(banco, contador, nome):
+    nome = nome.strip().lower()
+    if not CODIGO_LIVRO.fullmatch(nome):
+        raise ValueError("Informe o código do livro do cliente (os 32 caracteres depois de ?livro= na URL).")
+    if nome == contador:
+        raise ValueError("Esse é o seu próprio livro.")
+    linha = banco.conexao().execute("SELECT id FROM livros WHERE nome = ?", (nome,)).fetchone()
+    if linha is None:
+        raise ValueError("Nenhum livro encontrado com esse código.")
+    with banco.transacao() as conexao:
+        conexao.execute("INSERT OR IGNORE INTO carteiras (contador, livro_id) VALUES (?, ?)", (contador, linha[0]))
+
+
+def remover_da_carteira(banco, contador, livros):
+    with banco.transacao() as conexao:
+        conexao.executemany(
+            "DELETE FROM carteiras WHERE contador = ? AND livro_id = ?", [(contador, livro_id) for livro_id in livros]
+        )
+
+
+def principal(argumentos=None):
+    # Mede a consolidação de uma carteira sintética: primeira vez, de novo sem
+    # mudanças e depois de um lançamento em um dos livros
+    from helpmei.desempenho import gerar_lancamentos
+
+    parser = argparse.ArgumentParser(prog="python -m helpmei.consolidacao",
+                                     description="Mede a consolidação de uma carteira de livros.")
+    parser.add_argument("--livros", type=int, default=500)
+    parser.add_argument("--lancamentos", type=int, default=2_000, help="lançamentos por livro")
+    parser.add_argument("--processos", type=int, default=PROCESSOS)
+    parser.add_argument("--pasta", help="onde guardar o banco (reaproveitado entre execuções)")
+    opcoes = parser.parse_args(argumentos)
+
+    pasta = opcoes.pasta or tempfile.mkdtemp(prefix="helpmei-consolidacao-")
+    banco = BancoLivros(os.path.join(pasta, "carteira.db"))
+    livros = []
+    inicio = time.perf_counter()
+    for numero in range(opcoes.livros):
+        diario = banco.diario(f"{numero:032x}")
+        if len(diario) != opcoes.lancamentos:
+            banco.apagar_livro(f"{numero:032x}")
+            diario = banco.diario(f"{numero:032x}")
+            diario.lancar_lote(list(gerar_lancamentos(opcoes.lancamentos, semente=numero)))
+        livros.append(diario.livro_id)
+    print(f"{opcoes.livros} livros com {opcoes.lancamentos:,} lançamentos prontos em {time.perf_counter() - inicio:,.1f} s")
+
+    if opcoes.processos > 1:
+        inicio = time.perf_counter()
+        list(pool(opcoes.processos).map(abs, range(opcoes.processos)))
+        print(f"pool com {opcoes.processos} processos iniciado em {time.perf_counter() - inicio:,.2f} s")
+
+    periodo = (pd.Timestamp("2025-01-01"), pd.Timestamp("2025-12-31"))
+    for rotulo, antes in (
+        ("primeira consolidação", None),
+        ("sem mudanças", None),
+        ("um livro alterado", lambda: banco.diario(f"{0:032x}").lancar("2025-03-01", "1.1.1.01.01", "3.1.1.01.01", 10.0)),
+    ):
+        if antes:
+            antes()
+        inicio = time.perf_counter()
+        comparativo = consolidar(banco, livros, *periodo, processos=opcoes.processos)
+        print(f"{rotulo:<24}{1000 * (time.perf_counter() - inicio):>10,.1f} ms")
+    total = consolidado(comparativo)
+    print(f"Resultado consolidado de 2025: R$ {total['= Resultado Líquido do Período']:,.2f}")
+    encerrar_pool()
+
+
+if __name__ == "__main__":
+    principal()
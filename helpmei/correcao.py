@@ -0,0 +1,165 @@
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from helpmei.diario import Diario
+
+# Valores em reais constantes pelo IPCA. O índice encadeia a variação mensal
+# (série 433 do SGS, coluna "IPCA mensal" dos indicadores publicados), partindo
+# de 100 no primeiro mês. Sem a série, os relatórios seguem nominais.
+COLUNA_IPCA = "IPCA mensal"
+BASE_INDICE = 100.0
+
+logger = logging.getLogger("helpmei.correcao")
+
+# Índices prontos por versão dos indicadores e visões corrigidas por
+# (livro, versão do livro, mês-base, versão dos indicadores)
+MAX_INDICES = 4
+MAX_VISOES = 16
+
+_indices = OrderedDict()
+_visoes = OrderedDict()
+_trava = threading.Lock()
+
+
+def _guardar(cache, chave, valor, maximo):
+    with _trava:
+        cache[chave] = valor
+        cache.move_to_end(chave)
+        while len(cache) > maximo:
+            cache.popitem(last=False)
+    return valor
+
+
+def _buscar(cache, chave):
+    with _trava:
+        if chave in cache:
+            cache.move_to_end(chave)
+            return cache[chave]
+    return None
+
+
+def indice_ipca(df, versao):
+    # Colunas "Mês" (primeiro dia) e "Índice", em ordem de data
+    indice = _buscar(_indices, versao)
+    if indice is not None:
+        return indice
+    if COLUNA_IPCA in df:
+        serie = df[["Date", COLUNA_IPCA]].dropna().sort_values("Date")
+    else:
+        serie = pd.DataFrame({"Date": pd.Series(dtype="datetime64[ns]"), COLUNA_IPCA: pd.Series(dtype="float64")})
+    indice = pd.DataFrame({
+        "Mês": serie["Date"].to_numpy("datetime64[ns]"),
+        "Índice": BASE_INDICE * np.cumprod(1 + serie[COLUNA_IPCA].to_numpy("float64") / 100),
+    })
+    return _guardar(_indices, versao, indice, MAX_INDICES)
+
+
+def mes_base(data):
+    return pd.Timestamp(data).normalize().replace(day=1)
+
+
+def indice_em(indice, data):
+    # Último mês publicado até a data; antes do primeiro, o primeiro. None sem índice
+    if indice.empty:
+        return None
+    posicao = indice["Mês"].searchsorted(pd.Timestamp(data), side="right") - 1
+    return float(indice["Índice"].iloc[max(posicao, 0)])
+
+
+def corrigir(partidas, indice, base):
+    # Valor de cada partida em reais do mês-base: merge_asof das datas contra o
+    # índice e um fator por linha. As partidas de um lançamento têm a mesma data,
+    # então cada lançamento continua fechando depois da correção.
+    if indice.empty:
+        logger.warning("Índice do IPCA vazio: valores mantidos nominais")
+        return partidas
+    ordenadas = partidas.sort_values("Data", kind="stable")
+    juntas = pd.merge_asof(
+        ordenadas[["Data"]].astype({"Data": "datetime64[ns]"}), indice, left_on="Data", right_on="Mês",
+    )
+    indices = juntas["Índice"].fillna(indice["Índice"].iloc[0]).to_numpy()
+    fator = indice_em(indice, base) / indices
+    return ordenadas.assign(Valor=ordenadas["Valor"].to_numpy("float64") * fator).sort_index()
+
+
+class DiarioCorrigido(Diario):
+    # Visão somente leitura de um diário em reais constantes do mês-base. As
+    # consultas do Diario em memória partem todas de partidas(), então saldos,
+    # demonstrações e razonetes servem sem mudança.
+
+    def __init__(self, diario, partidas, base, versao):
+        super().__init__()
+        self.id = f"{diario.id}@{base:%Y-%m}"
+        self.versao = versao
+        self.base = base
+        self._corrigidas = partidas
+
+    def partidas(self):
+        return self._corrigidas
+
+    def lancar_lote(self, lancamentos):
+        raise ValueError("Valores corrigidos são somente leitura: lance no livro nominal.")
+
+
+def diario_corrigido(diario, df, versao_indicadores, base):
+    base = mes_base(base)
+    versao = diario.versao
+    chave = (diario.id, versao, base, versao_indicadores)
+    visao = _buscar(_visoes, chave)
+    if visao is not None:
+        return visao
+    indice = indice_ipca(df, versao_indicadores)
+    if indice.empty:
+        logger.warning("Índice do IPCA vazio: relatórios de %s seguem nominais", diario.id)
+        return diario
+    visao = DiarioCorrigido(
+        diario, corrigir(diario.partidas(), indice, base), base, (versao, f"{base:%Y-%m}", versao_indicadores),
+    )
+    return _guardar(_visoes, chave, visao, MAX_VISOES)
+
+
+def principal(argumentos=None):
+    # Mede a correção de um livro sintético: primeira visão (merge_asof de todas
+    # as partidas), a mesma visão de novo e o balanço e a DRE corrigidos
+    from helpmei.armazenamento import BancoLivros
+    from helpmei.desempenho import montar_livro
+    from helpmei.indicadores import load_data, obter_fixture_sgs
+    from helpmei.publicacao import versao_conteudo
+    from helpmei.relatorios import calcular_demonstracoes
+
+    parser = argparse.ArgumentParser(prog="python -m helpmei.correcao",
+                                     description="Mede a correção do diário pelo IPCA.")
+    parser.add_argument("--lancamentos", type=int, default=100_000)
+    parser.add_argument("--base", default="2025-12-01", help="mês-base dos reais constantes")
+    parser.add_argument("--pasta", help="onde guardar o banco (reaproveitado entre execuções)")
+    opcoes = parser.parse_args(argumentos)
+
+    pasta = opcoes.pasta or tempfile.mkdtemp(prefix="helpmei-correcao-")
+    banco = BancoLivros(os.path.join(pasta, "correcao.db"))
+    diario = banco.diario(montar_livro(banco, opcoes.lancamentos))
+    df = load_data(obter_fixture_sgs())
+    versao = versao_conteudo(df)
+    diario.partidas()
+
+    for rotulo, medir in (
+        ("primeira visão", lambda: diario_corrigido(diario, df, versao, opcoes.base)),
+        ("visão guardada", lambda: diario_corrigido(diario, df, versao, opcoes.base)),
+        ("balanço, DRE e fluxo", lambda: calcular_demonstracoes(
+            diario_corrigido(diario, df, versao, opcoes.base), None, None)),
+    ):
+        inicio = time.perf_counter()
+        resultado = medir()
+        print(f"{rotulo:<28}{1000 * (time.perf_counter() - inicio):>10,.1f} ms")
+    nominal = calcular_demonstracoes(diario)["balanco"]["Ativo Total"]
+    print(f"Ativo total: nominal R$ {nominal:,.2f}, em reais de {mes_base(opcoes.base):%m/%Y} "
+          f"R$ {resultado['balanco']['Ativo Total']:,.2f}")
+
+
+if __name__ == "__main__":
+    principal()
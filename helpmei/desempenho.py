@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+import numpy as np
+import pandas as pd
+from helpmei.armazenamento import BancoLivros
+from helpmei.indicadores import (
+    INDICADORES,
+    SERIES_AUXILIARES,
+    SERIES_BACEN,
+    caminho_fixture_sgs,
+    classificar_indicador,
+    load_data,
+    medias_anuais,
+    tendencia,
+)
+from helpmei.relatorios import balanco
+from helpmei.sgs import ler_sgs
+
+# Quantidades de lançamentos nos casos do livro
+TAMANHOS = (10, 1_000, 100_000, 1_000_000)
+REPETICOES = 5
+
+# Regressão: mais lento que a base nessa proporção e acima do piso de ruído
+TOLERANCIA = 0.25
+PISO_MS = 1.0
+
+CAMINHO_BASE = os.path.join(os.path.dirname(__file__), "fixtures", "desempenho_base.json")
+
+# Operações típicas de um MEI: (débito, crédito, valor médio)
+OPERACOES = [
+    ("1.1.1.01.01", "3.1.1.01.01", 350.0),   # serviço recebido em dinheiro
+    ("1.1.2.01.01", "3.1.1.01.02", 900.0),   # venda a prazo
+    ("1.1.1.01.01", "1.1.2.01.01", 900.0),   # recebimento de cliente
+    ("1.1.3.01.01", "2.1.2.01.01", 600.0),   # compra de mercadorias a prazo
+    ("2.1.2.01.01", "1.1.1.01.01", 600.0),   # pagamento a fornecedor
+    ("3.2.1.01.02", "1.1.3.01.01", 450.0),   # baixa do custo da mercadoria vendida
+    ("3.3.1.01.01", "1.1.1.01.01", 1_500.0), # salários
+]
+
+# Lançamentos gravados por transação ao montar os livros grandes
+LOTE = 100_000
+
+
+def obter_em_memoria():
+    # Fixtures lidas uma vez: o caso mede só a conversão e a junção das séries
+    gravados = {}
+    for codigo in [*SERIES_BACEN.values(), *SERIES_AUXILIARES.values()]:
+        if os.path.isfile(caminho_fixture_sgs(codigo)):
+            with open(caminho_fixture_sgs(codigo), "rb") as arquivo:
+                gravados[str(codigo)] = arquivo.read()
+
+    class Resposta:
+        def __init__(self, conteudo):
+            self.content = conteudo
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return json.loads(self.content)
+
+    def obter(url, timeout=None):
+        codigo = url.split("bcdata.sgs.")[1].split("/")[0]
+        if codigo not in gravados:
+            raise FileNotFoundError(caminho_fixture_sgs(codigo))
+        return Resposta(gravados[codigo])
+
+    return obter
+
+
+def serie_diaria(anos=20, semente=0):
+    # Resposta do SGS para uma série diária (dias úteis) de `anos` anos
+    gerador = np.random.default_rng(semente)
+    datas = pd.bdate_range(end="2025-12-31", periods=252 * anos)
+    valores = np.round(np.abs(10 + np.cumsum(gerador.normal(0, 0.05, len(datas)))), 6)
+    return json.dumps(
+        [{"data": f"{data:%d/%m/%Y}", "valor": f"{valor:.6f}"} for data, valor in zip(datas, valores)],
+        separators=(",", ":"),
+    ).encode()
+
+
+def gerar_lancamentos(quantidade, semente=0):
+    # Lançamentos simples distribuídos entre 2020 e 2025, sempre os mesmos para a mesma semente
+    gerador = np.random.default_rng(semente)
+    operacoes = gerador.integers(len(OPERACOES), size=quantidade)
+    fatores = np.round(gerador.uniform(0.2, 1.8, size=quantidade), 2)
+    dias = gerador.integers(0, (date(2025, 12, 31) - date(2020, 1, 1)).days, size=quantidade)
+    datas = pd.Timestamp("2020-01-01") + pd.to_timedelta(np.sort(dias), unit="D")
+    for data, operacao, fator in zip(datas.date, operacoes.tolist(), fatores.tolist()):
+        debito, credito, medio = OPERACOES[operacao]
+        valor = round(medio * fator, 2)
+        yield data, [(debito, valor), (credito, -valor)], ""
+
+
+def montar_livro(banco, quantidade):
+    diario = banco.diario(f"desempenho-{quantidade}")
+    if len(diario) != quantidade:
+        # O registro só cresce: um livro pela metade é apagado e montado de novo
+        banco.apagar_livro(f"desempenho-{quantidade}")
+        diario = banco.diario(f"desempenho-{quantidade}")
+        lote = []
+        for lancamento in gerar_lancamentos(quantidade):
+            lote.append(lancamento)
+            if len(lote) == LOTE:
+                diario.lancar_lote(lote)
+                lote = []
+        if lote:
+            diario.lancar_lote(lote)
+    return f"desempenho-{quantidade}"
+
+
+def cronometrar(executar, repeticoes=REPETICOES):
+    # Mediana e mínimo de várias execuções; o pico de memória vem de uma execução à parte
+    # com tracemalloc, que deixaria as medidas de tempo mais lentas. O tracemalloc vê o heap
+    # do Python, do NumPy e do pandas; a memória interna do SQLite fica de fora.
+    executar()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar()
+        tempos.append(1000 * (time.perf_counter() - inicio))
+    tracemalloc.start()
+    try:
+        executar()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ms": statistics.median(tempos), "min_ms": min(tempos), "pico_mb": pico / 2**20}
+
+
+def casos_painel():
+    obter = obter_em_memoria()
+    df = load_data(obter)
+    ano = int(df["Ano"].max())
+
+    def agregacoes():
+        medias_anuais(df, INDICADORES)
+        for indicador in INDICADORES:
+            medias_anuais(df, indicador)
+            df[df["Ano"] == ano][indicador].mean()
+        for x in INDICADORES:
+            for y in INDICADORES:
+                if x != y:
+                    df[x].corr(df[y])
+                    tendencia(df, x, y)
+
+    def classificar():
+        for indicador in INDICADORES:
+            [classificar_indicador(indicador, valor) for valor in df[indicador].tolist()]
+
+    diaria = serie_diaria()
+    yield "ler_sgs_diaria_20_anos", 252 * 20, lambda: ler_sgs(diaria)
+
+    linhas = len(df)
+    yield "load_data", linhas, lambda: load_data(obter)
+    yield "agregacoes_painel", linhas, agregacoes
+    yield "classificar_indicador", linhas, classificar
+
+
+def casos_livro(banco, tamanhos):
+    # Mesmas operações de calcular_saldos e gerar_relatorio_patrimonio na Calculadora;
+    # um DiarioSQLite novo a cada chamada, sem os agregados memorizados da sessão
+    ate = date(2025, 6, 30)
+    for quantidade in tamanhos:
+        inicio = time.perf_counter()
+        nome = montar_livro(banco, quantidade)
+        print(f"  livro com {quantidade:,} lançamentos pronto em {time.perf_counter() - inicio:,.1f} s", file=sys.stderr)
+        yield "calcular_saldos", quantidade, lambda nome=nome: banco.diario(nome).saldos(ate=ate).to_dict()
+        yield "gerar_relatorio_patrimonio", quantidade, lambda nome=nome: balanco(banco.diario(nome).saldos(ate=ate))
+
+
+def executar_bancada(tamanhos=TAMANHOS, repeticoes=REPETICOES, pasta=None, casos=None):
+    # Devolve {"caso@tamanho": {"ms", "min_ms", "pico_mb"}}
+    pasta = pasta or tempfile.mkdtemp(prefix="helpmei-desempenho-")
+    banco = BancoLivros(os.path.join(pasta, "desempenho.db"))
+    resultados = {}
+    for gerador in (casos_painel(), casos_livro(banco, tamanhos)):
+        for nome, tamanho, executar in gerador:
+            if casos and nome not in casos:
+                continue
+            resultados[f"{nome}@{tamanho}"] = cronometrar(executar, repeticoes)
+    return resultados
+
+
+def ambiente():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "maquina": platform.machine(),
+        "processador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def ler_base(caminho=CAMINHO_BASE):
+    if not os.path.isfile(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_base(resultados, caminho=CAMINHO_BASE):
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump({"ambiente": ambiente(), "resultados": resultados}, arquivo, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def comparar(resultados, base, tolerancia=TOLERANCIA):
+    # Uma linha por caso, com a razão contra a base; devolve (linhas, regressões)
+    linhas = [f"{'caso':<42}{'mediana':>12}{'mínimo':>12}{'pico':>11}{'base':>12}{'razão':>8}"]
+    regressoes = []
+    anteriores = (base or {}).get("resultados", {})
+    for chave, medida in resultados.items():
+        anterior = anteriores.get(chave)
+        linha = f"{chave:<42}{medida['ms']:>9,.2f} ms{medida['min_ms']:>9,.2f} ms{medida['pico_mb']:>8,.2f} MB"
+        if anterior:
+            razao = medida["ms"] / anterior["ms"] if anterior["ms"] else float("inf")
+            linha += f"{anterior['ms']:>9,.2f} ms{razao:>7.2f}x"
+            if razao > 1 + tolerancia and medida["ms"] - anterior["ms"] > PISO_MS:
+                regressoes.append(chave)
+                linha += "  ← regressão"
+        linhas.append(linha)
+    return linhas, regressoes
+
+
+def principal(argumentos=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m helpmei.desempenho",
+        description="Bancada de desempenho do Help MEI com as séries gravadas do BACEN.",
+    )
+    parser.add_argument("--tamanhos", default=",".join(str(t) for t in TAMANHOS),
+                        help="quantidades de lançamentos, separadas por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--casos", help="só estes casos, separados por vírgula")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--pasta", help="onde guardar os livros de teste (reaproveitados entre execuções)")
+    parser.add_argument("--gravar-base", action="store_true", help="grava os resultados como nova base")
+    opcoes = parser.parse_args(argumentos)
+
+    tamanhos = [int(tamanho) for tamanho in opcoes.tamanhos.split(",") if tamanho]
+    casos = set(opcoes.casos.split(",")) if opcoes.casos else None
+    resultados = executar_bancada(tamanhos, opcoes.repeticoes, opcoes.pasta, casos)
+
+    linhas, regressoes = comparar(resultados, ler_base(), opcoes.tolerancia)
+    print("\n".join(linhas))
+    if opcoes.gravar_base:
+        gravar_base(resultados)
+        print(f"Base gravada em {os.path.relpath(CAMINHO_BASE)}")
+        return 0
+    if regressoes:
+        print(f"{len(regressoes)} caso(s) acima da tolerância de {opcoes.tolerancia:.0%}: {', '.join(regressoes)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # python -m helpmei.desempenho: roda a bancada e compara com a base gravada
+    sys.exit(principal())
@@ -0,0 +1,276 @@
+import uuid
+import numpy as np
+import pandas as pd
+
+# Colunas da visão do diário: um lançamento por linha
+COLUNAS = ["Data", "Histórico", "Débito", "Crédito", "Valor"]
+
+# Partidas de um lançamento: valor positivo é débito, negativo é crédito
+COLUNAS_PARTIDAS = ["Lançamento", "Data", "Conta", "Valor"]
+
+# Separador das contas na visão de um lançamento com várias partidas
+SEPARADOR_CONTAS = "; "
+
+
+class Diario:
+    # Livro diário guardado em colunas: cabeçalho dos lançamentos de um lado,
+    # partidas (débitos e créditos) do outro. Cada alteração incrementa
+    # `versao`, que é a chave de todos os resultados memorizados abaixo.
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.versao = 0
+        self._lancamentos = {"Data": [], "Histórico": [], "Valor": []}
+        self._partidas = {coluna: [] for coluna in COLUNAS_PARTIDAS}
+        self._fechamentos = {}
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._lancamentos["Valor"])
+
+    def lancar(self, data, debito, credito, valor, historico=""):
+        self.lancar_lote([(data, [(debito, valor), (credito, -valor)], historico)])
+
+    def lancar_composto(self, data, debitos, creditos, historico=""):
+        # debitos e creditos: listas de (conta, valor) com valores positivos
+        partidas = [(conta, valor) for conta, valor in debitos] + [(conta, -valor) for conta, valor in creditos]
+        self.lancar_lote([(data, partidas, historico)])
+
+    def lancar_lote(self, lancamentos):
+        # Valida o lote inteiro antes de gravar: ou entram todos os lançamentos, ou nenhum
+        datas, historicos, indices, contas, valores = validar_lote(lancamentos)
+        verificar_periodo_aberto(self, datas)
+        primeiro = len(self)
+        totais = np.bincount(indices, weights=np.clip(valores, 0, None), minlength=len(datas))
+        self._lancamentos["Data"].extend(datas)
+        self._lancamentos["Histórico"].extend(historicos)
+        self._lancamentos["Valor"].extend(totais.tolist())
+        self._partidas["Lançamento"].extend((indices + primeiro).tolist())
+        self._partidas["Data"].extend(datas[i] for i in indices)
+        self._partidas["Conta"].extend(contas)
+        self._partidas["Valor"].extend(valores.tolist())
+        self._nova_versao()
+
+    def limpar(self):
+        self._lancamentos = {"Data": [], "Histórico": [], "Valor": []}
+        self._partidas = {coluna: [] for coluna in COLUNAS_PARTIDAS}
+        self._fechamentos = {}
+        self._nova_versao()
+
+    def _nova_versao(self):
+        self.versao += 1
+        self._cache = {}
+
+    def _memorizar(self, chave, funcao):
+        if chave not in self._cache:
+            self._cache[chave] = funcao()
+        return self._cache[chave]
+
+    def partidas(self):
+        def montar():
+            return pd.DataFrame({
+                "Lançamento": pd.Series(self._partidas["Lançamento"], dtype="int64"),
+                "Data": pd.to_datetime(pd.Series(self._partidas["Data"], dtype="object")),
+                "Conta": pd.Series(self._partidas["Conta"], dtype="string"),
+                "Valor": pd.Series(self._partidas["Valor"], dtype="float64"),
+            })
+        return self._memorizar("partidas", montar)
+
+    def frame(self):
+        def montar():
+            df = pd.DataFrame({
+                "Data": pd.to_datetime(pd.Series(self._lancamentos["Data"], dtype="object")),
+                "Histórico": pd.Series(self._lancamentos["Histórico"], dtype="string"),
+                "Valor": pd.Series(self._lancamentos["Valor"], dtype="float64"),
+            })
+            df.index.name = "Lançamento"
+            contas = contas_por_lancamento(self.partidas())
+            return df.join(contas)[COLUNAS]
+        return self._memorizar("frame", montar)
+
+    def totais_entre(self, depois_de=None, ate=None):
+        # Débitos e créditos por conta com depois_de < data <= ate
+        def calcular():
+            partidas = self.partidas()
+            mascara = pd.Series(True, index=partidas.index)
+            if depois_de is not None:
+                mascara &= partidas["Data"] > pd.Timestamp(depois_de)
+            if ate is not None:
+                mascara &= partidas["Data"] <= pd.Timestamp(ate)
+            return totais_por_conta(partidas[mascara])[["Débitos", "Créditos"]]
+        return self._memorizar(("totais", depois_de, ate), calcular)
+
+    def periodos_fechados(self):
+        return sorted(self._fechamentos)
+
+    def saldos_fechamento(self, fim):
+        return self._fechamentos[fim]
+
+    def saldos(self, ate=None):
+        # Saldo por conta: débitos (positivos) menos créditos
+        return self._memorizar(("saldos", ate), lambda: saldos_ate(self, ate))
+
+    def fechar_periodo(self, fim):
+        fim = validar_fechamento(self, fim)
+        self._fechamentos[fim] = self.saldos(ate=fim)
+        self._nova_versao()
+
+    def reabrir_periodo(self):
+        if self._fechamentos:
+            del self._fechamentos[max(self._fechamentos)]
+            self._nova_versao()
+
+    def resumo_contas(self):
+        # Totais por conta, base da lista de razonetes
+        return self._memorizar("resumo", lambda: totais_por_conta(self.partidas()))
+
+    def movimentos(self, conta, inicio=0, fim=None):
+        # Lados débito e crédito de uma conta, na ordem de lançamento, recortados em [inicio, fim)
+        def separar():
+            partidas = self.partidas()
+            da_conta = partidas[partidas["Conta"] == conta]
+            debitos = da_conta[da_conta["Valor"] > 0]
+            creditos = da_conta[da_conta["Valor"] < 0]
+            return {
+                'débito': debitos[["Data", "Valor"]],
+                'crédito': creditos[["Data"]].assign(Valor=-creditos["Valor"]),
+            }
+        lados = self._memorizar(("movimentos", conta), separar)
+        return {lado: movimentos.iloc[inicio:fim] for lado, movimentos in lados.items()}
+
+    def consultar(self, ordenar_por="Lançamento", crescente=True, conta=None,
+                  inicio=None, fim=None, pagina=0, tamanho=50):
+        # Filtra e ordena no servidor, devolvendo só a página pedida e o total de linhas
+        def preparar():
+            df = self.frame()
+            mascara = pd.Series(True, index=df.index)
+            if conta:
+                partidas = self.partidas()
+                mascara &= df.index.isin(partidas.loc[partidas["Conta"] == conta, "Lançamento"])
+            if inicio is not None:
+                mascara &= df["Data"] >= pd.Timestamp(inicio)
+            if fim is not None:
+                mascara &= df["Data"] <= pd.Timestamp(fim)
+            filtrado = df[mascara]
+            if ordenar_por == "Lançamento":
+                return filtrado if crescente else filtrado.iloc[::-1]
+            return filtrado.sort_values(ordenar_por, ascending=crescente, kind="stable")
+
+        resultado = self._memorizar(("consulta", ordenar_por, crescente, conta, inicio, fim), preparar)
+        inicio_pagina = pagina * tamanho
+        return resultado.iloc[inicio_pagina:inicio_pagina + tamanho], len(resultado)
+
+
+def validar_lote(lancamentos):
+    # Achata o lote em arrays e confere as partidas dobradas de todos os
+    # lançamentos de uma vez. Cada lançamento é (data, [(conta, valor), ...], histórico).
+    datas, historicos, indices, contas, valores = [], [], [], [], []
+    for posicao, (data, partidas, historico) in enumerate(lancamentos):
+        datas.append(data)
+        historicos.append(historico or "")
+        for conta, valor in partidas:
+            indices.append(posicao)
+            contas.append(conta)
+            valores.append(valor)
+    if not datas:
+        raise ValueError("Nenhum lançamento informado.")
+
+    indices = np.asarray(indices, dtype=np.int64)
+    valores = np.round(np.asarray(valores, dtype=np.float64), 2)
+    if not all(contas):
+        raise ValueError("Todas as partidas precisam de uma conta.")
+    if (valores == 0).any():
+        raise ValueError("As partidas não podem ter valor zero.")
+
+    quantidade = len(datas)
+    diferenca = np.bincount(indices, weights=valores, minlength=quantidade)
+    debitos = np.bincount(indices, weights=valores > 0, minlength=quantidade)
+    creditos = np.bincount(indices, weights=valores < 0, minlength=quantidade)
+    sem_par = np.flatnonzero((debitos == 0) | (creditos == 0))
+    if sem_par.size:
+        raise ValueError(f"Lançamento {sem_par[0] + 1} do lote precisa de ao menos um débito e um crédito.")
+    desequilibrados = np.flatnonzero(np.abs(diferenca) >= 0.005)
+    if desequilibrados.size:
+        posicao = desequilibrados[0]
+        raise ValueError(
+            f"Lançamento {posicao + 1} do lote não fecha: débitos e créditos diferem em "
+            f"R$ {abs(diferenca[posicao]):,.2f}."
+        )
+    return datas, historicos, indices, contas, valores
+
+
+def totais_por_conta(partidas):
+    # Débitos, créditos e quantidade de partidas de cada lado, por conta
+    valores = partidas["Valor"]
+    tabela = pd.DataFrame({
+        "Conta": partidas["Conta"],
+        "Débitos": valores.clip(lower=0),
+        "Créditos": (-valores).clip(lower=0),
+        "Qtd D": (valores > 0).astype("int64"),
+        "Qtd C": (valores < 0).astype("int64"),
+    })
+    resumo = tabela.groupby("Conta").sum()
+    resumo.index.name = "Código"
+    return resumo.sort_index()
+
+
+def contas_por_lancamento(partidas):
+    # Contas debitadas e creditadas de cada lançamento, unidas por SEPARADOR_CONTAS
+    debitos = partidas[partidas["Valor"] > 0].groupby("Lançamento")["Conta"].agg(SEPARADOR_CONTAS.join)
+    creditos = partidas[partidas["Valor"] < 0].groupby("Lançamento")["Conta"].agg(SEPARADOR_CONTAS.join)
+    return pd.DataFrame({"Débito": debitos, "Crédito": creditos}).astype("string")
+
+
+def fim_do_mes(data):
+    return pd.Timestamp(data).normalize() + pd.offsets.MonthEnd(0)
+
+
+def fechado_ate(diario):
+    periodos = diario.periodos_fechados()
+    return periodos[-1] if periodos else None
+
+
+def verificar_periodo_aberto(diario, datas):
+    # Lançamentos em período fechado invalidariam os saldos guardados no fechamento
+    limite = fechado_ate(diario)
+    if limite is not None and any(pd.Timestamp(data) <= limite for data in datas):
+        raise ValueError(f"Período fechado até {limite:%d/%m/%Y}. Reabra o período para lançar nessa data.")
+
+
+def validar_fechamento(diario, fim):
+    fim = pd.Timestamp(fim).normalize()
+    limite = fechado_ate(diario)
+    if limite is not None and fim <= limite:
+        raise ValueError(f"O período até {limite:%d/%m/%Y} já está fechado.")
+    return fim
+
+
+def saldos_ate(diario, ate=None):
+    # Parte do fechamento mais recente anterior a `ate` e soma só os lançamentos depois dele
+    ate = None if ate is None else pd.Timestamp(ate).normalize()
+    anteriores = [fim for fim in diario.periodos_fechados() if ate is None or fim <= ate]
+    base = pd.Series(dtype="float64")
+    depois_de = None
+    if anteriores:
+        depois_de = anteriores[-1]
+        base = diario.saldos_fechamento(depois_de)
+    totais = diario.totais_entre(depois_de, ate)
+    saldos = base.add(totais["Débitos"] - totais["Créditos"], fill_value=0.0)
+    return saldos.rename("Valor")
+
+
+def movimento_periodo(diario, inicio, fim):
+    # Saldo inicial, débitos, créditos e saldo final de cada conta em [inicio, fim]
+    inicio = pd.Timestamp(inicio).normalize()
+    fim = pd.Timestamp(fim).normalize()
+    vespera = inicio - pd.Timedelta(days=1)
+    abertura = diario.saldos(ate=vespera)
+    totais = diario.totais_entre(vespera, fim)
+    df = pd.DataFrame({
+        "Saldo inicial": abertura,
+        "Débitos": totais["Débitos"],
+        "Créditos": totais["Créditos"],
+    }).fillna(0.0)
+    df["Saldo final"] = df["Saldo inicial"] + df["Débitos"] - df["Créditos"]
+    df.index.name = "Código"
+    return df.sort_index()
@@ -0,0 +1,168 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Empréstimos e financiamentos: os cronogramas Price e SAC de todos os cenários
+# (sistema × prazo × taxa × spread) saem juntos, em matrizes cenário × mês com
+# zeros depois do prazo. As taxas partem da SELIC publicada (% a.a.) mais o
+# spread do banco; o contrato escolhido é lançado no livro da calculadora.
+
+SISTEMAS = {"Price": "Tabela Price (parcelas iguais)", "SAC": "SAC (amortização constante)"}
+PRAZOS = [12, 24, 36, 48, 60]
+SPREADS = [4.0, 6.0, 10.0, 20.0]
+
+# Janela das referências de SELIC (média, mínima e máxima)
+MESES_REFERENCIA = 12
+
+CONTA_EMPRESTIMO = "2.1.3.01.02"
+CONTA_JUROS = "3.4.1.01.01"
+CONTA_BANCO = "1.1.1.02.01"
+
+COLUNAS_CRONOGRAMA = ["Parcela", "Juros", "Amortização", "Saldo"]
+
+
+def taxas_selic(df, meses=MESES_REFERENCIA):
+    # Referências de taxa (% a.a.) tiradas da série 4189, do mês mais recente
+    serie = df.sort_values("Date")["SELIC"].dropna().to_numpy("float64")
+    if not len(serie):
+        raise ValueError("Nenhuma SELIC publicada para calcular os juros.")
+    janela = serie[-meses:]
+    return {
+        "SELIC atual": float(serie[-1]),
+        f"Média de {meses} meses": float(janela.mean()),
+        f"Mínima de {meses} meses": float(janela.min()),
+        f"Máxima de {meses} meses": float(janela.max()),
+    }
+
+
+def taxa_mensal(taxa_anual):
+    return (1 + np.asarray(taxa_anual, dtype="float64") / 100) ** (1 / 12) - 1
+
+
+def cronogramas(valor, prazos, taxas, price):
+    # prazos, taxas mensais e price (bool): um elemento por cenário. Cada saída é
+    # uma matriz (cenários, maior prazo) sem laço sobre cenários nem meses.
+    prazos = np.asarray(prazos, dtype="int64")
+    if not len(prazos) or prazos.min() < 1:
+        raise ValueError("Informe prazos de pelo menos 1 mês.")
+    if valor <= 0:
+        raise ValueError("O valor financiado precisa ser positivo.")
+    meses = np.arange(1, prazos.max() + 1)
+    n = prazos[:, None].astype("float64")
+    i = np.asarray(taxas, dtype="float64")[:, None]
+    price = np.asarray(price, dtype=bool)[:, None]
+    ativo = meses <= n
+
+    # Price: parcela fixa; o saldo no início do mês k é o valor capitalizado menos
+    # as parcelas pagas capitalizadas. Com taxa zero, as duas regras viram valor / n.
+    crescimento = (1 + i) ** (meses - 1)
+    com_juros = i > 0
+    divisor = np.where(com_juros, i, 1.0)
+    parcela_price = np.where(com_juros, valor * divisor / (1 - (1 + divisor) ** -n), valor / n)
+    saldo_price = np.where(com_juros, valor * crescimento - parcela_price * (crescimento - 1) / divisor,
+                           valor - parcela_price * (meses - 1))
+    # SAC: amortização fixa, juros sobre o saldo que sobra
+    saldo_sac = valor - valor / n * (meses - 1)
+
+    saldo_inicial = np.where(price, saldo_price, saldo_sac)
+    juros = saldo_inicial * i * ativo
+    amortizacao = np.where(price, parcela_price - juros, valor / n) * ativo
+    return {
+        "Parcela": juros + amortizacao,
+        "Juros": juros,
+        "Amortização": amortizacao,
+        "Saldo": np.clip(saldo_inicial - amortizacao, 0.0, None) * ativo,
+    }
+
+
+def cenarios(valor, taxas, prazos=PRAZOS, spreads=SPREADS, sistemas=SISTEMAS):
+    # Uma linha por combinação; taxas: {rótulo: SELIC % a.a.}, como em taxas_selic
+    if not taxas or not len(spreads) or not sistemas:
+        raise ValueError("Escolha ao menos uma taxa, um spread e um sistema de amortização.")
+    nomes = np.array(list(sistemas))
+    rotulos = np.array(list(taxas))
+    selic = np.array(list(taxas.values()), dtype="float64")
+    eixos = np.meshgrid(np.arange(len(nomes)), np.asarray(prazos, dtype="int64"), np.arange(len(rotulos)),
+                        np.asarray(spreads, dtype="float64"), indexing="ij")
+    sistema, prazo, referencia, spread = (eixo.ravel() for eixo in eixos)
+    anual = selic[referencia] + spread
+    tabela = cronogramas(valor, prazo, taxa_mensal(anual), nomes[sistema] == "Price")
+    parcelas = tabela["Parcela"]
+    return pd.DataFrame({
+        "Sistema": nomes[sistema],
+        "Prazo": prazo,
+        "Referência": rotulos[referencia],
+        "SELIC": selic[referencia],
+        "Spread": spread,
+        "Taxa a.a.": anual,
+        "Primeira parcela": parcelas[:, 0],
+        "Última parcela": parcelas[np.arange(len(prazo)), prazo - 1],
+        "Total de juros": tabela["Juros"].sum(axis=1),
+        "Total pago": parcelas.sum(axis=1),
+    })
+
+
+def cronograma(valor, prazo, taxa_anual, sistema, inicio=None):
+    # Cronograma de um contrato, com o vencimento de cada parcela quando há `inicio`
+    tabela = cronogramas(valor, [prazo], taxa_mensal([taxa_anual]), [sistema == "Price"])
+    df = pd.DataFrame({coluna: tabela[coluna][0] for coluna in COLUNAS_CRONOGRAMA},
+                      index=pd.RangeIndex(1, prazo + 1, name="Parcela nº"))
+    if inicio is not None:
+        df.insert(0, "Vencimento", [pd.Timestamp(inicio) + pd.DateOffset(months=mes) for mes in df.index])
+    return df
+
+
+def lancamentos_contrato(valor, prazo, taxa_anual, sistema, data, ate=None):
+    # Contratação (D bancos / C empréstimos) e as parcelas vencidas até `ate`
+    # (D empréstimos e juros / C bancos). A amortização é arredondada pelo
+    # acumulado, para as parcelas somarem exatamente o valor financiado.
+    tabela = cronograma(valor, prazo, taxa_anual, sistema, inicio=data)
+    amortizacao = np.diff(np.round(tabela["Amortização"].cumsum().to_numpy(), 2), prepend=0.0)
+    juros = np.round(tabela["Juros"].to_numpy(), 2)
+    descricao = f"{sistema} {prazo}x a {taxa_anual:.2f}".replace(".", ",") + "% a.a."
+    lote = [(data, [(CONTA_BANCO, valor), (CONTA_EMPRESTIMO, -valor)], f"Empréstimo contratado: {descricao}")]
+    limite = None if ate is None else pd.Timestamp(ate)
+    for numero, vencimento, amortizado, juro in zip(tabela.index, tabela["Vencimento"], amortizacao, juros):
+        if limite is not None and vencimento > limite:
+            break
+        partidas = [(CONTA_EMPRESTIMO, amortizado), (CONTA_JUROS, juro), (CONTA_BANCO, -(amortizado + juro))]
+        lote.append((vencimento, [(conta, quantia) for conta, quantia in partidas if round(quantia, 2)],
+                     f"Parcela {numero}/{prazo} do empréstimo {descricao}"))
+    return lote
+
+
+def contratar(diario, valor, prazo, taxa_anual, sistema, data, ate=None):
+    # Grava o contrato num único lote; devolve quantas parcelas foram lançadas
+    lote = lancamentos_contrato(valor, prazo, taxa_anual, sistema, data, ate)
+    diario.lancar_lote(lote)
+    return len(lote) - 1
+
+
+def principal(argumentos=None):
+    # Mede a comparação de cenários com a SELIC das séries gravadas
+    from helpmei.indicadores import load_data, obter_fixture_sgs
+
+    parser = argparse.ArgumentParser(prog="python -m helpmei.financiamento",
+                                     description="Mede a comparação de cenários de empréstimo.")
+    parser.add_argument("--valor", type=float, default=50_000.0)
+    parser.add_argument("--prazos", type=int, nargs="+", default=list(range(6, 121, 6)))
+    parser.add_argument("--spreads", type=float, nargs="+", default=[2.0, 4.0, 6.0, 8.0, 10.0, 15.0, 20.0, 30.0])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    opcoes = parser.parse_args(argumentos)
+
+    taxas = taxas_selic(load_data(obter_fixture_sgs()))
+    tempos = []
+    for _ in range(opcoes.repeticoes):
+        inicio = time.perf_counter()
+        tabela = cenarios(opcoes.valor, taxas, opcoes.prazos, opcoes.spreads)
+        tempos.append(time.perf_counter() - inicio)
+    print(f"{len(tabela):,} cenários (até {max(opcoes.prazos)} meses): "
+          f"mediana {1000 * np.median(tempos):,.1f} ms, melhor {1000 * min(tempos):,.1f} ms")
+    melhor = tabela.loc[tabela["Total de juros"].idxmin()]
+    print(f"Menor custo: {melhor['Sistema']} {melhor['Prazo']}x a {melhor['Taxa a.a.']:.2f}% a.a. "
+          f"({melhor['Referência']} + {melhor['Spread']:.1f}), juros R$ {melhor['Total de juros']:,.2f}")
+
+
+if __name__ == "__main__":
+    principal()
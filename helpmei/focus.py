@@ -0,0 +1,202 @@
+import json
+import os
+import re
+import pandas as pd
+from helpmei.importacao import importar_tarde
+
+requests = importar_tarde("requests")
+
+# Expectativas anuais do Relatório Focus na API Olinda (OData) do BACEN;
+# HELPMEI_URL_FOCUS aponta para outro servidor (o BACEN local do teste de carga)
+URL_FOCUS = os.environ.get(
+    "HELPMEI_URL_FOCUS",
+    "https://olinda.bcb.gov.br/olinda/servico/Expectativas/versao/v1/odata/ExpectativasMercadoAnuais",
+)
+
+# Nome do indicador no Focus -> nome usado no painel
+INDICADORES_FOCUS = {"Selic": "SELIC", "IPCA": "IPCA"}
+
+# Anos de referência pedidos: o corrente e os seguintes
+HORIZONTE_ANOS = 4
+
+CAMPOS = ["Indicador", "Data", "DataReferencia", "Media", "Mediana", "Minimo", "Maximo", "numeroRespondentes"]
+TAMANHO_PAGINA = 1000
+
+# Na primeira carga, só as expectativas do último ano
+JANELA_INICIAL = pd.DateOffset(years=1)
+
+# O Focus sai uma vez por semana; não adianta consultar a API a cada visita
+INTERVALO_ATUALIZACAO = pd.Timedelta(hours=6)
+
+FONTE = "focus"
+
+# Respostas gravadas da API, usadas em modo offline (HELPMEI_OFFLINE=1)
+CAMINHO_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "focus_expectativas_anuais.json")
+
+
+def filtro_odata(indicadores, anos, desde=None):
+    # Só os indicadores e horizontes pedidos, com base de cálculo de 30 dias
+    partes = [
+        "(" + " or ".join(f"Indicador eq '{indicador}'" for indicador in indicadores) + ")",
+        "(" + " or ".join(f"DataReferencia eq '{ano}'" for ano in anos) + ")",
+        "baseCalculo eq 0",
+    ]
+    if desde is not None:
+        partes.append(f"Data gt '{pd.Timestamp(desde):%Y-%m-%d}'")
+    return " and ".join(partes)
+
+
+def paginas(filtro, obter=None, tamanho=TAMANHO_PAGINA):
+    # Percorre a consulta com $top/$skip até uma página vir incompleta
+    obter = obter or requests.get
+    salto = 0
+    while True:
+        resposta = obter(
+            URL_FOCUS,
+            params={
+                "$filter": filtro,
+                "$select": ",".join(CAMPOS),
+                "$orderby": "Data asc",
+                "$top": tamanho,
+                "$skip": salto,
+                "$format": "json",
+            },
+            timeout=30,
+        )
+        resposta.raise_for_status()
+        registros = resposta.json()["value"]
+        if registros:
+            yield registros
+        if len(registros) < tamanho:
+            return
+        salto += tamanho
+
+
+def baixar_expectativas(indicadores, anos, desde=None, obter=None):
+    registros = [
+        registro
+        for pagina in paginas(filtro_odata(indicadores, anos, desde), obter=obter)
+        for registro in pagina
+    ]
+    df = pd.DataFrame(registros, columns=CAMPOS)
+    return pd.DataFrame({
+        "indicador": df["Indicador"].astype("string"),
+        "data": pd.to_datetime(df["Data"], format="%Y-%m-%d"),
+        "ano_referencia": pd.to_numeric(df["DataReferencia"]).astype("int64"),
+        "media": pd.to_numeric(df["Media"]),
+        "mediana": pd.to_numeric(df["Mediana"]),
+        "minimo": pd.to_numeric(df["Minimo"]),
+        "maximo": pd.to_numeric(df["Maximo"]),
+        "respondentes": pd.to_numeric(df["numeroRespondentes"]).astype("Int64"),
+    })
+
+
+def obter_fixture(caminho=CAMINHO_FIXTURE):
+    # Substituto de requests.get que responde com a gravação da API,
+    # aplicando o mesmo $filter, $top e $skip da consulta real
+    with open(caminho, encoding="utf-8") as arquivo:
+        gravados = json.load(arquivo)["value"]
+
+    class Resposta:
+        def __init__(self, registros):
+            self._registros = registros
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"value": self._registros}
+
+    def obter(url, params, timeout=None):
+        filtro = params["$filter"]
+        indicadores = set(re.findall(r"Indicador eq '([^']+)'", filtro))
+        anos = set(re.findall(r"DataReferencia eq '(\d+)'", filtro))
+        desde = re.search(r"Data gt '([\d-]+)'", filtro)
+        selecionados = [
+            registro for registro in gravados
+            if registro["Indicador"] in indicadores and registro["DataReferencia"] in anos
+            and (desde is None or registro["Data"] > desde.group(1))
+        ]
+        selecionados.sort(key=lambda registro: registro["Data"])
+        inicio = params["$skip"]
+        return Resposta(selecionados[inicio:inicio + params["$top"]])
+
+    return obter
+
+
+def obter_padrao():
+    return obter_fixture() if os.environ.get("HELPMEI_OFFLINE") == "1" else requests.get
+
+
+def ultima_atualizacao(banco):
+    linha = banco.conexao().execute(
+        "SELECT atualizado_em FROM atualizacoes WHERE fonte = ?", (FONTE,)
+    ).fetchone()
+    return None if linha is None else pd.Timestamp(linha[0])
+
+
+def atualizar_focus(banco, obter=None, agora=None, forcar=False):
+    # Atualização incremental: pede só as publicações posteriores à mais
+    # recente já guardada para cada par (indicador, ano). Devolve quantas
+    # linhas novas entraram no cache.
+    obter = obter or obter_padrao()
+    agora = pd.Timestamp.now() if agora is None else pd.Timestamp(agora)
+    ultima = ultima_atualizacao(banco)
+    if not forcar and ultima is not None and agora - ultima < INTERVALO_ATUALIZACAO:
+        return 0
+
+    anos = list(range(agora.year, agora.year + HORIZONTE_ANOS))
+    guardados = dict(
+        ((indicador, ano), data)
+        for indicador, ano, data in banco.conexao().execute(
+            "SELECT indicador, ano_referencia, MAX(data) FROM expectativas_focus GROUP BY indicador, ano_referencia"
+        )
+    )
+    pares = [(indicador, ano) for indicador in INDICADORES_FOCUS for ano in anos]
+    if all(par in guardados for par in pares):
+        desde = min(pd.Timestamp(guardados[par]) for par in pares)
+    else:
+        desde = agora.normalize() - JANELA_INICIAL
+
+    novos = baixar_expectativas(list(INDICADORES_FOCUS), anos, desde=desde, obter=obter)
+    linhas = list(zip(
+        novos["indicador"].tolist(),
+        novos["data"].dt.strftime("%Y-%m-%d").tolist(),
+        novos["ano_referencia"].tolist(),
+        novos["media"].tolist(),
+        novos["mediana"].tolist(),
+        novos["minimo"].tolist(),
+        novos["maximo"].tolist(),
+        [None if pd.isna(valor) else int(valor) for valor in novos["respondentes"]],
+    ))
+    with banco.transacao() as conexao:
+        conexao.executemany(
+            "INSERT OR REPLACE INTO expectativas_focus "
+            "(indicador, data, ano_referencia, media, mediana, minimo, maximo, respondentes) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            linhas,
+        )
+        conexao.execute(
+            "INSERT OR REPLACE INTO atualizacoes (fonte, atualizado_em) VALUES (?, ?)",
+            (FONTE, agora.isoformat()),
+        )
+    return len(linhas)
+
+
+def expectativas(banco, anos=None):
+    # Expectativas guardadas no cache, com o nome dos indicadores do painel
+    sql = "SELECT indicador, data, ano_referencia, media, mediana, minimo, maximo, respondentes FROM expectativas_focus"
+    parametros = ()
+    if anos:
+        sql += f" WHERE ano_referencia IN ({', '.join('?' * len(anos))})"
+        parametros = tuple(anos)
+    df = pd.read_sql_query(sql + " ORDER BY indicador, ano_referencia, data", banco.conexao(), params=parametros)
+    df["data"] = pd.to_datetime(df["data"], format="%Y-%m-%d")
+    df["indicador"] = df["indicador"].map(INDICADORES_FOCUS).fillna(df["indicador"])
+    return df
+
+
+def ultimas_medianas(df):
+    # Mediana mais recente de cada indicador por ano de referência
+    ultimas = df.sort_values("data").groupby(["indicador", "ano_referencia"]).tail(1)
+    return ultimas.pivot(index="ano_referencia", columns="indicador", values="mediana").sort_index()
@@ -0,0 +1,51 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import streamlit.components.v1 as components
+from helpmei.indicadores import FAIXAS_INDICADORES, INDICADORES
+from helpmei.layout import versao_arquivo
+
+# Gráfico dos indicadores desenhado no navegador: a série inteira vai uma vez por
+# versão publicada, como um buffer float64, e período, indicadores e médias anuais
+# mudam sem executar a página de novo. A seleção só volta ao Python pelo botão
+# "Usar este período nas outras abas".
+PASTA_GRAFICOS = os.path.join(os.path.dirname(__file__), "componentes", "graficos")
+_grafico_indicadores = components.declare_component("grafico_indicadores", path=PASTA_GRAFICOS)
+
+# Buffers prontos por versão dos indicadores
+MAX_PACOTES = 4
+
+_pacotes = OrderedDict()
+_trava = threading.Lock()
+
+
+def empacotar(df, versao, indicadores=INDICADORES):
+    # Linha 0: meses (ano * 12 + mês - 1); depois uma linha por indicador, float64 little-endian
+    with _trava:
+        if versao in _pacotes:
+            return _pacotes[versao]
+    df = df.sort_values("Date")
+    meses = (df["Date"].dt.year * 12 + df["Date"].dt.month - 1).to_numpy("float64")
+    pacote = np.vstack([meses] + [df[indicador].to_numpy("float64") for indicador in indicadores]).astype("<f8").tobytes()
+    with _trava:
+        _pacotes[versao] = pacote
+        while len(_pacotes) > MAX_PACOTES:
+            _pacotes.popitem(last=False)
+    return pacote
+
+
+def grafico_indicadores(df, versao, cores, inicio, fim, key="grafico_indicadores"):
+    # Devolve a última seleção enviada pelo navegador: {"inicio", "fim", "indicadores"}.
+    # Todos os indicadores vão no buffer; a escolha entre eles é feita no navegador
+    padrao = {"inicio": inicio, "fim": fim, "indicadores": list(INDICADORES)}
+    return _grafico_indicadores(
+        dados=empacotar(df, versao, INDICADORES),
+        versao=versao,
+        series=[{"nome": indicador, "cor": cores[indicador]} for indicador in INDICADORES],
+        faixas=FAIXAS_INDICADORES,
+        selecao=padrao,
+        versao_script=versao_arquivo(os.path.join(PASTA_GRAFICOS, "graficos.js")),
+        key=key,
+        default=padrao,
+    )
@@ -0,0 +1,98 @@
+import ast
+import importlib
+import os
+import re
+import subprocess
+import sys
+import threading
+
+# Módulos pesados pré-importados em segundo plano depois da primeira página
+MODULOS_AQUECIMENTO = ("numpy", "pandas", "plotly.express", "requests")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_aquecimento = None
+_trava_aquecimento = threading.Lock()
+
+
+class ModuloTardio:
+    # Procurador de um módulo que só é importado no primeiro acesso a um atributo.
+    # import_module já serializa importações concorrentes entre as threads de sessão.
+
+    def __init__(self, nome):
+        self._nome = nome
+
+    def __getattr__(self, atributo):
+        modulo = importlib.import_module(self._nome)
+        return getattr(modulo, atributo)
+
+    def __repr__(self):
+        carregado = "carregado" if self._nome in sys.modules else "não carregado"
+        return f"<módulo tardio {self._nome} ({carregado})>"
+
+
+def importar_tarde(nome):
+    # Já importado: devolve o próprio módulo, sem o custo do procurador
+    return sys.modules.get(nome) or ModuloTardio(nome)
+
+
+def aquecer_importacoes(modulos=MODULOS_AQUECIMENTO):
+    # Uma thread por processo importa os módulos pesados enquanto o usuário lê
+    # a primeira página; desligado com HELPMEI_AQUECER=0
+    global _aquecimento
+    if os.environ.get("HELPMEI_AQUECER") == "0":
+        return None
+    with _trava_aquecimento:
+        if _aquecimento is None:
+            def importar():
+                for nome in modulos:
+                    try:
+                        importlib.import_module(nome)
+                    except ImportError:
+                        pass
+            _aquecimento = threading.Thread(target=importar, name="aquecer-importacoes", daemon=True)
+            _aquecimento.start()
+    return _aquecimento
+
+
+def importacoes_da_pagina(caminho):
+    # Comandos import de nível superior do script, na ordem em que aparecem
+    with open(caminho, encoding="utf-8") as arquivo:
+        arvore = ast.parse(arquivo.read())
+    return [ast.unparse(no) for no in arvore.body if isinstance(no, (ast.Import, ast.ImportFrom))]
+
+
+def perfil_importacao(caminho):
+    # Roda só os imports da página com -X importtime num processo novo e
+    # devolve (total em ms, [(módulo, ms acumulados)] dos módulos de primeiro nível)
+    codigo = "\n".join(importacoes_da_pagina(caminho))
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": RAIZ},
+    )
+    modulos = []
+    for linha in saida.stderr.splitlines():
+        encontrado = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", linha)
+        if encontrado and not encontrado.group(2):
+            modulos.append((encontrado.group(3), int(encontrado.group(1)) / 1000))
+    return sum(ms for _, ms in modulos), sorted(modulos, key=lambda item: -item[1])
+
+
+def paginas_do_app():
+    principal = [nome for nome in os.listdir(RAIZ) if nome.endswith(".py") and nome.startswith("🏠")]
+    paginas = sorted(os.path.join("pages", nome) for nome in os.listdir(os.path.join(RAIZ, "pages")) if nome.endswith(".py"))
+    return principal + paginas
+
+
+def relatorio_importacao(mais_pesados=8):
+    linhas = []
+    for pagina in paginas_do_app():
+        total, modulos = perfil_importacao(os.path.join(RAIZ, pagina))
+        linhas.append(f"{pagina}: {total:,.0f} ms")
+        linhas.extend(f"    {ms:8,.1f} ms  {nome}" for nome, ms in modulos[:mais_pesados])
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    # python -m helpmei.importacao: custo de importação de cada página, processo frio
+    print(relatorio_importacao())
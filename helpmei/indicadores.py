@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import re
+import numpy as np
+import pandas as pd
+from helpmei.importacao import importar_tarde
+from helpmei.metricas import medido, medir
+from helpmei.sgs import ler_sgs
+
+requests = importar_tarde("requests")
+
+logger = logging.getLogger("helpmei.indicadores")
+
+# Séries do SGS (Sistema Gerenciador de Séries Temporais) do BACEN;
+# HELPMEI_URL_SGS aponta para outro servidor (o BACEN local do teste de carga)
+URL_SGS = os.environ.get("HELPMEI_URL_SGS", "https://api.bcb.gov.br/dados/serie/bcdata.sgs.{codigo}/dados?formato=json")
+SERIES_BACEN = {"SELIC": 4189, "IPCA": 13522, "Inadimplencia": 15885}
+INDICADORES = list(SERIES_BACEN)
+
+# Séries publicadas junto, mas fora dos gráficos: a variação mensal do IPCA (433)
+# é a base do índice de preços da correção em reais constantes. Sem ela (falha no
+# download ou fixture ainda não gravada), a coluna fica vazia e os relatórios
+# seguem nominais.
+SERIES_AUXILIARES = {"IPCA mensal": 433}
+
+# Segundos de espera por resposta do SGS: a atualização roda dentro da trava de
+# publicação, e uma conexão parada não pode segurá-la
+TIMEOUT_SGS = 30
+
+# Respostas gravadas da API, usadas em modo offline (HELPMEI_OFFLINE=1) e nos benchmarks
+PASTA_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def caminho_fixture_sgs(codigo):
+    return os.path.join(PASTA_FIXTURES, f"sgs_{codigo}.json")
+
+
+def obter_fixture_sgs():
+    # Substituto de requests.get que responde com a gravação de cada série
+    class Resposta:
+        def __init__(self, conteudo):
+            self.content = conteudo
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return json.loads(self.content)
+
+    def obter(url, timeout=None):
+        codigo = re.search(r"bcdata\.sgs\.(\d+)", url).group(1)
+        with open(caminho_fixture_sgs(codigo), "rb") as arquivo:
+            return Resposta(arquivo.read())
+
+    return obter
+
+
+def obter_padrao():
+    return obter_fixture_sgs() if os.environ.get("HELPMEI_OFFLINE") == "1" else requests.get
+
+
+def baixar_serie_bacen(codigo_serie, nome_serie, obter=None):
+    obter = obter or obter_padrao()
+    url = URL_SGS.format(codigo=codigo_serie)
+    with medir("baixar_serie_bacen", serie=nome_serie):
+        resposta = obter(url, timeout=TIMEOUT_SGS)
+        # Página de erro (4xx/5xx) não chega ao leitor do SGS
+        resposta.raise_for_status()
+        conteudo = resposta.content
+    # Os bytes vão direto para o leitor do SGS, sem a lista de dicionários do .json()
+    datas, valores = ler_sgs(conteudo)
+    return pd.DataFrame({'Date': datas, nome_serie: valores})
+
+
+@medido()
+def load_data(obter=None):
+    selic_df = baixar_serie_bacen(SERIES_BACEN['SELIC'], 'SELIC', obter)
+    ipca_df = baixar_serie_bacen(SERIES_BACEN['IPCA'], 'IPCA', obter)
+    inad_df = baixar_serie_bacen(SERIES_BACEN['Inadimplencia'], 'Inadimplencia', obter)
+    df = selic_df.merge(ipca_df, on='Date').merge(inad_df, on='Date').dropna()
+    for nome, codigo in SERIES_AUXILIARES.items():
+        try:
+            auxiliar = baixar_serie_bacen(codigo, nome, obter)
+        except (OSError, ValueError) as erro:
+            logger.warning("Série %s (%s) indisponível, seguindo sem ela: %s", nome, codigo, erro)
+            auxiliar = pd.DataFrame({'Date': pd.Series(dtype="datetime64[ns]"), nome: pd.Series(dtype="float64")})
+        df = df.merge(auxiliar, on='Date', how='left')
+    df['Ano'] = df['Date'].dt.year
+    df['Mês'] = df['Date'].dt.month
+    return df
+
+
+# Faixas de cada indicador: (limite superior, rótulo), a última sem limite.
+# Também vão para o gráfico do Painel, que classifica no navegador.
+FAIXAS_INDICADORES = {
+    "IPCA": [(1.5, "Muito Baixo"), (4.5, "Estável"), (6, "Alto"), (None, "Muito Alto")],
+    "SELIC": [(8, "Baixa"), (12, "Moderada"), (15, "Alta"), (None, "Muito Alta")],
+    "Inadimplencia": [(3, "Baixa"), (5, "Moderada"), (None, "Alta")],
+}
+
+
+def classificar_indicador(nome, valor):
+    for limite, rotulo in FAIXAS_INDICADORES.get(nome, []):
+        if limite is None or valor <= limite:
+            return rotulo
+    return "Indefinido"
+
+
+def medias_anuais(df, indicadores):
+    return df.groupby("Ano")[indicadores].mean().reset_index()
+
+
+def tendencia(df, x, y):
+    # Reta de mínimos quadrados com NumPy; trendline="ols" carregaria o statsmodels.
+    # Devolve (inclinação, intercepto, extremos de x) ou None com menos de dois pontos.
+    pares = df[[x, y]].dropna()
+    if len(pares) < 2:
+        return None
+    inclinacao, intercepto = np.polyfit(pares[x], pares[y], 1)
+    return inclinacao, intercepto, np.array([pares[x].min(), pares[x].max()])
+
+
+def gravar_fixtures_sgs():
+    # Regrava as fixtures a partir da API real
+    os.makedirs(PASTA_FIXTURES, exist_ok=True)
+    for codigo in [*SERIES_BACEN.values(), *SERIES_AUXILIARES.values()]:
+        resposta = requests.get(URL_SGS.format(codigo=codigo), timeout=60)
+        resposta.raise_for_status()
+        with open(caminho_fixture_sgs(codigo), "w", encoding="utf-8") as arquivo:
+            json.dump(resposta.json(), arquivo, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    # python -m helpmei.indicadores: regrava as séries usadas em modo offline
+    gravar_fixtures_sgs()
@@ -0,0 +1,152 @@
+import hashlib
+import os
+from functools import lru_cache
+import streamlit as st
+import streamlit.components.v1 as components
+from helpmei.ativos import url_ativo
+from helpmei.importacao import aquecer_importacoes
+from helpmei.metricas import encerrar_execucao, iniciar_execucao, medir
+
+# Componente do fundo animado: o iframe fica montado entre execuções e o
+# script é servido pelo Streamlit com Cache-Control public
+PASTA_FUNDO = os.path.join(os.path.dirname(__file__), "componentes", "fundo")
+_fundo_particulas = components.declare_component("fundo_particulas", path=PASTA_FUNDO)
+
+ALTURA_FUNDO = 150
+
+# Modos do fundo oferecidos na barra lateral; o padrão vem de HELPMEI_FUNDO
+MODOS_FUNDO = {"animado": "Animado", "estatico": "Estático", "desligado": "Desligado"}
+MODO_FUNDO_PADRAO = os.environ.get("HELPMEI_FUNDO", "animado")
+
+# Limites de custo da animação no navegador (lidos por particulas.js)
+DESEMPENHO_FUNDO = {
+    "maximo": 80,                 # teto de partículas, já ajustado à área e ao aparelho
+    "minimo": 15,
+    "quadros_por_segundo": 30,
+    "orcamento_quadro_ms": 8,     # acima disso, a quantidade é reduzida
+    "ocioso_apos_s": 20,          # sem interação, a animação congela no último quadro
+}
+
+# Configuração das partículas (formato do particles.js), igual em todas as páginas
+CONFIG_PARTICULAS = {
+    "particles": {
+        "number": {"value": 80, "density": {"enable": True, "value_area": 800}},
+        "color": {"value": "#ffffff"},
+        "shape": {"type": "circle"},
+        "opacity": {"value": 0.5, "random": False},
+        "size": {"value": 3, "random": True},
+        "line_linked": {"enable": True, "distance": 150, "color": "#ffffff", "opacity": 1, "width": 1},
+        "move": {"enable": True, "speed": 1, "direction": "none", "out_mode": "out"},
+    },
+    "interactivity": {
+        "events": {
+            "onhover": {"enable": True, "mode": "repulse"},
+            "onclick": {"enable": True, "mode": "push"},
+        },
+        "modes": {"repulse": {"distance": 100}, "push": {"particles_nb": 4}},
+    },
+    "retina_detect": True,
+}
+
+
+@lru_cache(maxsize=None)
+def versao_arquivo(caminho):
+    # Hash do conteúdo: muda a URL do script quando o arquivo muda
+    with open(caminho, "rb") as arquivo:
+        return hashlib.sha256(arquivo.read()).hexdigest()[:12]
+
+
+def configurar_pagina(titulo, icone, layout="centered"):
+    # Moldura comum a todas as páginas: configuração, logo, barra lateral e fundo
+    iniciar_execucao(titulo)
+    st.set_page_config(
+        page_title=titulo,
+        layout=layout,
+        page_icon=icone,
+        menu_items={}  # Desativa o menu automático
+    )
+
+    with medir("moldura"):
+        st.logo(
+            url_ativo("logo_grande"),
+            size="large",
+            icon_image=url_ativo("logo"),
+        )
+
+        exibir_sidebar()
+        if st.session_state.modo_fundo != "desligado":
+            exibir_fundo(st.session_state.modo_fundo)
+
+    # Depois da primeira página, pandas e plotly carregam em segundo plano
+    aquecer_importacoes()
+
+
+def exibir_sidebar():
+    with st.sidebar:
+        st.title("🔗 Mais Informações para MEI")
+        st.markdown("""
+            <p style="font-size:15px; margin-top:15px;">
+                <a href="https://sebrae.com.br/sites/PortalSebrae/mei" target="_blank" style="color:#4169E1; text-decoration:none;">
+                    👉 Acesse agora o Portal Sebrae MEI
+                </a>
+            </p>
+
+            <p style="font-size:16px; margin-top:20px;">Lá você encontra orientações sobre:</p>
+            <ul style="font-size:16px; color:#FFFFFF;">
+                <li>📝 Regularização</li>
+                <li>💰 Tributação</li>
+                <li>🧾 Emissão de nota</li>
+                <li>🎁 Benefícios</li>
+                <li>🔍 E mais!</li>
+            </ul>
+        """, unsafe_allow_html=True)
+        st.markdown("---")
+        st.markdown(
+            """
+            <span style='color: #FFFFFF; font-weight: bold;'>Help MEI</span><br>
+            <span style='color: #FF5F15; font-style: italic;'>Visualize hoje. Cresça amanhã.</span>
+            """,
+            unsafe_allow_html=True
+        )
+        # O estado do widget some na troca de página; modo_fundo guarda a escolha
+        if "_modo_fundo" not in st.session_state:
+            st.session_state._modo_fundo = st.session_state.get("modo_fundo", MODO_FUNDO_PADRAO)
+        st.selectbox("Fundo da página", list(MODOS_FUNDO), format_func=MODOS_FUNDO.get, key="_modo_fundo")
+        st.session_state.modo_fundo = st.session_state._modo_fundo
+
+
+def exibir_fundo(modo):
+    config = {**CONFIG_PARTICULAS, "desempenho": {**DESEMPENHO_FUNDO, "modo": modo}}
+    _fundo_particulas(
+        config=config,
+        altura=ALTURA_FUNDO,
+        versao=versao_arquivo(os.path.join(PASTA_FUNDO, "particulas.js")),
+        key="fundo_particulas",
+        default=None,
+    )
+
+
+def rodape():
+    st.markdown("""
+<style>
+    .footer {
+        text-align: center;
+        padding: 10px;
+        margin-top: 50px;
+    }
+</style>
+<div class="footer">
+    <a rel="license" href="http://creativecommons.org/licenses/by/4.0/">
+        <img alt="Licença Creative Commons" style="border-width:0"
+             src="https://i.creativecommons.org/l/by/4.0/88x31.png" />
+    </a>
+    <br />
+    Este trabalho está licenciado sob uma
+    <a rel="license" href="http://creativecommons.org/licenses/by/4.0/">
+        Licença Creative Commons Atribuição 4.0 Internacional
+    </a>.
+</div>
+""", unsafe_allow_html=True)
+
+    # Fecha a medição da página e, com ?debug=1, mostra o painel de desempenho
+    encerrar_execucao()
@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Limites dos baldes dos histogramas, em segundos (formato Prometheus: le="...")
+LIMITES_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# HELPMEI_LOG_METRICAS=1 emite uma linha JSON por trecho medido
+LOG_ESTRUTURADO = os.environ.get("HELPMEI_LOG_METRICAS") == "1"
+
+PREFIXO = "helpmei"
+
+# Linhas guardadas para o painel de depuração. Execuções de fragmento não passam por
+# iniciar_execucao, então a lista é limitada: só as linhas mais recentes ficam
+LIMITE_TRECHOS = 200
+
+# Quantidades viram faixas antes de entrar num rótulo: o número exato criaria uma
+# série de histograma por valor
+FAIXAS_QUANTIDADE = ((5, "1-5"), (20, "6-20"))
+
+log = logging.getLogger("helpmei.metricas")
+if LOG_ESTRUTURADO and not log.handlers:
+    _saida = logging.StreamHandler()
+    _saida.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_saida)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+_profundidade = threading.local()
+
+
+class Registro:
+    # Contadores e histogramas do processo, somados entre todas as sessões.
+    # Cada observação custa um bisect e uma trava curta.
+
+    def __init__(self, limites=LIMITES_SEGUNDOS):
+        self.limites = limites
+        self._trava = threading.Lock()
+        self._series = {}
+
+    def observar(self, nome, rotulos, segundos, erro=None):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        balde = bisect_left(self.limites, segundos)
+        with self._trava:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = {
+                    "baldes": [0] * (len(self.limites) + 1), "soma": 0.0, "total": 0, "erros": 0,
+                }
+            serie["baldes"][balde] += 1
+            serie["soma"] += segundos
+            serie["total"] += 1
+            if erro is not None:
+                serie["erros"] += 1
+
+    def series(self):
+        with self._trava:
+            return {chave: {**serie, "baldes": list(serie["baldes"])} for chave, serie in self._series.items()}
+
+    def limpar(self):
+        with self._trava:
+            self._series = {}
+
+    def prometheus(self):
+        # Texto no formato de exposição do Prometheus
+        linhas = [
+            f"# HELP {PREFIXO}_trecho_segundos Duração dos trechos medidos.",
+            f"# TYPE {PREFIXO}_trecho_segundos histogram",
+        ]
+        erros = [
+            f"# HELP {PREFIXO}_trecho_erros_total Trechos encerrados por exceção.",
+            f"# TYPE {PREFIXO}_trecho_erros_total counter",
+        ]
+        for (nome, rotulos), serie in sorted(self.series().items()):
+            base = ",".join([f'trecho="{nome}"'] + [f'{chave}="{valor}"' for chave, valor in rotulos])
+            acumulado = 0
+            for limite, contagem in zip(self.limites, serie["baldes"]):
+                acumulado += contagem
+                linhas.append(f'{PREFIXO}_trecho_segundos_bucket{{{base},le="{limite}"}} {acumulado}')
+            linhas.append(f'{PREFIXO}_trecho_segundos_bucket{{{base},le="+Inf"}} {serie["total"]}')
+            linhas.append(f"{PREFIXO}_trecho_segundos_sum{{{base}}} {serie['soma']:.6f}")
+            linhas.append(f"{PREFIXO}_trecho_segundos_count{{{base}}} {serie['total']}")
+            erros.append(f"{PREFIXO}_trecho_erros_total{{{base}}} {serie['erros']}")
+        return "\n".join(linhas + erros) + "\n"
+
+    def resumo(self):
+        # Uma linha por trecho, com percentis estimados pelos baldes
+        linhas = []
+        for (nome, rotulos), serie in sorted(self.series().items()):
+            linhas.append({
+                "Trecho": nome + "".join(f" {chave}={valor}" for chave, valor in rotulos),
+                "Execuções": serie["total"],
+                "Média (ms)": 1000 * serie["soma"] / serie["total"],
+                "p50 (ms)": 1000 * self._percentil(serie, 0.50),
+                "p95 (ms)": 1000 * self._percentil(serie, 0.95),
+                "Erros": serie["erros"],
+            })
+        return linhas
+
+    def _percentil(self, serie, fracao):
+        alvo = fracao * serie["total"]
+        acumulado = 0
+        for limite, contagem in zip(self.limites + (float("inf"),), serie["baldes"]):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return limite if limite != float("inf") else self.limites[-1]
+        return self.limites[-1]
+
+
+REGISTRO = Registro()
+
+
+def _reservar(nome, rotulos, profundidade):
+    # Dentro de uma execução do Streamlit, a linha do trecho entra no painel de
+    # depuração na ordem em que o trecho começa; a duração é preenchida no fim
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    linha = {"Trecho": "  " * profundidade + nome, "Rótulos": " ".join(f"{c}={v}" for c, v in rotulos.items()),
+             "ms": None, "Erro": ""}
+    st.session_state.setdefault("_trechos", deque(maxlen=LIMITE_TRECHOS)).append(linha)
+    return linha
+
+
+def _anotar(linha, nome, rotulos, segundos, erro):
+    REGISTRO.observar(nome, rotulos, segundos, erro)
+    if LOG_ESTRUTURADO:
+        log.info(json.dumps(
+            {"evento": "trecho", "trecho": nome, **rotulos, "ms": round(1000 * segundos, 3), "erro": erro},
+            ensure_ascii=False,
+        ))
+    if linha is not None:
+        linha["ms"] = 1000 * segundos
+        linha["Erro"] = erro or ""
+
+
+def faixa_quantidade(quantidade):
+    for limite, faixa in FAIXAS_QUANTIDADE:
+        if quantidade <= limite:
+            return faixa
+    return f"{FAIXAS_QUANTIDADE[-1][0] + 1}+"
+
+
+@contextmanager
+def medir(nome, **rotulos):
+    profundidade = getattr(_profundidade, "valor", 0)
+    _profundidade.valor = profundidade + 1
+    linha = _reservar(nome, rotulos, profundidade)
+    erro = None
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception as excecao:
+        erro = type(excecao).__name__
+        raise
+    finally:
+        segundos = time.perf_counter() - inicio
+        _profundidade.valor = profundidade
+        _anotar(linha, nome, rotulos, segundos, erro)
+
+
+def medido(nome=None, **rotulos):
+    # Decorador: mede cada chamada da função com o nome dado (ou o da função)
+    def decorar(funcao):
+        @wraps(funcao)
+        def medida(*args, **kwargs):
+            with medir(nome or funcao.__name__, **rotulos):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorar
+
+
+def depuracao_ativa():
+    return os.environ.get("HELPMEI_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+def iniciar_execucao(pagina):
+    # Chamado no topo de cada página: zera os trechos da execução anterior
+    st.session_state._trechos = deque(maxlen=LIMITE_TRECHOS)
+    st.session_state._inicio_execucao = (pagina, time.perf_counter())
+
+
+def encerrar_execucao():
+    # Chamado no fim da página: registra a execução inteira e mostra o painel
+    pagina, inicio = st.session_state.get("_inicio_execucao", (None, None))
+    if pagina is None:
+        return
+    _anotar(_reservar("pagina", {"pagina": pagina}, 0), "pagina", {"pagina": pagina}, time.perf_counter() - inicio, None)
+    if depuracao_ativa():
+        exibir_painel_depuracao()
+
+
+def exibir_painel_depuracao():
+    with st.sidebar.expander("⏱️ Desempenho", expanded=True):
+        st.markdown("**Última execução**")
+        st.dataframe(
+            list(st.session_state.get("_trechos", ())),
+            hide_index=True,
+            use_container_width=True,
+            column_config={"ms": st.column_config.NumberColumn(format="%.1f")},
+        )
+        st.markdown("**Processo (todas as sessões)**")
+        st.dataframe(
+            REGISTRO.resumo(),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                coluna: st.column_config.NumberColumn(format="%.1f")
+                for coluna in ["Média (ms)", "p50 (ms)", "p95 (ms)"]
+            },
+        )
+        st.download_button("Métricas (Prometheus)", REGISTRO.prometheus(), file_name="metricas.prom", mime="text/plain")
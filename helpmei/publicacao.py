@@ -0,0 +1,186 @@
+import fcntl
+import hashlib
+import logging
+import os
+import threading
+import time
+import pandas as pd
+from helpmei.importacao import importar_tarde
+from helpmei.indicadores import load_data
+from helpmei.metricas import medir
+
+# Indicadores publicados em um arquivo Arrow IPC (Feather v2, sem compressão) que
+# cada processo mapeia em memória: um download por intervalo para todas as réplicas
+# da máquina, e as páginas do arquivo ficam no cache do SO, compartilhadas entre elas.
+
+pa = importar_tarde("pyarrow")
+feather = importar_tarde("pyarrow.feather")
+
+logger = logging.getLogger("helpmei.publicacao")
+
+CAMINHO_INDICADORES = os.environ.get("HELPMEI_INDICADORES", os.path.join("dados", "indicadores.arrow"))
+
+# Idade do arquivo a partir da qual um processo baixa as séries de novo
+INTERVALO_ATUALIZACAO = pd.Timedelta(hours=1)
+
+# Hash do conteúdo, gravado nos metadados do esquema
+CHAVE_VERSAO = b"helpmei.versao"
+
+
+def versao_conteudo(df):
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()[:16]
+
+
+def ler_versao(caminho=CAMINHO_INDICADORES):
+    # Só o esquema: não lê as colunas
+    if not os.path.isfile(caminho):
+        return None
+    metadados = pa.ipc.open_file(pa.memory_map(caminho, "r")).schema.metadata or {}
+    valor = metadados.get(CHAVE_VERSAO)
+    return None if valor is None else valor.decode()
+
+
+def publicar(df, caminho=CAMINHO_INDICADORES):
+    # Grava num temporário da mesma pasta e troca com os.replace: quem já mapeou o
+    # arquivo antigo continua lendo o antigo, quem abrir depois vê só o novo inteiro
+    versao = versao_conteudo(df)
+    if ler_versao(caminho) == versao:
+        # Mesmo conteúdo: só renova a idade, sem trocar o inode nem forçar remapeamento
+        os.utime(caminho)
+        return versao
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    for posicao, campo in enumerate(tabela.schema):
+        # from_pandas transforma NaN em nulo, e coluna com nulo é copiada na leitura;
+        # gravado como valor float64, o NaN volta como NaN direto do mapeamento
+        if pa.types.is_floating(campo.type) and tabela.column(posicao).null_count:
+            tabela = tabela.set_column(posicao, campo, pa.array(df[campo.name].to_numpy(), from_pandas=False))
+    tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), CHAVE_VERSAO: versao.encode()})
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(tabela, temporario, compression="uncompressed")
+        with open(temporario, "rb") as arquivo:
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return versao
+
+
+def _estado(caminho):
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return estado.st_ino, estado.st_mtime_ns
+
+
+def vencido(caminho=CAMINHO_INDICADORES, intervalo=INTERVALO_ATUALIZACAO):
+    try:
+        idade = time.time() - os.stat(caminho).st_mtime
+    except FileNotFoundError:
+        return True
+    return idade >= intervalo.total_seconds()
+
+
+def atualizar_indicadores(caminho=CAMINHO_INDICADORES, carregar=load_data, intervalo=INTERVALO_ATUALIZACAO,
+                          forcar=False, esperar=True):
+    # Um processo por vez baixa e publica, coordenados por flock; com esperar=False
+    # quem não conseguir a trava desiste e segue com o arquivo atual.
+    # Devolve True quando este processo publicou.
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    antes = _estado(caminho)
+    with open(caminho + ".trava", "a") as trava:
+        try:
+            fcntl.flock(trava, fcntl.LOCK_EX if esperar else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        try:
+            # Outro processo pode ter publicado enquanto esperávamos a trava
+            if forcar and antes is not None and _estado(caminho) != antes:
+                return False
+            if not forcar and not vencido(caminho, intervalo):
+                return False
+            with medir("publicar_indicadores"):
+                publicar(carregar(), caminho)
+            return True
+        finally:
+            fcntl.flock(trava, fcntl.LOCK_UN)
+
+
+def mapear(caminho=CAMINHO_INDICADORES):
+    # Sem cópia para as colunas sem nulos (as float64 não têm, ver publicar): apontam
+    # para o mapeamento (arrays somente leitura), que fica vivo enquanto o DataFrame existir
+    with medir("mapear_indicadores"):
+        tabela = pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+        versao = tabela.schema.metadata[CHAVE_VERSAO].decode()
+        return tabela.to_pandas(split_blocks=True), versao
+
+
+class IndicadoresMapeados:
+    # Visão do processo sobre o arquivo publicado. Cada obter() custa um stat:
+    # o arquivo só é remapeado quando o inode muda (os.replace de outro processo).
+    # Arquivo vencido é atualizado numa thread, sem segurar a execução da página.
+
+    def __init__(self, caminho=CAMINHO_INDICADORES, carregar=load_data, intervalo=INTERVALO_ATUALIZACAO):
+        self.caminho = caminho
+        self.carregar = carregar
+        self.intervalo = intervalo
+        self._trava = threading.Lock()
+        self._inode = None
+        self._atualizacao = None
+        self.df = None
+        self.versao = None
+
+    def obter(self, forcar=False):
+        # Devolve (DataFrame, versão do conteúdo)
+        if forcar:
+            self.atualizar_agora()
+        if not os.path.exists(self.caminho):
+            atualizar_indicadores(self.caminho, self.carregar, self.intervalo)
+        elif vencido(self.caminho, self.intervalo):
+            self._atualizar_em_segundo_plano()
+        inode = os.stat(self.caminho).st_ino
+        with self._trava:
+            if inode != self._inode:
+                self.df, self.versao = mapear(self.caminho)
+                self._inode = inode
+            return self.df, self.versao
+
+    def atualizar_agora(self):
+        # Atualização pedida pelo usuário. Com um arquivo já publicado, não espera a
+        # trava de outro processo (ele já está baixando) nem propaga falha do BACEN:
+        # devolve False e a página segue com a publicação atual
+        if not os.path.exists(self.caminho):
+            return atualizar_indicadores(self.caminho, self.carregar, self.intervalo, forcar=True)
+        try:
+            return atualizar_indicadores(self.caminho, self.carregar, self.intervalo, forcar=True, esperar=False)
+        except Exception:
+            logger.warning("Falha ao atualizar os indicadores publicados", exc_info=True)
+            return False
+
+    def _atualizar_em_segundo_plano(self):
+        with self._trava:
+            if self._atualizacao is not None and self._atualizacao.is_alive():
+                return
+            self._atualizacao = threading.Thread(target=self._atualizar, name="atualizar-indicadores", daemon=True)
+            self._atualizacao.start()
+
+    def _atualizar(self):
+        # Falha no BACEN não derruba ninguém: as páginas seguem com a última publicação
+        try:
+            atualizar_indicadores(self.caminho, self.carregar, self.intervalo, esperar=False)
+        except Exception:
+            logger.warning("Falha ao atualizar os indicadores publicados", exc_info=True)
+
+
+# Uma visão por processo, compartilhada pelas sessões e pela API
+INDICADORES_PUBLICADOS = IndicadoresMapeados()
+
+
+if __name__ == "__main__":
+    # python -m helpmei.publicacao: baixa e publica agora (ex.: cron antes de subir as réplicas)
+    atualizar_indicadores(forcar=True)
+    print(f"Indicadores publicados em {CAMINHO_INDICADORES} (versão {ler_versao()})")
@@ -0,0 +1,109 @@
+import streamlit as st
+import pandas as pd
+
+# Quantidade de linhas de movimento exibidas por página em cada razonete
+LINHAS_POR_PAGINA = 25
+
+
+def _situacao(saldo):
+    return 'Devedor' if saldo > 0 else 'Credor' if saldo < 0 else 'Zerado'
+
+
+def resumo_contas(diario, contas):
+    # Uma linha por conta com totais e saldo, base da lista de razonetes
+    totais = diario.resumo_contas()
+    saldo = totais["Débitos"] - totais["Créditos"]
+    return pd.DataFrame({
+        "Código": totais.index,
+        "Conta": [contas.get(codigo, "N/A") for codigo in totais.index],
+        "Débitos": totais["Débitos"].to_numpy(),
+        "Créditos": totais["Créditos"].to_numpy(),
+        "Saldo": saldo.abs().to_numpy(),
+        "Situação": [_situacao(valor) for valor in saldo],
+        "Movimentos": totais[["Qtd D", "Qtd C"]].max(axis=1).astype(int).to_numpy(),
+    })
+
+
+def filtrar_resumo(resumo, busca):
+    if not busca:
+        return resumo
+    termo = busca.strip().lower()
+    mascara = (
+        resumo["Código"].str.lower().str.contains(termo, regex=False)
+        | resumo["Conta"].str.lower().str.contains(termo, regex=False)
+    )
+    return resumo[mascara]
+
+
+def janela_movimentos(diario, conta, pagina, linhas_por_pagina=LINHAS_POR_PAGINA):
+    # Monta apenas as linhas visíveis do razonete (débito à esquerda, crédito à direita)
+    inicio = pagina * linhas_por_pagina
+    movimentos = diario.movimentos(conta, inicio, inicio + linhas_por_pagina)
+    debito = movimentos['débito'].reset_index(drop=True)
+    credito = movimentos['crédito'].reset_index(drop=True)
+    return pd.concat(
+        [
+            debito.rename(columns={"Data": "Data D", "Valor": "Débito"}),
+            credito.rename(columns={"Data": "Data C", "Valor": "Crédito"}),
+        ],
+        axis=1,
+    )
+
+
+def _exibir_razonete(diario, conta, codigo, total_linhas, saldo):
+    total_paginas = max(1, -(-total_linhas // LINHAS_POR_PAGINA))
+
+    st.write(f"**{codigo} - {conta}**")
+    pagina = 1
+    chave = f"razonete_pagina_{codigo}"
+    if st.session_state.get(chave, 1) > total_paginas:
+        st.session_state[chave] = total_paginas
+    if total_paginas > 1:
+        pagina = st.number_input("Página", min_value=1, max_value=total_paginas, step=1, key=chave)
+        st.caption(f"{total_linhas} linhas em {total_paginas} páginas")
+
+    st.dataframe(
+        janela_movimentos(diario, codigo, pagina - 1),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Data D": st.column_config.DateColumn(format="DD/MM/YYYY"),
+            "Data C": st.column_config.DateColumn(format="DD/MM/YYYY"),
+            "Débito": st.column_config.NumberColumn(format="R$ %.2f"),
+            "Crédito": st.column_config.NumberColumn(format="R$ %.2f"),
+        },
+    )
+    st.write(f"**Saldo:** R$ {abs(saldo):,.2f} ({_situacao(saldo)})")
+    st.divider()
+
+
+@st.fragment
+def exibir_razonetes(diario, contas):
+    # Lista de contas em uma única tabela; só as contas selecionadas são expandidas
+    # em razonete, e cada razonete mostra apenas uma página de movimentos.
+    busca = st.text_input("Buscar conta", placeholder="Código ou descrição", key="razonetes_busca")
+    resumo = filtrar_resumo(resumo_contas(diario, contas), busca)
+
+    if resumo.empty:
+        st.info("Nenhuma conta encontrada.")
+        return
+
+    selecao = st.dataframe(
+        resumo,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        key="razonetes_resumo",
+        column_config={
+            "Débitos": st.column_config.NumberColumn(format="R$ %.2f"),
+            "Créditos": st.column_config.NumberColumn(format="R$ %.2f"),
+            "Saldo": st.column_config.NumberColumn(format="R$ %.2f"),
+        },
+    )
+    st.caption("Selecione uma ou mais contas na tabela para abrir o razonete.")
+
+    for posicao in selecao.selection.rows:
+        linha = resumo.iloc[posicao]
+        saldo = linha["Débitos"] - linha["Créditos"]
+        _exibir_razonete(diario, linha["Conta"], linha["Código"], linha["Movimentos"], saldo)
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from helpmei.plano_contas import CONTAS
+
+# Grupos do plano de contas usados nas demonstrações
+PREFIXOS_PL = ("2.3", "2.8")
+PREFIXO_CAIXA = "1.1.1"
+
+# Contas redutoras do não circulante: a contrapartida de depreciação,
+# amortização e impairment, que não movimentam caixa
+CONTAS_REDUTORAS = {
+    codigo
+    for codigo, descricao in CONTAS.items()
+    if codigo.startswith("1.2") and any(p in descricao for p in ("Depreciação", "Amortização", "Impairment"))
+}
+
+# Linhas da DRE: (rótulo, prefixos somados). O valor é crédito menos débito,
+# então receitas aparecem positivas e custos/despesas negativos.
+LINHAS_DRE = [
+    ("Receita Bruta", ("3.1.1",)),
+    ("(-) Deduções da Receita Bruta", ("3.1.2",)),
+    ("= Receita Líquida", ("3.1",)),
+    ("(-) Custos dos Bens e Serviços", ("3.2",)),
+    ("= Lucro Bruto", ("3.1", "3.2")),
+    ("(-) Despesas com Vendas", ("3.3.1",)),
+    ("(-) Despesas Administrativas", ("3.3.2",)),
+    ("(+/-) Outros Resultados Operacionais", ("3.3.9",)),
+    ("= Resultado Operacional", ("3.1", "3.2", "3.3")),
+    ("(-) Despesas Financeiras", ("3.4.1.01",)),
+    ("(+) Receitas Financeiras", ("3.4.1.02",)),
+    ("= Resultado Líquido do Período", ("3",)),
+]
+
+# Grupos do fluxo de caixa indireto, na ordem em que o prefixo é testado
+GRUPOS_FLUXO = [
+    ("Investimento", ("1.2.2", "1.2.3", "1.2.4")),
+    ("Financiamento", ("2.1.3", "2.1.5", "2.2.1", "2.2.3") + PREFIXOS_PL),
+    ("Capital de giro", ("1.1", "1.2.1", "2.1", "2.2")),
+]
+
+
+def somar_prefixos(codigos, valores, prefixos):
+    mascara = np.zeros(len(codigos), dtype=bool)
+    for prefixo in prefixos:
+        mascara |= (codigos == prefixo) | codigos.str.startswith(prefixo + ".")
+    return float(valores[mascara].sum())
+
+
+def balanco(saldos):
+    # Balanço com o resultado acumulado encerrado no Patrimônio Líquido
+    codigos = pd.Index(saldos.index, dtype="object")
+    valores = saldos.to_numpy(dtype="float64")
+    ativo = somar_prefixos(codigos, valores, ("1",))
+    pl = -somar_prefixos(codigos, valores, PREFIXOS_PL)
+    passivo = -somar_prefixos(codigos, valores, ("2",)) - pl
+    resultado = -somar_prefixos(codigos, valores, ("3",))
+    return {
+        "Ativo Total": ativo,
+        "Passivo Total": passivo,
+        "Patrimônio Líquido": pl + resultado,
+        "Resultado do Exercício": resultado,
+    }
+
+
+def dre(totais):
+    # DRE a partir dos débitos e créditos do período, por conta
+    codigos = pd.Index(totais.index, dtype="object")
+    valores = (totais["Créditos"] - totais["Débitos"]).to_numpy(dtype="float64")
+    return pd.DataFrame(
+        [(rotulo, somar_prefixos(codigos, valores, prefixos)) for rotulo, prefixos in LINHAS_DRE],
+        columns=["Linha", "Valor"],
+    )
+
+
+def fluxo_caixa(totais):
+    # Método indireto: parte do resultado, devolve os ajustes sem caixa e
+    # soma a variação de cada conta patrimonial com o sinal invertido
+    codigos = pd.Index(totais.index, dtype="object")
+    movimento = (totais["Débitos"] - totais["Créditos"]).to_numpy(dtype="float64")
+    efeito = -movimento
+
+    resultado = somar_prefixos(codigos, efeito, ("3",))
+    caixa = somar_prefixos(codigos, movimento, (PREFIXO_CAIXA,))
+    ajustes = float(efeito[codigos.isin(CONTAS_REDUTORAS)].sum())
+
+    restantes = ~(
+        codigos.str.startswith("3")
+        | (codigos == PREFIXO_CAIXA) | codigos.str.startswith(PREFIXO_CAIXA + ".")
+        | codigos.isin(CONTAS_REDUTORAS)
+    )
+    grupos = {}
+    for nome, prefixos in GRUPOS_FLUXO:
+        mascara = np.zeros(len(codigos), dtype=bool)
+        for prefixo in prefixos:
+            mascara |= codigos.str.startswith(prefixo + ".")
+        mascara &= restantes
+        grupos[nome] = float(efeito[mascara].sum())
+        restantes &= ~mascara
+    # Conta fora dos grupos conhecidos (ex.: nova conta de 2º nível) vai para o giro
+    grupos["Capital de giro"] += float(efeito[restantes].sum())
+
+    operacional = resultado + ajustes + grupos["Capital de giro"]
+    return pd.DataFrame(
+        [
+            ("Resultado Líquido do Período", resultado),
+            ("(+) Depreciação, amortização e impairment", ajustes),
+            ("(+/-) Variação do capital de giro", grupos["Capital de giro"]),
+            ("= Caixa das Atividades Operacionais", operacional),
+            ("= Caixa das Atividades de Investimento", grupos["Investimento"]),
+            ("= Caixa das Atividades de Financiamento", grupos["Financiamento"]),
+            ("= Variação de Caixa e Equivalentes", caixa),
+        ],
+        columns=["Linha", "Valor"],
+    )
+
+
+def calcular_demonstracoes(diario, inicio=None, fim=None):
+    vespera = None if inicio is None else pd.Timestamp(inicio) - pd.Timedelta(days=1)
+    totais = diario.totais_entre(vespera, fim)
+    return {
+        "dre": dre(totais),
+        "fluxo_caixa": fluxo_caixa(totais),
+        "balanco": balanco(diario.saldos(ate=fim)),
+    }
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _demonstracoes(_diario, chave_livro, versao, inicio, fim):
+    return calcular_demonstracoes(_diario, inicio, fim)
+
+
+def gerar_demonstracoes(diario, inicio=None, fim=None):
+    # DRE e fluxo de caixa do período e balanço no fim dele, guardados por versão do livro
+    return _demonstracoes(diario, diario.id, diario.versao, inicio, fim)
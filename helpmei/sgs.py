@@ -0,0 +1,141 @@
+import json
+import numpy as np
+import pandas as pd
+
+# Leitor da resposta JSON do SGS: [{"data":"dd/mm/aaaa","valor":"1.23"}, ...].
+# Trabalha direto nos bytes com NumPy, sem criar um objeto Python por linha;
+# qualquer coisa fora do formato esperado cai no caminho genérico do pandas.
+
+ASPAS = ord('"')
+BARRA = ord("/")
+PONTO = ord(".")
+MENOS = ord("-")
+ZERO = ord("0")
+
+# Dígitos que cabem na mantissa inteira sem perder precisão (2**53)
+MAX_DIGITOS = 15
+
+_POTENCIAS = 10.0 ** np.arange(MAX_DIGITOS + 1)
+
+
+def _intervalos(buffer, chaves):
+    # Início e fim do texto de cada campo, a partir das posições das aspas.
+    # Cada registro tem 4 aspas por chave: "chave":"valor"
+    aspas = np.flatnonzero(buffer == ASPAS)
+    por_registro = 4 * len(chaves)
+    if aspas.size % por_registro:
+        return None
+    aspas = aspas.reshape(-1, por_registro)
+    # Confere o nome das chaves em todos os registros: garante que as aspas estão alinhadas
+    for posicao, chave in enumerate(chaves):
+        inicio, fim = aspas[:, 4 * posicao] + 1, aspas[:, 4 * posicao + 1]
+        esperado = np.frombuffer(chave.encode(), dtype=np.uint8)
+        if not (fim - inicio == esperado.size).all() or not (_texto_fixo(buffer, inicio, esperado.size) == esperado).all():
+            return None
+    return {
+        chave: (aspas[:, 4 * posicao + 2] + 1, aspas[:, 4 * posicao + 3])
+        for posicao, chave in enumerate(chaves)
+    }
+
+
+def _texto_fixo(buffer, inicio, largura):
+    # Campos mais curtos que `largura` no fim do buffer repetem o último byte; o
+    # excesso fica fora da máscara `dentro` de quem lê
+    return buffer[np.minimum(inicio[:, None] + np.arange(largura), len(buffer) - 1)]
+
+
+def _datas(buffer, inicio, fim):
+    # dd/mm/aaaa em largura fixa -> datetime64[ns]
+    if not (fim - inicio == 10).all():
+        return None
+    texto = _texto_fixo(buffer, inicio, 10)
+    if not ((texto[:, 2] == BARRA) & (texto[:, 5] == BARRA)).all():
+        return None
+    digitos = texto[:, [0, 1, 3, 4, 6, 7, 8, 9]].astype(np.int64) - ZERO
+    if ((digitos < 0) | (digitos > 9)).any():
+        return None
+    dia = digitos[:, 0] * 10 + digitos[:, 1]
+    mes = digitos[:, 2] * 10 + digitos[:, 3]
+    ano = digitos[:, 4] * 1000 + digitos[:, 5] * 100 + digitos[:, 6] * 10 + digitos[:, 7]
+    if ((mes < 1) | (mes > 12) | (dia < 1)).any():
+        return None
+    meses = (ano - 1970) * 12 + (mes - 1)
+    primeiro_dia = meses.astype("datetime64[M]").astype("datetime64[D]")
+    datas = primeiro_dia + (dia - 1).astype("timedelta64[D]")
+    # Dia além do fim do mês (31/04) escorregaria para o mês seguinte
+    if (datas.astype("datetime64[M]") != primeiro_dia.astype("datetime64[M]")).any():
+        return None
+    return datas.astype("datetime64[ns]")
+
+
+def _valores(buffer, inicio, fim):
+    # Decimais como "-12.345" -> float64; texto vazio vira NaN (como errors="coerce")
+    tamanhos = fim - inicio
+    largura = int(tamanhos.max(initial=0))
+    if largura > MAX_DIGITOS + 2:
+        return None
+    texto = _texto_fixo(buffer, inicio, max(largura, 1))
+    dentro = np.arange(max(largura, 1)) < tamanhos[:, None]
+    negativo = texto[:, 0] == MENOS
+    sinal = dentro & (np.arange(texto.shape[1]) == 0) & negativo[:, None]
+    ponto = dentro & (texto == PONTO)
+    digito = dentro & ~sinal & ~ponto
+    if (((texto < ZERO) | (texto > ZERO + 9)) & digito).any() or (ponto.sum(axis=1) > 1).any():
+        return None
+    quantidade = digito.sum(axis=1)
+    if (quantidade > MAX_DIGITOS).any():
+        return None
+
+    # Mantissa inteira (Horner, uma coluna por vez) e casas depois do ponto
+    mantissa = np.zeros(len(texto), dtype=np.int64)
+    casas = np.zeros(len(texto), dtype=np.int64)
+    depois_do_ponto = np.zeros(len(texto), dtype=bool)
+    for coluna in range(texto.shape[1]):
+        e_digito = digito[:, coluna]
+        mantissa = np.where(e_digito, mantissa * 10 + (texto[:, coluna].astype(np.int64) - ZERO), mantissa)
+        casas += e_digito & depois_do_ponto
+        depois_do_ponto |= ponto[:, coluna]
+
+    valores = mantissa / _POTENCIAS[casas]
+    valores = np.where(negativo, -valores, valores)
+    return np.where(quantidade == 0, np.nan, valores)
+
+
+def ler_generico(conteudo):
+    df = pd.DataFrame(json.loads(conteudo), columns=["data", "valor"])
+    return (
+        pd.to_datetime(df["data"], dayfirst=True).to_numpy(),
+        pd.to_numeric(df["valor"], errors="coerce").to_numpy(dtype="float64"),
+    )
+
+
+def _ler_rapido(buffer, chaves):
+    intervalos = _intervalos(buffer, chaves)
+    if intervalos is None:
+        return None
+    datas = _datas(buffer, *intervalos["data"])
+    valores = _valores(buffer, *intervalos["valor"])
+    if datas is None or valores is None:
+        return None
+    return datas, valores
+
+
+def ler_sgs(conteudo):
+    # Bytes da resposta do SGS -> (datas datetime64[ns], valores float64)
+    buffer = np.frombuffer(conteudo, dtype=np.uint8)
+    inicio_registro = conteudo.find(b"{")
+    if inicio_registro < 0:
+        return np.array([], dtype="datetime64[ns]"), np.array([], dtype="float64")
+    # As chaves e a ordem delas vêm do primeiro registro
+    primeiro = json.loads(conteudo[inicio_registro:conteudo.index(b"}", inicio_registro) + 1])
+    chaves = list(primeiro)
+    if {"data", "valor"} <= set(chaves) and b"\\" not in conteudo:
+        # Qualquer falha do caminho rápido cai no genérico, que valida o JSON inteiro
+        try:
+            resultado = _ler_rapido(buffer, chaves)
+        except Exception:
+            resultado = None
+        if resultado is not None:
+            return resultado
+    return ler_generico(conteudo)
+
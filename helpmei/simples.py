@@ -0,0 +1,360 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from helpmei.diario import fechado_ate
+
+# Simples Nacional: receita bruta mensal tirada do diário, RBT12, alíquota efetiva
+# pelos anexos da LC 123/2006 e provisão do DAS em 2.1.4.01.01. A receita por mês
+# de cada livro é somada só com os lançamentos gravados desde a última apuração:
+# o registro só cresce (desfazer e limpar também gravam lançamentos novos).
+
+PREFIXO_RECEITA = "3.1.1.01."
+CONTA_DAS = "3.1.2.01.01"
+CONTA_PROVISAO = "2.1.4.01.01"
+
+REGIMES = ["MEI", "Simples Nacional"]
+
+# Limite superior de cada faixa da RBT12 (LC 123/2006, redação da LC 155/2016)
+FAIXAS = np.array([180_000.0, 360_000.0, 720_000.0, 1_800_000.0, 3_600_000.0, 4_800_000.0])
+
+# Alíquota nominal e parcela a deduzir de cada faixa
+ANEXOS = {
+    "I": ([0.04, 0.073, 0.095, 0.107, 0.143, 0.19], [0, 5_940, 13_860, 22_500, 87_300, 378_000]),
+    "II": ([0.045, 0.078, 0.10, 0.112, 0.147, 0.30], [0, 5_940, 13_860, 22_500, 85_500, 720_000]),
+    "III": ([0.06, 0.112, 0.135, 0.16, 0.21, 0.33], [0, 9_360, 17_640, 35_640, 125_640, 648_000]),
+    "IV": ([0.045, 0.09, 0.102, 0.14, 0.22, 0.33], [0, 8_100, 12_420, 39_780, 183_780, 828_000]),
+    "V": ([0.155, 0.18, 0.195, 0.205, 0.23, 0.305], [0, 4_500, 9_900, 17_100, 62_100, 540_000]),
+}
+NOMES_ANEXOS = list(ANEXOS)
+ALIQUOTAS = np.array([ANEXOS[anexo][0] for anexo in NOMES_ANEXOS])
+DEDUCOES = np.array([ANEXOS[anexo][1] for anexo in NOMES_ANEXOS], dtype="float64")
+
+# Comércio no Anexo I, indústria no II, serviços no III (sem fator R)
+ANEXO_POR_CONTA = {"3.1.1.01.01": "III", "3.1.1.01.02": "I", "3.1.1.01.03": "II"}
+ANEXO_PADRAO = "III"
+
+# MEI: limite anual de receita bruta, proporcional aos meses do ano de abertura.
+# Até 20% acima, o desenquadramento vale a partir do ano seguinte; além disso, retroage a janeiro.
+LIMITE_MEI = 81_000.0
+ALERTA_MEI = 0.8
+TOLERANCIA_MEI = 0.2
+
+# DAS do MEI (SIMEI): 5% do salário mínimo de INSS, mais R$ 1 de ICMS para comércio
+# e indústria e R$ 5 de ISS para serviços. Anos depois do último usam o último valor.
+SALARIO_MINIMO = {2020: 1_045.0, 2021: 1_100.0, 2022: 1_212.0, 2023: 1_320.0, 2024: 1_412.0, 2025: 1_518.0}
+INSS_MEI = 0.05
+ICMS_MEI = 1.0
+ISS_MEI = 5.0
+
+COLUNAS = ["Receita", "RBT12", "Faixa", "Alíquota efetiva", "DAS"]
+
+# Livros com receita acumulada na memória do processo
+MAX_LIVROS = 10_000
+
+_SQL_RECEITAS = """
+    SELECT substr(data, 1, 7) AS mes, conta, -SUM(valor) AS receita FROM partidas
+    WHERE livro_id = ? AND lancamento_id > ? AND lancamento_id <= ?
+      AND conta >= ? AND conta < ?
+    GROUP BY mes, conta
+"""
+
+_VAZIO = pd.DataFrame(index=pd.DatetimeIndex([], name="Mês"), dtype="float64")
+
+_acumulado = OrderedDict()
+_trava = threading.Lock()
+
+
+def _receitas_sqlite(diario):
+    # Soma ao acumulado do livro só as partidas de receita depois do último lançamento visto.
+    # criado_em entra na chave para um livro apagado e recriado com o mesmo id começar do zero.
+    conexao = diario.banco.conexao()
+    criado_em, ultimo = conexao.execute(
+        "SELECT criado_em, (SELECT COALESCE(MAX(id), 0) FROM lancamentos WHERE livro_id = livros.id) "
+        "FROM livros WHERE id = ?",
+        (diario.livro_id,),
+    ).fetchone()
+    chave = (diario.id, criado_em)
+    with _trava:
+        visto, acumulado = _acumulado.get(chave, (0, _VAZIO))
+    if ultimo > visto:
+        novas = pd.read_sql_query(
+            _SQL_RECEITAS, conexao,
+            params=(diario.livro_id, visto, ultimo, PREFIXO_RECEITA, PREFIXO_RECEITA[:-1] + "/"),
+        )
+        novas = _por_mes(novas.set_index(["mes", "conta"])["receita"])
+        acumulado = acumulado.add(novas, fill_value=0.0).fillna(0.0)
+        with _trava:
+            if _acumulado.get(chave, (0,))[0] < ultimo:
+                _acumulado[chave] = (ultimo, acumulado)
+    with _trava:
+        if chave in _acumulado:
+            _acumulado.move_to_end(chave)
+        while len(_acumulado) > MAX_LIVROS:
+            _acumulado.popitem(last=False)
+    return acumulado
+
+
+def _receitas_memoria(diario):
+    partidas = diario.partidas()
+    partidas = partidas[partidas["Conta"].str.startswith(PREFIXO_RECEITA)]
+    return _por_mes(-partidas.groupby(
+        [partidas["Data"].dt.strftime("%Y-%m").rename("mes"), partidas["Conta"].rename("conta")]
+    )["Valor"].sum())
+
+
+def _por_mes(receitas):
+    # Série (mês "AAAA-MM", conta) -> uma linha por mês e uma coluna por conta
+    receitas = receitas.unstack("conta", fill_value=0.0).rename_axis(columns=None)
+    receitas.index = pd.to_datetime(receitas.index + "-01", format="%Y-%m-%d").rename("Mês")
+    return receitas
+
+
+def receitas_mensais(diario):
+    # Receita bruta (créditos menos débitos em 3.1.1.01.*) por mês e conta
+    receitas = _receitas_sqlite(diario) if hasattr(diario, "banco") else _receitas_memoria(diario)
+    return receitas.sort_index().round(2)
+
+
+def _ordinal(mes):
+    return mes.year * 12 + mes.month - 1
+
+
+def calcular_das(receitas, regime="Simples Nacional", ate=None):
+    # receitas: índice (livro, mês) e uma coluna por conta de receita. Devolve, para cada
+    # livro, todos os meses do primeiro com receita até o último (ou até `ate`), com a
+    # RBT12 dos 12 meses anteriores e o DAS do mês, tudo em arrays, sem laço por livro.
+    # No começo da atividade a RBT12 é a média dos meses anteriores vezes 12 (no primeiro
+    # mês, a própria receita vezes 12), como no art. 18 da LC 123/2006.
+    if receitas.empty:
+        indice = pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])], names=["Livro", "Mês"])
+        return pd.DataFrame(columns=COLUNAS, index=indice, dtype="float64")
+    receitas = receitas.sort_index()
+    codigos, livros = pd.factorize(receitas.index.get_level_values(0), sort=True)
+    ordinais = np.asarray(_ordinal(receitas.index.get_level_values(1)))
+    primeiro = np.full(len(livros), np.iinfo(np.int64).max)
+    np.minimum.at(primeiro, codigos, ordinais)
+    ultimo = np.zeros(len(livros), dtype=np.int64)
+    np.maximum.at(ultimo, codigos, ordinais)
+    if ate is not None:
+        ultimo = np.maximum(ultimo, _ordinal(pd.Timestamp(ate)))
+
+    # Uma linha por livro e mês, inclusive os meses sem receita
+    tamanhos = ultimo - primeiro + 1
+    inicio_livro = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    linha_livro = np.repeat(np.arange(len(livros)), tamanhos)
+    total = int(tamanhos.sum())
+    posicao = np.arange(total) - inicio_livro[linha_livro]
+    ordinal_linha = primeiro[linha_livro] + posicao
+    por_conta = np.zeros((total, receitas.shape[1]))
+    por_conta[inicio_livro[codigos] + ordinais - primeiro[codigos]] = receitas.to_numpy()
+    receita = por_conta.sum(axis=1)
+
+    # Soma dos até 12 meses anteriores pela diferença de somas acumuladas
+    acumulada = np.concatenate([[0.0], np.cumsum(receita)])
+    linhas = np.arange(total)
+    janela = np.maximum(linhas - 12, inicio_livro[linha_livro])
+    anteriores = acumulada[linhas] - acumulada[janela]
+    rbt12 = np.where(posicao == 0, receita * 12, anteriores / np.maximum(np.minimum(posicao, 12), 1) * 12)
+    rbt12 = np.round(rbt12, 2)
+
+    # Acima de R$ 4,8 milhões a empresa sai do Simples; a última faixa é mantida só para a conta
+    faixa = np.searchsorted(FAIXAS, rbt12, side="left")
+    limitada = np.minimum(faixa, len(FAIXAS) - 1)
+    positiva = rbt12 > 0
+    efetivas = np.where(
+        positiva,
+        (rbt12 * ALIQUOTAS[:, limitada] - DEDUCOES[:, limitada]) / np.where(positiva, rbt12, 1.0),
+        ALIQUOTAS[:, limitada],
+    )
+    anexos = [NOMES_ANEXOS.index(ANEXO_POR_CONTA.get(conta, ANEXO_PADRAO)) for conta in receitas.columns]
+    servicos = np.array([NOMES_ANEXOS[anexo] not in ("I", "II") for anexo in anexos])
+
+    if regime == "MEI":
+        anos = sorted(SALARIO_MINIMO)
+        salario = np.array([SALARIO_MINIMO[ano] for ano in anos])[
+            np.clip(np.searchsorted(anos, ordinal_linha // 12, side="right") - 1, 0, None)
+        ]
+        # Atividades do livro: as contas de receita usadas até aquele mês
+        usos = np.cumsum(por_conta != 0, axis=0)
+        antes = np.vstack([np.zeros((1, usos.shape[1]), dtype=usos.dtype), usos])[inicio_livro]
+        usadas = usos - antes[linha_livro] > 0
+        das = (
+            INSS_MEI * salario
+            + ICMS_MEI * (usadas & ~servicos).any(axis=1)
+            + ISS_MEI * (usadas & servicos).any(axis=1)
+        )
+    else:
+        das = np.clip((por_conta * efetivas[anexos].T).sum(axis=1), 0, None)
+    das = np.round(das, 2)
+
+    meses = pd.to_datetime(pd.DataFrame({"year": ordinal_linha // 12, "month": ordinal_linha % 12 + 1, "day": 1}))
+    indice = pd.MultiIndex.from_arrays([livros[linha_livro], meses], names=["Livro", "Mês"])
+    return pd.DataFrame({
+        "Receita": np.round(receita, 2),
+        "RBT12": rbt12,
+        "Faixa": faixa + 1,
+        "Alíquota efetiva": np.where(receita > 0, das / np.where(receita > 0, receita, 1.0), 0.0),
+        "DAS": das,
+    }, index=indice)
+
+
+def apurar(diario, regime="Simples Nacional", ate=None):
+    # DAS de um livro, um mês por linha
+    receitas = pd.concat({diario.id: receitas_mensais(diario)}, names=["Livro"])
+    return calcular_das(receitas, regime, ate).droplevel("Livro")
+
+
+def apurar_livros(banco, livros, regime="Simples Nacional", ate=None):
+    # Vários livros numa conta só; o índice traz o id de cada livro
+    from helpmei.armazenamento import DiarioSQLite
+
+    if not livros:
+        return calcular_das(pd.DataFrame())
+    receitas = pd.concat(
+        {livro_id: receitas_mensais(DiarioSQLite(banco, livro_id)) for livro_id in livros}, names=["Livro"]
+    ).fillna(0.0)
+    return calcular_das(receitas, regime, ate)
+
+
+def uso_limite_mei(apuracao):
+    # Receita de cada livro por ano contra o limite do MEI
+    livros = apuracao.index.get_level_values("Livro")
+    anos = apuracao.index.get_level_values("Mês").year
+    por_ano = apuracao["Receita"].groupby([livros, anos]).sum().rename("Receita").to_frame()
+    por_ano.index.names = ["Livro", "Ano"]
+    # No ano de abertura o limite vale só para os meses a partir do primeiro com receita
+    abertura = apuracao.index.to_frame(index=False).groupby("Livro")["Mês"].min()
+    anos_abertura = abertura.reindex(por_ano.index.get_level_values("Livro")).dt.year.to_numpy()
+    meses_abertura = 13 - abertura.reindex(por_ano.index.get_level_values("Livro")).dt.month.to_numpy()
+    meses = np.where(por_ano.index.get_level_values("Ano") == anos_abertura, meses_abertura, 12)
+    por_ano["Limite"] = LIMITE_MEI / 12 * meses
+    por_ano["Uso"] = por_ano["Receita"] / por_ano["Limite"]
+    por_ano["Situação"] = np.select(
+        [por_ano["Uso"] > 1 + TOLERANCIA_MEI, por_ano["Uso"] > 1, por_ano["Uso"] >= ALERTA_MEI],
+        ["Acima do limite em mais de 20%", "Acima do limite", "Perto do limite"],
+        "Dentro do limite",
+    )
+    return por_ano
+
+
+def aviso_limite_mei(apuracao, ano):
+    # Mensagem para o ano informado de um livro (apuração de apurar), ou None
+    if apuracao.empty:
+        return None
+    uso = uso_limite_mei(pd.concat({"livro": apuracao}, names=["Livro"])).droplevel("Livro")
+    if ano not in uso.index:
+        return None
+    linha = uso.loc[ano]
+    receita = f"R$ {linha['Receita']:,.2f}".replace(".", ",")
+    limite = f"R$ {linha['Limite']:,.2f}".replace(".", ",")
+    if linha["Situação"] == "Perto do limite":
+        return (f"A receita de {ano} ({receita}) já é {linha['Uso']:.0%} do limite do MEI ({limite}). "
+                "Acima dele, a empresa passa a ser ME no Simples Nacional.")
+    if linha["Situação"] == "Acima do limite":
+        return (f"A receita de {ano} ({receita}) passou do limite do MEI ({limite}) em até 20%: "
+                f"o desenquadramento vale a partir de janeiro de {ano + 1}, e o excesso paga DAS como ME.")
+    if linha["Situação"] == "Acima do limite em mais de 20%":
+        return (f"A receita de {ano} ({receita}) passou do limite do MEI ({limite}) em mais de 20%: "
+                f"o desenquadramento retroage a janeiro de {ano}.")
+    return None
+
+
+def _provisionado(diario):
+    # Provisão já lançada por mês: saldo de 3.1.2.01.01 com data naquele mês
+    if hasattr(diario, "banco"):
+        df = pd.read_sql_query(
+            "SELECT substr(data, 1, 7) AS mes, SUM(valor) AS valor FROM partidas "
+            "WHERE livro_id = ? AND conta = ? GROUP BY mes",
+            diario.banco.conexao(), params=(diario.livro_id, CONTA_DAS),
+        )
+        provisionado = df.set_index("mes")["valor"]
+    else:
+        partidas = diario.partidas()
+        partidas = partidas[partidas["Conta"] == CONTA_DAS]
+        provisionado = partidas.groupby(partidas["Data"].dt.strftime("%Y-%m"))["Valor"].sum()
+    provisionado.index = pd.to_datetime(provisionado.index + "-01", format="%Y-%m-%d").rename("Mês")
+    return provisionado.astype("float64")
+
+
+def provisoes(diario, regime="Simples Nacional", ate=None):
+    # Apuração de cada mês com o que já foi provisionado e a diferença a lançar. Meses
+    # só com provisão (fora do período com receita) entram zerados, para ela ser estornada
+    apuracao = apurar(diario, regime, ate)
+    provisionado = _provisionado(diario)
+    meses = apuracao.index.union(provisionado.index)
+    tabela = apuracao.reindex(meses, fill_value=0).astype({"Faixa": "int64"})
+    tabela["Provisionado"] = provisionado.reindex(meses, fill_value=0.0)
+    tabela["Diferença"] = (tabela["DAS"] - tabela["Provisionado"]).round(2)
+    return tabela.rename_axis("Mês")
+
+
+def provisionar(diario, regime="Simples Nacional", ate=None):
+    # Lança a diferença de cada mês em aberto no último dia dele (D 3.1.2.01.01 / C 2.1.4.01.01;
+    # diferença negativa inverte as partidas). Um lote só: um Desfazer remove tudo.
+    # Devolve quantos meses foram ajustados.
+    tabela = provisoes(diario, regime, ate)
+    fins = tabela.index + pd.offsets.MonthEnd(0)
+    pendentes = tabela["Diferença"].abs() >= 0.01
+    limite = fechado_ate(diario)
+    if limite is not None:
+        pendentes &= fins > limite
+    lote = [
+        (fim.date(), [(CONTA_DAS, diferenca), (CONTA_PROVISAO, -diferenca)], f"Provisão do DAS {fim:%m/%Y}")
+        for fim, diferenca in zip(fins[pendentes], tabela.loc[pendentes, "Diferença"].tolist())
+    ]
+    if lote:
+        diario.lancar_lote(lote)
+    return len(lote)
+
+
+def principal(argumentos=None):
+    # Mede a apuração num livro sintético: primeira vez (lê toda a receita), de novo
+    # depois de um lançamento (só a cauda) e em vários livros de uma vez
+    from helpmei.armazenamento import BancoLivros
+    from helpmei.desempenho import gerar_lancamentos, montar_livro
+
+    parser = argparse.ArgumentParser(prog="python -m helpmei.simples",
+                                     description="Mede a apuração do Simples Nacional.")
+    parser.add_argument("--lancamentos", type=int, default=100_000)
+    parser.add_argument("--livros", type=int, default=200, help="livros da apuração em lote")
+    parser.add_argument("--regime", choices=REGIMES, default="Simples Nacional")
+    parser.add_argument("--pasta", help="onde guardar o banco (reaproveitado entre execuções)")
+    opcoes = parser.parse_args(argumentos)
+
+    pasta = opcoes.pasta or tempfile.mkdtemp(prefix="helpmei-simples-")
+    banco = BancoLivros(os.path.join(pasta, "simples.db"))
+    diario = banco.diario(montar_livro(banco, opcoes.lancamentos))
+
+    for rotulo, antes in (
+        ("primeira apuração", None),
+        ("depois de um lançamento", lambda: diario.lancar("2025-12-15", "1.1.1.01.01", "3.1.1.01.01", 1_000.0)),
+    ):
+        if antes:
+            antes()
+        inicio = time.perf_counter()
+        apuracao = apurar(diario, opcoes.regime)
+        print(f"{rotulo:<28}{1000 * (time.perf_counter() - inicio):>10,.1f} ms")
+    ultimo = apuracao.iloc[-1]
+    print(f"{apuracao.index[-1]:%m/%Y}: RBT12 R$ {ultimo['RBT12']:,.2f}, "
+          f"alíquota efetiva {ultimo['Alíquota efetiva']:.2%}, DAS R$ {ultimo['DAS']:,.2f}")
+
+    livros = []
+    for numero in range(opcoes.livros):
+        nome = f"simples-{numero}"
+        livro = banco.diario(nome)
+        if not len(livro):
+            livro.lancar_lote(list(gerar_lancamentos(500, semente=numero)))
+        livros.append(livro.livro_id)
+    for rotulo in ("lote de livros", "lote sem mudanças"):
+        inicio = time.perf_counter()
+        lote = apurar_livros(banco, livros, opcoes.regime)
+        print(f"{rotulo:<28}{1000 * (time.perf_counter() - inicio):>10,.1f} ms ({len(lote):,} meses)")
+
+
+if __name__ == "__main__":
+    principal()
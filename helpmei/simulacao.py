@@ -0,0 +1,119 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from helpmei.relatorios import somar_prefixos
+
+# Séries simuladas, na ordem das colunas dos caminhos
+INDICADORES = ["SELIC", "IPCA", "Inadimplencia"]
+
+PERCENTIS = (5, 25, 50, 75, 95)
+
+METODOS = {"bootstrap": "Bootstrap das variações mensais", "ar1": "Modelo AR(1) por indicador"}
+
+# Contas do livro usadas como ponto de partida da projeção
+PREFIXOS_DIVIDA = ("2.1.3", "2.2.1")
+
+
+def _caminhos_bootstrap(historico, meses, caminhos, gerador):
+    # Sorteia meses inteiros do histórico: as três variações do mesmo mês
+    # andam juntas e a correlação entre os indicadores é preservada
+    variacoes = np.diff(historico, axis=0)
+    sorteio = gerador.integers(0, len(variacoes), size=(caminhos, meses))
+    return historico[-1] + np.cumsum(variacoes[sorteio], axis=1)
+
+
+def _caminhos_ar1(historico, meses, caminhos, gerador):
+    # x[t] = a + b * x[t-1] + e, com os resíduos sorteados em conjunto
+    anterior, atual = historico[:-1], historico[1:]
+    media_anterior, media_atual = anterior.mean(axis=0), atual.mean(axis=0)
+    desvio = anterior - media_anterior
+    b = (desvio * (atual - media_atual)).sum(axis=0) / (desvio ** 2).sum(axis=0)
+    b = np.clip(b, -0.999, 0.999)
+    a = media_atual - b * media_anterior
+    residuos = atual - (a + b * anterior)
+
+    sorteio = gerador.integers(0, len(residuos), size=(caminhos, meses))
+    choques = residuos[sorteio]
+    saida = np.empty((caminhos, meses, historico.shape[1]))
+    nivel = np.broadcast_to(historico[-1], (caminhos, historico.shape[1]))
+    for mes in range(meses):
+        nivel = a + b * nivel + choques[:, mes]
+        saida[:, mes] = nivel
+    return saida
+
+
+GERADORES = {"bootstrap": _caminhos_bootstrap, "ar1": _caminhos_ar1}
+
+
+def _simular_bloco(historico, meses, caminhos, metodo, semente):
+    gerador = np.random.default_rng(semente)
+    # Taxas não ficam negativas
+    return np.clip(GERADORES[metodo](historico, meses, caminhos, gerador), 0.0, None)
+
+
+def simular_indicadores(df, meses=24, caminhos=10_000, metodo="bootstrap", semente=None, processos=None):
+    # Caminhos futuros de SELIC, IPCA e inadimplência: array (caminhos, meses, 3).
+    # Com `processos`, os caminhos são divididos em blocos com sementes independentes.
+    historico = df.sort_values("Date")[INDICADORES].dropna().to_numpy(dtype="float64")
+    if len(historico) < 3:
+        raise ValueError("Histórico insuficiente para simular: selecione um período maior.")
+    if metodo not in GERADORES:
+        raise ValueError(f"Método de simulação desconhecido: {metodo}.")
+
+    if not processos or processos < 2:
+        return _simular_bloco(historico, meses, caminhos, metodo, semente)
+
+    sementes = np.random.SeedSequence(semente).spawn(processos)
+    tamanhos = np.diff(np.linspace(0, caminhos, processos + 1).astype(int))
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        blocos = executor.map(
+            _simular_bloco,
+            [historico] * processos, [meses] * processos, tamanhos, [metodo] * processos, sementes,
+        )
+        return np.concatenate(list(blocos), axis=0)
+
+
+def projetar_caixa(caminhos, caixa_inicial, receita_mensal, despesa_mensal, divida=0.0, spread=0.0):
+    # Projeção mensal do caixa em cada caminho, sem laço sobre meses:
+    # receitas e despesas corrigidas pelo IPCA, receita recebida descontada
+    # da inadimplência e juros da dívida a SELIC + spread (% a.a.)
+    selic, ipca, inadimplencia = caminhos[..., 0], caminhos[..., 1], caminhos[..., 2]
+    inflacao_mensal = (1 + ipca / 100) ** (1 / 12) - 1
+    indice_precos = np.cumprod(1 + inflacao_mensal, axis=1)
+    juros_mensais = (1 + (selic + spread) / 100) ** (1 / 12) - 1
+
+    juros = divida * juros_mensais
+    recebido = receita_mensal * indice_precos * (1 - inadimplencia / 100)
+    fluxo = recebido - despesa_mensal * indice_precos - juros
+    return {
+        "caixa": caixa_inicial + np.cumsum(fluxo, axis=1),
+        "custo_divida": np.cumsum(juros, axis=1),
+    }
+
+
+def faixas(matriz, percentis=PERCENTIS, inicio=None):
+    # Percentis por mês (colunas P5, P25, ...), um mês por linha
+    valores = np.percentile(matriz, percentis, axis=0).T
+    indice = (
+        pd.RangeIndex(1, matriz.shape[1] + 1, name="Mês") if inicio is None
+        else pd.date_range(pd.Timestamp(inicio) + pd.offsets.MonthBegin(1), periods=matriz.shape[1], freq="MS", name="Mês")
+    )
+    return pd.DataFrame(valores, index=indice, columns=[f"P{p}" for p in percentis])
+
+
+def base_do_livro(diario, ate=None, meses=12):
+    # Caixa, dívida e médias mensais de receita e despesa do livro da calculadora
+    ate = pd.Timestamp.today().normalize() if ate is None else pd.Timestamp(ate).normalize()
+    saldos = diario.saldos(ate=ate)
+    codigos = pd.Index(saldos.index, dtype="object")
+    valores = saldos.to_numpy(dtype="float64")
+
+    totais = diario.totais_entre(ate - pd.DateOffset(months=meses), ate)
+    codigos_periodo = pd.Index(totais.index, dtype="object")
+    resultado = (totais["Créditos"] - totais["Débitos"]).to_numpy(dtype="float64")
+    return {
+        "caixa": somar_prefixos(codigos, valores, ("1.1.1",)),
+        "divida": -somar_prefixos(codigos, valores, PREFIXOS_DIVIDA),
+        "receita_mensal": somar_prefixos(codigos_periodo, resultado, ("3.1",)) / meses,
+        "despesa_mensal": -somar_prefixos(codigos_periodo, resultado, ("3.2", "3.3")) / meses,
+    }
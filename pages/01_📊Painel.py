@@ -1,24 +1,24 @@
 import streamlit as st
 import pandas as pd
-import requests
-import plotly.express as px
 import os
-import streamlit.components.v1 as components
-from PIL import Image
+from datetime import date
+from helpmei.importacao import importar_tarde
+from helpmei.armazenamento import banco_compartilhado, nome_livro_sessao
+from helpmei.financiamento import PRAZOS, SISTEMAS, SPREADS, cenarios, contratar, cronograma, taxas_selic
+from helpmei.focus import INTERVALO_ATUALIZACAO, atualizar_focus, expectativas, ultima_atualizacao, ultimas_medianas
+from helpmei.simulacao import METODOS, base_do_livro, faixas, projetar_caixa, simular_indicadores
+from helpmei.graficos import grafico_indicadores
+from helpmei.indicadores import INDICADORES, tendencia
+from helpmei.layout import configurar_pagina, rodape
+from helpmei.metricas import medido, medir
+from helpmei.publicacao import INDICADORES_PUBLICADOS
+
+# Carregados só quando usados: o primeiro acesso a um atributo faz o import
+px = importar_tarde("plotly.express")
+requests = importar_tarde("requests")
 
 # Configuração da página
-st.set_page_config(
-    page_title="Painel Econômico Interativo para MEI",
-    layout="wide",
-    page_icon="📊",
-    menu_items={}  # Desativa o menu automático
-)
-
-st.logo(
-    'assets/HELPMEI.png',
-    size="large",
-    icon_image='assets/logo.png',
-)
+configurar_pagina("Painel Econômico Interativo para MEI", "📊", layout="wide")
 
 # Cores dos indicadores
 CORES = {
@@ -27,238 +27,270 @@ CORES = {
     "Inadimplencia": "#E74C3C"
 }
 
-# Função para configurar a sidebar
-
-with st.sidebar:
-        # Espaço vazio para empurrar o logo para baixo
-        st.title("🔗 Mais Informações para MEI")
-        st.markdown("""
-            <p style="font-size:15px; margin-top:15px;">
-                <a href="https://sebrae.com.br/sites/PortalSebrae/mei" target="_blank" style="color:#4169E1; text-decoration:none;">
-                    👉 Acesse agora o Portal Sebrae MEI
-                </a>
-            </p>
-
-            <p style="font-size:16px; margin-top:20px;">Lá você encontra orientações sobre:</p>
-            <ul style="font-size:16px; color:#FFFFFF;">
-                <li>📝 Regularização</li>
-                <li>💰 Tributação</li>
-                <li>🧾 Emissão de nota</li>
-                <li>🎁 Benefícios</li>
-                <li>🔍 E mais!</li>
-            </ul>
-        """, unsafe_allow_html=True)
-        st.markdown("---")
-        st.markdown(
-        """
-        <span style='color: #FFFFFF; font-weight: bold;'>Help MEI</span><br>
-        <span style='color: #FF5F15; font-style: italic;'>Visualize hoje. Cresça amanhã.</span>
-        """, 
-        unsafe_allow_html=True
-    )
 
 # Funções de dados 
-def baixar_serie_bacen(codigo_serie, nome_serie):
-    url = f'https://api.bcb.gov.br/dados/serie/bcdata.sgs.{codigo_serie}/dados?formato=json'
-    resposta = requests.get(url)
-    dados = resposta.json()
-    df = pd.DataFrame(dados)
-    df['data'] = pd.to_datetime(df['data'], dayfirst=True)
-    df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
-    df = df.rename(columns={'data': 'Date', 'valor': nome_serie})
-    return df
-
-def load_data():
-    selic_df = baixar_serie_bacen(4189, 'SELIC')
-    ipca_df = baixar_serie_bacen(13522, 'IPCA')
-    inad_df = baixar_serie_bacen(15885, 'Inadimplencia')
-    df = selic_df.merge(ipca_df, on='Date').merge(inad_df, on='Date').dropna()
-    df['Ano'] = df['Date'].dt.year
-    df['Mês'] = df['Date'].dt.month
-    return df
-
+@medido()
 def save_excel(df):
     relatorio = 'relatorio_mei.xlsx'
     if os.path.exists(relatorio):
         os.remove(relatorio)
     df.to_excel(relatorio, index=False)
 
-def classificar_indicador(nome, valor):
-    if nome == "IPCA":
-        if valor <= 1.5:
-            return "Muito Baixo"
-        elif valor <= 4.5:
-            return "Estável"
-        elif valor <= 6:
-            return "Alto"
-        else:
-            return "Muito Alto"
-    elif nome == "SELIC":
-        if valor <= 8:
-            return "Baixa"
-        elif valor <= 12:
-            return "Moderada"
-        elif valor <= 15:
-            return "Alta"
-        else:
-            return "Muito Alta"
-    elif nome == "Inadimplencia":
-        if valor <= 3:
-            return "Baixa"
-        elif valor <= 5:
-            return "Moderada"
-        else:
-            return "Alta"
-    return "Indefinido"
-
-
-# Partículas de fundo
-particles_background = """
-<style>
-    #particles-js {
-        position: fixed;
-        width: 100%;
-        height: 100%;
-        z-index: -1;
-        top: 0;
-        left: 0;
+@st.cache_data(ttl=INTERVALO_ATUALIZACAO, max_entries=4, show_spinner=False)
+def ler_focus(atualizado_em):
+    # Só a leitura do SQLite fica em cache, uma entrada por atualização gravada
+    return expectativas(banco_compartilhado())
+
+def carregar_focus():
+    # A API só é consultada quando o cache local está velho (atualizar_focus confere);
+    # o aviso de falha vale só para esta execução, e a próxima tenta de novo
+    banco = banco_compartilhado()
+    aviso = None
+    try:
+        with st.spinner("Atualizando expectativas do Focus..."):
+            atualizar_focus(banco)
+    except requests.RequestException:
+        aviso = "Não foi possível consultar o Focus agora; exibindo as últimas expectativas guardadas."
+    except (KeyError, TypeError, ValueError):
+        aviso = "O Focus respondeu num formato inesperado; exibindo as últimas expectativas guardadas."
+    return ler_focus(ultima_atualizacao(banco)), aviso
+
+@st.cache_data(max_entries=32, show_spinner="Simulando cenários...")
+def simular_cenarios(df, meses, caminhos, metodo, caixa, receita, despesa, divida, spread):
+    trajetorias = simular_indicadores(df, meses=meses, caminhos=caminhos, metodo=metodo, semente=42)
+    projecao = projetar_caixa(trajetorias, caixa, receita, despesa, divida=divida, spread=spread)
+    inicio = df['Date'].max()
+    return {
+        "caixa": faixas(projecao["caixa"], inicio=inicio),
+        "custo_divida": faixas(projecao["custo_divida"], inicio=inicio),
+        "selic": faixas(trajetorias[..., 0], inicio=inicio),
+        "ipca": faixas(trajetorias[..., 1], inicio=inicio),
+        "caixa_negativo": float((projecao["caixa"].min(axis=1) < 0).mean()),
     }
-</style>
-<div id="particles-js"></div>
-<script src="https://cdn.jsdelivr.net/npm/particles.js@2.0.0/particles.min.js"></script>
-<script>
-particlesJS("particles-js", {
-    "particles": {
-        "number": {
-            "value": 80,
-            "density": {
-                "enable": true,
-                "value_area": 800
-            }
-        },
-        "color": {
-            "value": "#ffffff"
-        },
-        "shape": {
-            "type": "circle"
-        },
-        "opacity": {
-            "value": 0.5,
-            "random": false
-        },
-        "size": {
-            "value": 3,
-            "random": true
-        },
-        "line_linked": {
-            "enable": true,
-            "distance": 150,
-            "color": "#ffffff",
-            "opacity": 1,
-            "width": 1
-        },
-        "move": {
-            "enable": true,
-            "speed": 1,
-            "direction": "none",
-            "out_mode": "out"
-        }
-    },
-    "interactivity": {
-        "events": {
-            "onhover": {
-                "enable": true,
-                "mode": "repulse"
-            },
-            "onclick": {
-                "enable": true,
-                "mode": "push"
-            }
+
+def diario_da_sessao():
+    # Livro aberto na Calculadora ou já gravado no banco. Não cria livro: quem só
+    # visita o Painel não ganha uma linha em `livros`
+    diario = st.session_state.get("diario")
+    if diario is None:
+        diario = banco_compartilhado().diario_existente(nome_livro_sessao())
+    return diario
+
+@st.fragment
+@medido("simulacao")
+def exibir_simulacao(df):
+    # Parte do livro da calculadora; sem livro, os campos começam zerados
+    diario = diario_da_sessao()
+    if diario is None:
+        base = dict.fromkeys(("caixa", "divida", "receita_mensal", "despesa_mensal"), 0.0)
+    else:
+        base = base_do_livro(diario)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        caixa = st.number_input("Caixa atual (R$)", value=round(base["caixa"], 2), step=100.0)
+        divida = st.number_input("Dívida com juros (R$)", value=round(max(0.0, base["divida"]), 2), min_value=0.0, step=100.0)
+    with col2:
+        receita = st.number_input("Receita mensal (R$)", value=round(max(0.0, base["receita_mensal"]), 2), min_value=0.0, step=100.0)
+        despesa = st.number_input("Despesa mensal (R$)", value=round(max(0.0, base["despesa_mensal"]), 2), min_value=0.0, step=100.0)
+    with col3:
+        spread = st.number_input("Spread sobre a SELIC (% a.a.)", value=6.0, min_value=0.0, step=0.5)
+        meses = st.slider("Meses projetados", 6, 60, 24)
+    col1, col2 = st.columns(2)
+    with col1:
+        metodo = st.radio("Modelo", list(METODOS), format_func=METODOS.get, horizontal=True)
+    with col2:
+        caminhos = st.select_slider("Cenários simulados", [1_000, 5_000, 10_000, 20_000], value=10_000)
+
+    try:
+        resultado = simular_cenarios(df, meses, caminhos, metodo, caixa, receita, despesa, divida, spread)
+    except ValueError as erro:
+        st.error(str(erro))
+        return
+
+    fig = px.line(
+        resultado["caixa"].reset_index(), x="Mês", y=["P5", "P50", "P95"],
+        labels={"value": "Caixa (R$)", "variable": "Percentil"},
+        title="Caixa projetado (faixa de 5% a 95% dos cenários)",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Cenários com caixa negativo", f"{resultado['caixa_negativo']:.0%}")
+    with col2:
+        st.metric("Juros no período (mediana)", f"R$ {resultado['custo_divida']['P50'].iloc[-1]:,.2f}")
+    with col3:
+        st.metric("Juros no período (pior 5%)", f"R$ {resultado['custo_divida']['P95'].iloc[-1]:,.2f}")
+
+    indicadores = pd.DataFrame({
+        "SELIC (mediana)": resultado["selic"]["P50"],
+        "IPCA (mediana)": resultado["ipca"]["P50"],
+    }).reset_index()
+    fig = px.line(
+        indicadores, x="Mês", y=["SELIC (mediana)", "IPCA (mediana)"],
+        labels={"value": "Valor (%)", "variable": "Indicador"},
+        title="Trajetória mediana dos indicadores simulados",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Simulação a partir do histórico do período selecionado acima.")
+
+@st.fragment
+@medido("financiamento")
+def exibir_financiamento(publicados):
+    # Todos os cenários (sistema × prazo × SELIC × spread) saem de uma vez; o
+    # escolhido na tabela pode ser lançado no livro da calculadora
+    try:
+        taxas = taxas_selic(publicados)
+    except ValueError as erro:
+        st.error(str(erro))
+        return
+    diario = diario_da_sessao()
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        valor = st.number_input("Valor do empréstimo (R$)", value=20_000.0, min_value=100.0, step=1_000.0)
+        sistemas = st.multiselect("Sistemas de amortização", list(SISTEMAS), default=list(SISTEMAS), format_func=SISTEMAS.get)
+    with col2:
+        prazos = st.multiselect("Prazos (meses)", list(range(6, 121, 6)), default=PRAZOS)
+        referencias = st.multiselect(
+            "SELIC de referência", list(taxas), default=list(taxas)[:2],
+            format_func=lambda referencia: f"{referencia} ({taxas[referencia]:.2f}% a.a.)",
+        )
+    with col3:
+        spreads = st.multiselect("Spreads sobre a SELIC (% a.a.)", [2.0, 4.0, 6.0, 8.0, 10.0, 15.0, 20.0, 30.0], default=SPREADS)
+
+    try:
+        tabela = cenarios(
+            valor, {referencia: taxas[referencia] for referencia in referencias}, prazos, spreads,
+            {sistema: SISTEMAS[sistema] for sistema in sistemas},
+        )
+    except ValueError as erro:
+        st.info(str(erro))
+        return
+    tabela = tabela.sort_values("Total de juros", ignore_index=True)
+    receita = 0.0 if diario is None else base_do_livro(diario)["receita_mensal"]
+    if receita > 0:
+        tabela["Parcela / receita"] = tabela["Primeira parcela"] / receita
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Cenários comparados", len(tabela))
+    col2.metric("Menor total de juros", f"R$ {tabela['Total de juros'].min():,.2f}")
+    col3.metric("Menor primeira parcela", f"R$ {tabela['Primeira parcela'].min():,.2f}")
+
+    fig = px.scatter(
+        tabela, x="Primeira parcela", y="Total de juros", color="Sistema", symbol="Referência",
+        hover_data=["Prazo", "Spread", "Taxa a.a."],
+        labels={"Primeira parcela": "Primeira parcela (R$)", "Total de juros": "Total de juros (R$)"},
+        title="Parcela inicial × custo total de cada cenário",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    selecao = st.dataframe(
+        tabela,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="financiamento_cenarios",
+        column_config={
+            **{coluna: st.column_config.NumberColumn(format="%.2f%%") for coluna in ["SELIC", "Spread", "Taxa a.a."]},
+            **{coluna: st.column_config.NumberColumn(format="R$ %.2f")
+               for coluna in ["Primeira parcela", "Última parcela", "Total de juros", "Total pago"]},
+            "Parcela / receita": st.column_config.NumberColumn(format="percent"),
         },
-        "modes": {
-            "repulse": {
-                "distance": 100
+    )
+    if not selecao.selection.rows:
+        st.caption("Selecione um cenário na tabela para ver o cronograma e lançá-lo no livro da Calculadora.")
+        return
+
+    escolhido = tabela.iloc[selecao.selection.rows[0]]
+    sistema, prazo, taxa = escolhido["Sistema"], int(escolhido["Prazo"]), float(escolhido["Taxa a.a."])
+    st.markdown(f"#### {SISTEMAS[sistema]} em {prazo}x a {taxa:.2f}% a.a.")
+    col1, col2 = st.columns([3, 2])
+    with col2:
+        contratacao = st.date_input("Data da contratação", value=date.today(), format="DD/MM/YYYY")
+        vencidas = st.checkbox("Lançar também as parcelas vencidas até hoje", value=True)
+        st.caption("Contratação: D 1.1.1.02.01 / C 2.1.3.01.02. Parcelas: D 2.1.3.01.02 e 3.4.1.01.01 / C 1.1.1.02.01.")
+        # Um contrato (livro, cenário e data) entra uma vez por sessão: o clique duplo
+        # chega como segundo rerun e encontra o contrato já lançado
+        contrato = (nome_livro_sessao(), sistema, prazo, round(taxa, 4), valor, contratacao)
+        lancados = st.session_state.setdefault("contratos_lancados", set())
+        if st.button("Lançar empréstimo no livro", disabled=contrato in lancados):
+            if contrato in lancados:
+                st.warning("Este empréstimo já foi lançado no livro.")
+            else:
+                # O livro só é criado aqui, quando há o que gravar
+                if diario is None:
+                    diario = banco_compartilhado().diario(nome_livro_sessao())
+                try:
+                    parcelas = contratar(diario, valor, prazo, taxa, sistema, contratacao,
+                                         ate=date.today() if vencidas else contratacao)
+                except ValueError as erro:
+                    st.error(str(erro))
+                else:
+                    lancados.add(contrato)
+                    st.session_state.aviso_financiamento = (
+                        f"Empréstimo lançado em 2.1.3.01.02 com {parcelas} parcela(s) paga(s)."
+                    )
+                    st.rerun()
+        if "aviso_financiamento" in st.session_state:
+            st.success(st.session_state.pop("aviso_financiamento"))
+    with col1:
+        st.dataframe(
+            cronograma(valor, prazo, taxa, sistema, inicio=contratacao),
+            use_container_width=True,
+            column_config={
+                "Vencimento": st.column_config.DateColumn(format="DD/MM/YYYY"),
+                **{coluna: st.column_config.NumberColumn(format="R$ %.2f")
+                   for coluna in ["Parcela", "Juros", "Amortização", "Saldo"]},
             },
-            "push": {
-                "particles_nb": 4
-            }
-        }
-    },
-    "retina_detect": true
-});
-</script>
-"""
+        )
+
 
-components.html(particles_background, height=150, width=2000, scrolling=False)
 
 
 # Conteúdo principal
 st.title("📈 Painel Econômico Interativo para MEI")
 
+# Séries publicadas em arquivo Arrow mapeado em memória, comum a todos os processos
 if st.button("🔄 Atualizar relatório agora"):
-    df = load_data()
+    atualizado = INDICADORES_PUBLICADOS.atualizar_agora()
+    df, versao = INDICADORES_PUBLICADOS.obter()
     save_excel(df)
-    st.success("Relatório atualizado com sucesso!")
+    if atualizado:
+        st.success("Relatório atualizado com sucesso!")
+    else:
+        st.info("Não foi possível atualizar agora (outra atualização em andamento ou BACEN indisponível): "
+                "o relatório mostra a última publicação.")
 else:
-    df = load_data()
-
-ano_min, ano_max = st.slider("Selecione o período:", 2004, 2025, (2020, 2025))
-df = df[(df['Ano'] >= ano_min) & (df['Ano'] <= ano_max)]
-
-indicadores_disponiveis = ["SELIC", "IPCA", "Inadimplencia"]
-indicadores_selecionados = st.multiselect("Escolha os indicadores:", indicadores_disponiveis, default=indicadores_disponiveis)
+    df, versao = INDICADORES_PUBLICADOS.obter()
 
-abas = st.tabs(["📊 Evolução Mensal", "📉 Comparação Anual", "📌 Correlação", "📆 Evolução Anual ", "🔮 Projeções Futuras"])
+abas = st.tabs(["📊 Evolução dos Indicadores", "📌 Correlação", "🔮 Projeções Futuras"])
 
-# Gráficos (mantidos do seu código original)
-with abas[0]:
+# Período, indicadores e médias anuais mudam no navegador, sem executar a página de
+# novo; as outras abas usam o período enviado pelo botão do gráfico
+with abas[0], medir("aba", aba="evolucao"):
     with st.expander("ℹ️ Sobre este gráfico"):
-        st.markdown(""" 💡 **Este gráfico mostra a evolução mensal dos indicadores ao longo do tempo.**
-- **SELIC**: Alta significa crédito mais caro.
+        st.markdown(""" 💡 **Este gráfico mostra a evolução dos indicadores ao longo do tempo.**
+- **SELIC**: Alta significa crédito mais caro (veja quanto em 🔮 Projeções Futuras).
 - **IPCA**: Indica aumento de preços.
 - **Inadimplência**: Mostra atrasos nos pagamentos dos Microempreendedores.
+- **Média anual** e **Comparar** mostram a média de cada ano: veja anos em que os indicadores dispararam ou caíram.
                     
 
-📌 **Dica para o MEI:** Planeje o caixa nos períodos de alta e observe tendências para antecipar estratégias.""")
+📌 **Dica para o MEI:** Planeje o caixa nos períodos de alta, observe tendências para antecipar estratégias e compare tendências de longo prazo para entender períodos mais favoráveis a crédito, investimentos ou reajuste de preços.""")
         st.caption("Fonte dos dados: Banco Central do Brasil (BACEN)")
 
-    for indicador in indicadores_selecionados:
-        col1, col2 = st.columns([4, 1])
-        with col1:
-            fig = px.line(df, x="Date", y=indicador, title=f"Evolução de {indicador}", color_discrete_sequence=[CORES[indicador]])
-            st.plotly_chart(fig, use_container_width=True)
-        with col2:
-            valor_medio = df[df["Ano"] == ano_max][indicador].mean()
-            st.metric(
-                label=f"{indicador} médio ({ano_max})",
-                value=f"{valor_medio:.2f}%",
-                delta=classificar_indicador(indicador, valor_medio)
-            )
-
-with abas[1]:
-    with st.expander("ℹ️ Sobre este gráfico"):
-        st.markdown(""" 💡 **Este gráfico mostra a média anual de cada indicador.**
-- Veja anos em que os indicadores dispararam ou caíram.
-                    
+    ano_min, ano_max = int(df['Ano'].min()), int(df['Ano'].max())
+    selecao = grafico_indicadores(df, versao, CORES, max(ano_min, min(2020, ano_max)), ano_max)
 
-📌 **MEI:** Use isso para entender períodos mais favoráveis a crédito, investimentos ou reajuste de preços.""")
-        st.caption("Fonte dos dados: Banco Central do Brasil (BACEN)")
+publicados = df
+df = df[(df['Ano'] >= selecao["inicio"]) & (df['Ano'] <= selecao["fim"])]
+# A correlação compara os indicadores marcados no gráfico (com menos de dois, todos)
+indicadores_disponiveis = selecao["indicadores"] if len(selecao["indicadores"]) >= 2 else INDICADORES
 
-    for indicador in indicadores_selecionados:
-        col1, col2 = st.columns([4, 1])
-        with col1:
-            media_anual = df.groupby("Ano")[indicador].mean().reset_index()
-            fig = px.bar(media_anual, x="Ano", y=indicador, title=f"Média Anual de {indicador}",color_discrete_sequence=[CORES[indicador]])
-            st.plotly_chart(fig, use_container_width=True)
-        with col2:
-            valor_medio = df[df["Ano"] == ano_max][indicador].mean()
-            st.metric(
-                label=f"{indicador} médio ({ano_max})",
-                value=f"{valor_medio:.2f}%",
-                delta=classificar_indicador(indicador, valor_medio)
-            )
-
-with abas[2]:
+with abas[1], medir("aba", aba="correlacao"):
     with st.expander("ℹ️ Sobre este gráfico"):
         st.markdown("Este gráfico mostra a correlação entre dois indicadores.")
         st.markdown("📌 **MEI:** Correlações ajudam a prever impactos de um indicador sobre o outro.")
@@ -270,7 +302,14 @@ with abas[2]:
     with col2:
         y_axis = st.selectbox("Eixo Y", [i for i in indicadores_disponiveis if i != x_axis])
 
-    fig = px.scatter(df, x=x_axis, y=y_axis, trendline="ols", title=f"Correlação entre {x_axis} e {y_axis}",color_discrete_sequence=[CORES[x_axis]])
+    fig = px.scatter(df, x=x_axis, y=y_axis, title=f"Correlação entre {x_axis} e {y_axis}",color_discrete_sequence=[CORES[x_axis]])
+    reta = tendencia(df, x_axis, y_axis)
+    if reta is not None:
+        inclinacao, intercepto, extremos = reta
+        fig.add_scatter(
+            x=extremos, y=inclinacao * extremos + intercepto, mode="lines",
+            line_color=CORES[x_axis], name="Tendência (MQO)", showlegend=False,
+        )
     st.plotly_chart(fig, use_container_width=True)
 
     correlacao = df[x_axis].corr(df[y_axis])
@@ -283,72 +322,52 @@ with abas[2]:
     direcao = "direta" if correlacao > 0 else "inversa"
     st.info(f"📌 Correlação: **{nivel}** e **{direcao}** ({correlacao:.2f})")
 
-with abas[3]:
-    with st.expander("ℹ️ Sobre este gráfico"):
-        st.markdown("""
-    💡 **Evolução Anual dos Indicadores:**
-    - Cada linha representa um indicador econômico.
-    - Valores médios calculados por ano.
-                
-
-    📌 **Dica MEI:** Compare tendências de longo prazo para planejamento estratégico.
-        """)
-        st.caption("Fonte: Banco Central do Brasil (BACEN)")
-
-    df_anual = df.groupby("Ano")[indicadores_disponiveis].mean().reset_index()
-
-    fig = px.line(
-        df_anual,
-        x="Ano",
-        y=indicadores_disponiveis,
-        color_discrete_map=CORES,  
-        markers=True, 
-        labels={"value": "Valor (%)", "variable": "Indicador"},
-        title="Evolução Anual dos Indicadores (Média)"
-    )
-
-    fig.update_xaxes(tickvals=df_anual["Ano"].unique(), tickangle=45)
-    fig.update_yaxes(tickformat=".1f%")
-    fig.update_traces(line_width=2.5)
-    
-    st.plotly_chart(fig, use_container_width=True)
+with abas[2], medir("aba", aba="projecoes"):
+    focus, aviso_focus = carregar_focus()
+    with st.expander("ℹ️ Projeção baseada no Relatório Focus", expanded=True):
+        if aviso_focus:
+            st.warning(aviso_focus)
+        if focus.empty:
+            st.info("Ainda não há expectativas do Focus guardadas.")
+        else:
+            medianas = ultimas_medianas(focus)
+            col1, col2 = st.columns([2, 3])
+            with col1:
+                st.markdown("### 📈 Mediana das expectativas")
+                st.dataframe(
+                    medianas,
+                    use_container_width=True,
+                    column_config={
+                        "ano_referencia": st.column_config.NumberColumn("Ano", format="%d"),
+                        **{indicador: st.column_config.NumberColumn(format="%.2f%%") for indicador in medianas.columns},
+                    },
+                )
+            with col2:
+                ano_focus = st.selectbox("Ano de referência", medianas.index.tolist())
+                evolucao = focus[focus["ano_referencia"] == ano_focus]
+                fig = px.line(
+                    evolucao, x="data", y="mediana", color="indicador",
+                    color_discrete_map=CORES,
+                    labels={"data": "Data da pesquisa", "mediana": "Mediana (%)", "indicador": "Indicador"},
+                    title=f"Evolução das expectativas para {ano_focus}",
+                )
+                st.plotly_chart(fig, use_container_width=True)
 
-with abas[4]:
-    with st.expander("ℹ️ Projeção baseada no Relatório Focus"):
         st.markdown("""
-    ### 📈 SELIC:
-    - 2025: 12,50%
-    - 2026: 10,50%
-    - 2027–2028: 10,00%
-
-    ### 💸 IPCA:
-    - Queda gradual até 3,80% em 2028
-
     ### 📉 Inadimplência:
     - Pode continuar alta. Risco de exclusão do Simples Nacional se não regularizar.
 
     > 🧾 **Recomendação para MEI**: mantenha controle de fluxo de caixa e reavalie preços e formas de pagamento.
     """)
-        st.caption("Fonte: Relatório Focus (BACEN)")
+        publicacao = f" — pesquisa de {focus['data'].max():%d/%m/%Y}" if not focus.empty else ""
+        st.caption(f"Fonte: Relatório Focus (BACEN){publicacao}")
+
+    st.markdown("### 🎲 Simulação de cenários para o seu caixa")
+    exibir_simulacao(df)
+
+    # Taxas da publicação inteira: a SELIC de hoje, não a do fim do período selecionado
+    st.markdown("### 🏦 Quanto custa um empréstimo com a SELIC de hoje")
+    exibir_financiamento(publicados)
 
 # Rodapé no final da página
-st.markdown("""
-<style>
-    .footer {
-        text-align: center;
-        padding: 10px;
-        margin-top: 50px;
-    }
-</style>
-<div class="footer">
-    <a rel="license" href="http://creativecommons.org/licenses/by/4.0/">
-        <img alt="Licença Creative Commons" style="border-width:0" 
-             src="https://i.creativecommons.org/l/by/4.0/88x31.png" />
-    </a>
-    <br />
-    Este trabalho está licenciado sob uma 
-    <a rel="license" href="http://creativecommons.org/licenses/by/4.0/">
-        Licença Creative Commons Atribuição 4.0 Internacional
-    </a>.
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+rodape()
@@ -1,397 +1,43 @@
-
 import streamlit as st
 import pandas as pd
-from itertools import zip_longest
-import streamlit.components.v1 as components
-
-st.set_page_config(
-    page_title="Calculadora Contábil",
-    layout="centered",
-    page_icon="🧮",
-    menu_items={}
-)
-
-st.logo(
-    'assets/HELPMEI.png',
-    size="large",
-    icon_image='assets/logo.png',
-)
-
-# Função para criar sidebar personalizado
-
-with st.sidebar:
-        # Espaço vazio para empurrar o logo para baixo
-        st.title("🔗 Mais Informações para MEI")
-        st.markdown("""
-            <p style="font-size:15px; margin-top:15px;">
-                <a href="https://sebrae.com.br/sites/PortalSebrae/mei" target="_blank" style="color:#4169E1; text-decoration:none;">
-                    👉 Acesse agora o Portal Sebrae MEI
-                </a>
-            </p>
-
-            <p style="font-size:16px; margin-top:20px;">Lá você encontra orientações sobre:</p>
-            <ul style="font-size:16px; color:#FFFFFF;">
-                <li>📝 Regularização</li>
-                <li>💰 Tributação</li>
-                <li>🧾 Emissão de nota</li>
-                <li>🎁 Benefícios</li>
-                <li>🔍 E mais!</li>
-            </ul>
-        """, unsafe_allow_html=True)
-        st.markdown("---")
-        st.markdown(
-        """
-        <span style='color: #FFFFFF; font-weight: bold;'>Help MEI</span><br>
-        <span style='color: #FF5F15; font-style: italic;'>Visualize hoje. Cresça amanhã.</span>
-        """, 
-        unsafe_allow_html=True
-    )
-        
+from datetime import date
+from helpmei.armazenamento import banco_compartilhado, nome_livro_sessao
+from helpmei.diario import SEPARADOR_CONTAS, fechado_ate, fim_do_mes, movimento_periodo
+from helpmei.busca_contas import contas_recentes, indice_contas
+from helpmei.correcao import diario_corrigido, indice_ipca
+from helpmei.plano_contas import CONTAS
+from helpmei.razonetes import exibir_razonetes
+from helpmei.relatorios import balanco, gerar_demonstracoes
+from helpmei.layout import configurar_pagina, rodape
+from helpmei.metricas import medido, medir
+from helpmei.publicacao import INDICADORES_PUBLICADOS
+from helpmei.simples import REGIMES, apurar, aviso_limite_mei, provisionar, provisoes
+
+configurar_pagina("Calculadora Contábil", "🧮", layout="centered")
 
-# Partículas de fundo
-particles_background = """
-<style>
-    #particles-js {
-        position: fixed;
-        width: 100%;
-        height: 100%;
-        z-index: -1;
-        top: 0;
-        left: 0;
-    }
-</style>
-<div id="particles-js"></div>
-<script src="https://cdn.jsdelivr.net/npm/particles.js@2.0.0/particles.min.js"></script>
-<script>
-particlesJS("particles-js", {
-    "particles": {
-        "number": {
-            "value": 80,
-            "density": {
-                "enable": true,
-                "value_area": 800
-            }
-        },
-        "color": {
-            "value": "#ffffff"
-        },
-        "shape": {
-            "type": "circle"
-        },
-        "opacity": {
-            "value": 0.5,
-            "random": false
-        },
-        "size": {
-            "value": 3,
-            "random": true
-        },
-        "line_linked": {
-            "enable": true,
-            "distance": 150,
-            "color": "#ffffff",
-            "opacity": 1,
-            "width": 1
-        },
-        "move": {
-            "enable": true,
-            "speed": 1,
-            "direction": "none",
-            "out_mode": "out"
-        }
-    },
-    "interactivity": {
-        "events": {
-            "onhover": {
-                "enable": true,
-                "mode": "repulse"
-            },
-            "onclick": {
-                "enable": true,
-                "mode": "push"
-            }
-        },
-        "modes": {
-            "repulse": {
-                "distance": 100
-            },
-            "push": {
-                "particles_nb": 4
-            }
-        }
-    },
-    "retina_detect": true
-});
-</script>
-"""
+# Inicialização do estado da sessão
+# Os lançamentos ficam no banco SQLite; a sessão guarda só o acesso ao seu livro
+nome_livro = nome_livro_sessao()
+if st.session_state.get('nome_livro') != nome_livro:
+    st.session_state.nome_livro = nome_livro
+    st.session_state.diario = banco_compartilhado().diario(nome_livro)
 
-components.html(particles_background, height=150, width=2000, scrolling=False)
+# Opções do DAS: reatribuídas a cada execução para não se perderem quando um
+# lançamento reexecuta a página antes de o expander do Simples ser desenhado
+st.session_state.regime_das = st.session_state.get("regime_das", REGIMES[0])
+st.session_state.provisionar_das = st.session_state.get("provisionar_das", False)
 
+# Linhas por página na tabela de lançamentos
+LANCAMENTOS_POR_PAGINA = 50
 
-# Inicialização do estado da sessão
-if 'dict_conta' not in st.session_state:
-    st.session_state.dict_conta = {}
-
-# Dados completos das contas (exemplo reduzido, mantenha sua lista completa)
-CONTAS = {
-    "1":"Ativo",
-    "1.1":"Ativo Circulante",
-    "1.1.1":"Disponibilidades",
-    "1.1.1.01":"Caixa ",
-    "1.1.1.01.01":"Caixa (Ativo Circulante)",
-    "1.1.1.01.02":"Fundo Fixo de Caixa (Ativo Circulante)",
-    "1.1.1.02":"Depósitos Bancários à Vista",
-    "1.1.1.02.01":"Bancos Conta Movimento (Ativo Circulante)",
-    "1.1.1.03":"Aplicações Financeiras",
-    "1.1.1.03.01":"Aplicação Financeira de Liquidez Imediata (Ativo Circulante)",
-    "1.1.2":"Créditos",
-    "1.1.2.01":"Recebíveis de clientes",
-    "1.1.2.01.01":"Contas a Receber (Ativo Circulante)",
-    "1.1.2.01.02":"PECLD (Ativo Circulante)",
-    "1.1.2.02":"Créditos de Colaboradores",
-    "1.1.2.02.01":"Adiantamento Quinzenal (Ativo Circulante)",
-    "1.1.2.02.02":"Empréstimos a colaboradores (Ativo Circulante)",
-    "1.1.2.02.03":"Antecipação de Salários (Ativo Circulante)",
-    "1.1.2.02.04":"Antecipação de Férias (Ativo Circulante)",
-    "1.1.2.02.05":"Antecipação de 13º Salário (Ativo Circulante)",
-    "1.1.2.03":"Créditos de Fornecedores",
-    "1.1.2.03.01":"Adiantamentos a Fornecedores (Ativo Circulante)",
-    "1.1.3":"Estoques",
-    "1.1.3.01":"Estoques de Mercadorias",
-    "1.1.3.01.01":"Mercadorias para Revenda (Ativo Circulante)",
-    "1.1.3.01.02":"(-) Perda por Ajuste ao Valor Realizável Líquido - Estoque Mercadorias (Ativo Circulante)",
-    "1.1.3.02":"Estoques de Produtos",
-    "1.1.3.02.01":"Insumos (materiais diretos) (Ativo Circulante)",
-    "1.1.3.02.02":"Outros Materiais (Ativo Circulante)",
-    "1.1.3.02.03":"Produtos em Elaboração (Ativo Circulante)",
-    "1.1.3.02.04":"Produtos Acabados (Ativo Circulante)",
-    "1.1.3.02.05":"(-) Perda por Ajuste ao Valor Realizável Líquido - Estoque Produtos (Ativo Circulante)",
-    "1.1.3.03":"Outros Estoques",
-    "1.1.3.03.01":"Materiais para Consumo (Ativo Circulante)",
-    "1.1.3.03.02":"Materiais para Reposição (Ativo Circulante)",
-    "1.1.4":"Despesas Pagas Antecipadamente",
-    "1.1.4.01":"Despesas do Exercício Seguinte",
-    "1.1.4.01.01":"Aluguéis e Arrendamentos Pagos Antecipadamente (Ativo Circulante)",
-    "1.1.4.01.02":"Prêmios de Seguros a Apropriar (Ativo Circulante)",
-    "1.1.6.01.99":"Outras Despesas Antecipadas (Ativo Circulante)",
-    "1.2":"Ativo Não Circulante",
-    "1.2.1":"Realizável a Longo Prazo",
-    "1.2.1.01":"Créditos de Longo Prazo",
-    "1.2.1.01.01":"Clientes - Longo Prazo (Ativo Não Circulante)",
-    "1.2.1.01.02":"PCLD Longo Prazo (Ativo Não Circulante)",
-    "1.2.1.01.03":"Juros a Apropriar (Ativo Não Circulante)",
-    "1.2.1.01.04":"Empréstimos de LP (Ativo Não Circulante)",
-    "1.2.2":"Investimentos",
-    "1.2.2.01":"Investimentos Societários",
-    "1.2.2.01.01":"Participações Societárias (Ativo Não Circulante)",
-    "1.2.3":"Imobilizado",
-    "1.2.3.01":"Propriedades para Investimento",
-    "1.2.3.01.10":"Terrenos (Ativo Não Circulante)",
-    "1.2.3.01.10":"Terrenos para Investimento - Custo (Ativo Não Circulante)",
-    "1.2.3.01.11":"Impairment Terrenos (Ativo Não Circulante)",
-    "1.2.3.01.20":"Edifícios e Construções (Ativo Não Circulante)",
-    "1.2.3.01.20":"Edifícios para Investimento - Custo (Ativo Não Circulante)",
-    "1.2.3.01.21":"Impairment Edifícios e Construções (Ativo Não Circulante)",
-    "1.2.3.01.21":"Edifícios para Investimento - Depreciação (Ativo Não Circulante)",
-    "1.2.3.01.30":"Benfeitorias em Imóveis de Terceiros (Ativo Não Circulante)",
-    "1.2.3.01.31":"Impairment Benfeitorias em Imóveis de Terceiros (Ativo Não Circulante)",
-    "1.2.3.01.40":"Máquinas, Equipamentos e Instalações Industriais (Ativo Não Circulante)",
-    "1.2.3.01.41":"Impairment Máquinas, Equipamentos e Instalações Industriais (Ativo Não Circulante)",
-    "1.2.3.01.50":"Móveis, Utensílios e Instalações Comerciais (Ativo Não Circulante)",
-    "1.2.3.01.51":"Impairment Móveis, Utensílios e Instalações Comerciais (Ativo Não Circulante)",
-    "1.2.3.01.60":"Veículos (Ativo Não Circulante)",
-    "1.2.3.01.61":"Impairment Veículos (Ativo Não Circulante)",
-    "1.2.3.02":"Imobilizado - Depreciação Acumulada",
-    "1.2.3.02.20":"Depreciação Acumulada - Edifícios e Construções (Ativo Não Circulante)",
-    "1.2.3.02.30":"Depreciação Acumulada - Benfeitorias em Imóveis de Terceiros (Ativo Não Circulante)",
-    "1.2.3.02.40":"Depreciação Acumulada - Máquinas, Equipamentos e Instalações Industriais (Ativo Não Circulante)",
-    "1.2.3.02.50":"Depreciação Acumulada - Móveis, Utensílios e Instalações Comerciais (Ativo Não Circulante)",
-    "1.2.3.02.51":"Depreciação Acumulada - Veículos (Ativo Não Circulante)",
-    "1.2.4":"Intangível",
-    "1.2.4.01":"Intangível - Aquisição",
-    "1.2.4.01.10":"Softwares (Ativo Não Circulante)",
-    "1.2.4.01.20":"Marcas (Ativo Não Circulante)",
-    "1.2.4.01.30":"Patentes e Segredos Industriais (Ativo Não Circulante)",
-    "1.2.4.02":"Intangível - Amortização",
-    "1.2.4.02.10":"Amortização Acumulada - Softwares (Ativo Não Circulante)",
-    "1.2.4.02.20":"Amortização Acumulada - Marcas (Ativo Não Circulante)",
-    "1.2.4.02.30":"Amortização Acumulada - Patentes e Segredos Industriais (Ativo Não Circulante)",
-    "2":"Passivo",
-    "2.1":"Passivo Circulante",
-    "2.1.1":"Obrigações Trabalhistas",
-    "2.1.1.01":"Obrigações com Pessoal",
-    "2.1.1.01.01":"Salários e Remunerações a Pagar (Passivo Circulante)",
-    "2.1.1.01.02":"Participações no Resultado a Pagar (Passivo Circulante)",
-    "2.1.1.01.03":"FGTS a Recolher (Passivo Circulante)",
-    "2.1.1.01.04":"Férias (Passivo Circulante)",
-    "2.1.1.01.05":"13º Salário (Passivo Circulante)",
-    "2.1.1.01.06":"FGTS - Férias (Passivo Circulante)",
-    "2.1.1.01.07":"FGTS – 13º Salário (Passivo Circulante)",
-    "2.1.2":"Obrigações com Terceiros",
-    "2.1.2.01":"Fornecedores",
-    "2.1.2.01.01":"Fornecedores Nacionais (Passivo Circulante)",
-    "2.1.2.01.02":"Fornecedores Exterior (Passivo Circulante)",
-    "2.1.2.02":"Contas a Pagar",
-    "2.1.2.02.01":"Aluguéis e arrendamentos a Pagar (Passivo Circulante)",
-    "2.1.2.02.02":"Adiantamento de Clientes (Passivo Circulante)",
-    "2.1.2.02.03":"Outras Contas a Pagar (Passivo Circulante)",
-    "2.1.3":"Empréstimos e Financiamentos (CP)",
-    "2.1.3.01":"Empréstimos de Terceiros",
-    "2.1.3.01.01":"Duplicatas Descontadas (Passivo Circulante)",
-    "2.1.3.01.02":"Empréstimos e Financiamentos (Passivo Circulante)",
-    "2.1.4":"Obrigações Fiscais",
-    "2.1.4.01":"Impostos a Pagar",
-    "2.1.4.01.01":"Simples Nacional (Passivo Circulante)",
-    "2.1.4.01.02":"Tributos Municipais (Passivo Circulante)",
-    "2.1.4.03":"Parcelamentos Fiscais",
-    "2.1.4.03.01":"Parcelamento Simples Nacional CP (Passivo Circulante)",
-    "2.1.5":"Outras Obrigações",
-    "2.1.5.01":"Obrigações com Sócios",
-    "2.1.5.01.01":"Lucros a Pagar (Passivo Circulante)",
-    "2.1.5.01.02":"Mútuo com Partes Relacionadas (Passivo Circulante)",
-    "2.2":"Passivo Não Circulante",
-    "2.2.1":"Obrigações com Terceiros LP",
-    "2.2.1.01":"Fornecedores LP",
-    "2.2.1.02":"Empréstimos e Financiamentos LP",
-    "2.2.1.02.02":"Duplicatas Descontadas LP (Passivo Não Circulante)",
-    "2.2.2":"Obrigações Fiscais (LP)",
-    "2.2.2.01":"Parcelamentos Fiscais (LP)",
-    "2.2.2.01.01":"Parcelamento Simples Nacional LP (Passivo Não Circulante)",
-    "2.2.2.01.01":"Empréstimos de Sócios (Passivo Não Circulante)",
-    "2.2.2.01.02":"Mútuos com Partes Relacionadas (Passivo Não Circulante)",
-    "2.2.3":"Outras Obrigações de LP",
-    "2.2.3.01":"Obrigações com Partes Relacionadas",
-    "2.3":"Patrimônio Líquido",
-    "2.3.1":"Capital Social Integralizado",
-    "2.3.1.01":"Capital Social Subscrito ",
-    "2.3.1.01.01":"Capital Social Subscrito (Patrimônio Líquido)",
-    "2.8.1.02":"Capital Social a Integralizar",
-    "2.8.1.02.01":"Capital Social a Integralizar (Patrimônio Líquido)",
-    "2.8.2":"Reservas de Capital",
-    "2.8.2.01":"Adiantamento de Capital",
-    "2.8.2.01.01":"Adiantamento para Futuro Aumento de Capital (Patrimônio Líquido)",
-    "2.8.3":"Reservas de Lucro",
-    "2.8.3.01":"Lucros a Distribuir",
-    "2.8.8":"Resultados Acumulados",
-    "2.8.8.01":"Lucros Acumulados",
-    "2.8.8.02":"Prejuízos Acumulados",
-    "3":"Resultado",
-    "3.1":"RECEITAS",
-    "3.1.1":"RECEITA BRUTA",
-    "3.1.1.01":"RECEITA BRUTA OPERACIONAL",
-    "3.1.1.01.01":"Serviços Prestados (Resultado)",
-    "3.1.1.01.02":"Mercadorias Vendidas (Resultado)",
-    "3.1.1.01.03":"Produtos Vendidos (Resultado)",
-    "3.1.2":"DEDUÇÕES DA RECEITA BRUTA",
-    "3.1.2.01":"IMPOSTOS S/FATURAMENTO",
-    "3.1.2.01.02":"ICMS (Resultado)",
-    "3.1.2.01.03":"ISS (Resultado)",
-    "3.1.2.01.04":"PIS/Pasep (Resultado)",
-    "3.1.2.01.05":"Cofins (Resultado)",
-    "3.1.2.02":"OUTRAS DEDUÇÕES DA RECEITA BRUTA",
-    "3.1.2.02.01":"DESCONTOS E ABATIMENTOS (Resultado)",
-    "3.1.2.02.02":"DEVOLUÇÕES (Resultado)",
-    "3.1.2.02.03":"JUROS DE AVP (Resultado)",
-    "3.2":"Custos",
-    "3.2.1":"Custos dos bens e serviços",
-    "3.2.1.01":"Custos dos bens e serviços vendidos",
-    "3.2.1.01.01":"Custos dos Produtos Vendidos (Resultado)",
-    "3.2.1.01.02":"Custos das Mercadorias Vendidas (Resultado)",
-    "3.2.1.01.03":"Custos dos Serviços Prestados (Resultado)",
-    "3.3":"Despesas Operacionais",
-    "3.3.1":"Despesas com Vendas",
-    "3.3.1.01":"Despesas com Pessoal",
-    "3.3.1.01.01":"Salários (Resultado)",
-    "3.3.1.01.02":"Gratificações (Resultado)",
-    "3.3.1.01.04":"13 Salário (Resultado)",
-    "3.3.1.01.05":"FGTS (Resultado)",
-    "3.3.1.01.06":"Vale Refeição/Refeitório (Resultado)",
-    "3.3.1.01.07":"Vale Transporte (Resultado)",
-    "3.3.1.01.08":"Assistência Médica (Resultado)",
-    "3.3.1.01.09":"Seguro de Vida (Resultado)",
-    "3.3.1.01.10":"Treinamento (Resultado)",
-    "3.3.1.02":"Outras Despesas com Vendas",
-    "3.3.1.02.01":"Comissões sobre Vendas (Resultado)",
-    "3.3.1.02.02":"Propaganda e publicidade (Resultado)",
-    "3.3.1.02.03":"Brindes e material promocional (Resultado)",
-    "3.3.2":"Despesas Administrativas",
-    "3.3.2.01.11":"Pro Labore (Resultado)",
-    "3.3.2.02":"Despesas Gerais",
-    "3.3.2.02.01":"Aluguéis e Arrendamentos (Resultado)",
-    "3.3.2.02.02":"Condomínios e Estacionamentos (Resultado)",
-    "3.3.2.02.03":"Despesas com Veículos (Resultado)",
-    "3.3.2.02.04":"Depreciação (Resultado)",
-    "3.3.2.02.05":"Amortização (Resultado)",
-    "3.3.2.02.06":"Serviços Profissionais Contratados (Resultado)",
-    "3.3.2.02.07":"Energia (Resultado)",
-    "3.3.2.02.08":"Água e Esgoto (Resultado)",
-    "3.3.2.02.09":"Telefone e Internet (Resultado)",
-    "3.3.2.02.10":"Correios e Malotes (Resultado)",
-    "3.3.2.02.11":"Seguros (Resultado)",
-    "3.3.2.02.12":"Multas (Resultado)",
-    "3.3.2.02.13":"Bens de Pequeno Valor (Resultado)",
-    "3.3.2.02.14":"Material de Escritório (Resultado)",
-    "3.3.2.03":"Tributos e Contribuições",
-    "3.3.2.03.01":"Taxas e Tributos Municipais (Resultado)",
-    "3.3.9":"Outros Resultados Operacionais",
-    "3.3.9.01":"Ganhos e Perdas de Capital",
-    "3.3.9.01.01":"Receita na Venda de Investimento, Imobilizado ou Intangível (Resultado)",
-    "3.3.9.01.02":"Custo do Investimento, Imobilizado ou Intangível Baixado (Resultado)",
-    "3.3.9.02":"Perdas",
-    "3.3.9.02.02":"Perda de recuperabilidade (Impairment) (Resultado)",
-    "3.3.9.03":"Resultado de Participação em Outras Sociedades",
-    "3.3.9.03.01":"Receita de Participação Societária (Resultado)",
-    "3.4":"Resultado Financeiro",
-    "3.4.1":"Encargos Financeiros Líquidos",
-    "3.4.1.01":"Despesas Financeiras",
-    "3.4.1.01.01":"Juros Passivos (Resultado)",
-    "3.4.1.01.02":"Despesas Bancárias (Resultado)",
-    "3.4.1.01.03":"IOF (Resultado)",
-    "3.4.1.01.04":"Descontos Concedidos (Resultado)",
-    "3.4.1.01.05":"Variação Cambial Passiva (Resultado)",
-    "3.4.1.02":"Receitas Financeiras",
-    "3.4.1.02.01":"Rendimentos de Aplicação Financeira (Resultado)",
-    "3.4.1.02.02":"Juros Ativos (Resultado)",
-    "3.4.1.02.03":"Descontos Obtidos (Resultado)",
-    "3.4.1.02.04":"Variação Cambial Ativa (Resultado)"
-}
-
-# Criar mapeamento reverso
-DESCRICAO_TO_CONTA = {v: k for k, v in CONTAS.items()}
-
-def calcular_saldos():
-    saldos = {}
-    for conta, dados in st.session_state.dict_conta.items():
-        total_debito = sum(valor for valor, _ in dados['débito'])
-        total_credito = sum(valor for valor, _ in dados['crédito'])
-        saldos[conta] = total_debito - total_credito
-    return saldos
-
-def gerar_relatorio_patrimonio():
-    saldos = calcular_saldos()
-    
-    ativo = 0
-    passivo = 0
-    patrimonio = 0
-    
-    for conta_desc, saldo in saldos.items():
-        codigo = DESCRICAO_TO_CONTA.get(conta_desc, "")
-        
-        if codigo.startswith('1.'):  # Ativo
-            ativo += saldo
-        elif codigo.startswith('2.'):  # Passivo ou Patrimônio Líquido
-            if codigo.startswith('2.3'):  # Patrimônio Líquido
-                patrimonio += saldo
-            else:  # Demais códigos do passivo
-                passivo += saldo
-        elif codigo.startswith('3.'):  # Resultado (não entra no balanço)
-            continue
+@medido()
+def calcular_saldos(diario, ate=None):
+    return diario.saldos(ate=ate).to_dict()
 
-    return {
-        "Ativo Total": abs(ativo),
-        "Patrimônio Líquido": abs(patrimonio),
-        "Passivo Total": abs(passivo),
-    }
+@medido()
+def gerar_relatorio_patrimonio(diario, ate=None):
+    # Totais do balanço com o resultado do exercício encerrado no PL
+    return balanco(diario.saldos(ate=ate))
 
 # Interface
 st.markdown("""
@@ -423,73 +69,189 @@ st.markdown("""
 
 # Enhanced title and subheader
 st.markdown('<div class="calculator-header">🧮 CALCULADORA CONTÁBIL 🧮</div>', unsafe_allow_html=True)
+st.caption(f"Livro: {nome_livro} · salve o endereço desta página para voltar a ele")
+
+indice = indice_contas()
+recentes = contas_recentes(st.session_state.diario)
+
+def rotulo_conta(codigo):
+    return f"{codigo} - {CONTAS[codigo]}"
+
+def depois_de_lancar(aviso):
+    # Com a provisão automática ligada, o DAS dos meses afetados é ajustado logo em
+    # seguida, numa operação à parte (Desfazer remove primeiro a provisão)
+    if st.session_state.provisionar_das:
+        meses = provisionar(st.session_state.diario, st.session_state.regime_das,
+                            fim_do_mes(date.today()))
+        if meses:
+            aviso += f" DAS provisionado em {meses} {'mês' if meses == 1 else 'meses'}."
+    st.session_state.aviso_lancamento = aviso
+    st.rerun()
+
+composto = st.toggle("Lançamento composto (várias contas)")
+
+# As opções de conta mudam com as contas recentes; depois de registrar, a página é
+# executada de novo para o formulário já trazer as opções novas, e o aviso vem junto
+if "aviso_lancamento" in st.session_state:
+    st.success(st.session_state.pop("aviso_lancamento"))
+
+if not composto:
+    # Busca de contas fora do formulário, para filtrar as opções a cada Enter
+    col1, col2 = st.columns(2)
+    with col1:
+        busca_debito = st.text_input("🔎 Buscar conta de débito", placeholder="Código ou descrição")
+    with col2:
+        busca_credito = st.text_input("🔎 Buscar conta de crédito", placeholder="Código ou descrição")
 
-with st.form("my_form"):
-    st.markdown('<div class="entry-subheader">NOVO LANÇAMENTO</div>', unsafe_allow_html=True)
-    
-    data = st.date_input("Data")
-    valor = st.number_input("Valor", min_value=0.01, step=0.01, format="%.2f")
+    with st.form("my_form"):
+        st.markdown('<div class="entry-subheader">NOVO LANÇAMENTO</div>', unsafe_allow_html=True)
+        
+        data = st.date_input("Data")
+        valor = st.number_input("Valor", min_value=0.01, step=0.01, format="%.2f")
 
-    
-    contas_filtradas = {
-        descricao: codigo 
-        for descricao, codigo in DESCRICAO_TO_CONTA.items()
-        if len(codigo.replace(".", "")) == 7
-    }
+        conta_debito = st.selectbox("Débito", options=indice.buscar(busca_debito, recentes), format_func=rotulo_conta)
+        conta_credito = st.selectbox("Crédito", options=indice.buscar(busca_credito, recentes), format_func=rotulo_conta)
+        historico = st.text_input("Histórico", placeholder="Opcional")
+        
+        submitted = st.form_submit_button("Registrar")
+        
+        if submitted:
+            if not conta_debito or not conta_credito:
+                st.error("Selecione ambas as contas!")
+            elif conta_debito == conta_credito:
+                st.error("Contas de débito e crédito não podem ser iguais!")
+            else:
+                # Registrar lançamento
+                try:
+                    st.session_state.diario.lancar(
+                        data,
+                        conta_debito,
+                        conta_credito,
+                        valor,
+                        historico,
+                    )
+                except ValueError as erro:
+                    st.error(str(erro))
+                else:
+                    depois_de_lancar("Lançamento registrado!")
+else:
+    # Várias partidas num só envio; o lançamento só é gravado se débitos e créditos fecharem
+    with st.form("form_composto"):
+        st.markdown('<div class="entry-subheader">NOVO LANÇAMENTO COMPOSTO</div>', unsafe_allow_html=True)
+
+        data = st.date_input("Data")
+        historico = st.text_input("Histórico", placeholder="Ex.: Venda com retenção de ISS")
+        rotulos = [rotulo_conta(codigo) for codigo in indice.buscar("", recentes)]
+        partidas = st.data_editor(
+            pd.DataFrame({
+                "Conta": pd.Series([None] * 3, dtype="object"),
+                "Débito": pd.Series([None] * 3, dtype="float64"),
+                "Crédito": pd.Series([None] * 3, dtype="float64"),
+            }),
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Conta": st.column_config.SelectboxColumn(options=rotulos, width="large"),
+                "Débito": st.column_config.NumberColumn(min_value=0.0, format="%.2f"),
+                "Crédito": st.column_config.NumberColumn(min_value=0.0, format="%.2f"),
+            },
+        )
+
+        submitted = st.form_submit_button("Registrar")
+
+        if submitted:
+            partidas = partidas.dropna(subset=["Conta"]).fillna({"Débito": 0.0, "Crédito": 0.0})
+            codigos = partidas["Conta"].str.split(" - ", n=1).str[0]
+            try:
+                st.session_state.diario.lancar_composto(
+                    data,
+                    list(zip(codigos[partidas["Débito"] > 0], partidas.loc[partidas["Débito"] > 0, "Débito"])),
+                    list(zip(codigos[partidas["Crédito"] > 0], partidas.loc[partidas["Crédito"] > 0, "Crédito"])),
+                    historico,
+                )
+            except ValueError as erro:
+                st.error(str(erro))
+            else:
+                depois_de_lancar(f"Lançamento composto registrado com {len(partidas)} partidas!")
+
+# Desfazer, refazer e limpar gravam estornos: nada sai do registro do livro
+coluna_desfazer, coluna_refazer, coluna_limpar = st.columns(3)
+operacao = None
+if coluna_desfazer.button("↩️ Desfazer", disabled=not st.session_state.diario.pode_desfazer(), use_container_width=True):
+    operacao = (st.session_state.diario.desfazer, "Última operação desfeita.")
+if coluna_refazer.button("↪️ Refazer", disabled=not st.session_state.diario.pode_refazer(), use_container_width=True):
+    operacao = (st.session_state.diario.refazer, "Operação refeita.")
+if coluna_limpar.button("Limpar Lançamentos", use_container_width=True):
+    operacao = (st.session_state.diario.limpar, "Lançamentos estornados! Use Desfazer para recuperá-los.")
+if operacao:
+    executar, aviso = operacao
+    try:
+        executar()
+    except ValueError as erro:
+        st.error(str(erro))
+    else:
+        st.session_state.aviso_operacao = aviso
+        st.rerun()
+if "aviso_operacao" in st.session_state:
+    st.success(st.session_state.pop("aviso_operacao"))
+
+# Limite de receita do MEI conferido a cada execução: a apuração só lê os lançamentos novos
+if st.session_state.regime_das == "MEI":
+    aviso_mei = aviso_limite_mei(apurar(st.session_state.diario), date.today().year)
+    if aviso_mei:
+        st.warning(aviso_mei)
+
+# Balanço, DRE e razonetes em reais constantes de um mês-base, corrigidos pelo IPCA
+# publicado; movimento mensal, DAS e lançamentos continuam nominais
+diario_relatorios = st.session_state.diario
+em_reais_de = ""
+col1, col2 = st.columns(2)
+with col1:
+    reais_constantes = st.toggle(
+        "Relatórios em reais constantes (IPCA)",
+        help="Cada lançamento é corrigido pelo IPCA acumulado entre a sua data e o mês-base.",
+    )
+if reais_constantes:
+    indicadores, versao_indicadores = INDICADORES_PUBLICADOS.obter()
+    meses_ipca = indice_ipca(indicadores, versao_indicadores)["Mês"]
+    if meses_ipca.empty:
+        st.warning("A variação mensal do IPCA ainda não foi carregada: os relatórios seguem em valores nominais.")
+    else:
+        with col2:
+            mes_base = st.selectbox("Em reais de", meses_ipca.iloc[::-1], format_func=lambda mes: f"{mes:%m/%Y}")
+        with medir("correcao_ipca"):
+            diario_relatorios = diario_corrigido(st.session_state.diario, indicadores, versao_indicadores, mes_base)
+        em_reais_de = f" (em reais de {mes_base:%m/%Y})"
 
-    conta_debito = st.selectbox("Débito", options=list(contas_filtradas.keys()))
-    conta_credito = st.selectbox("Crédito", options=list(contas_filtradas.keys()))
-    
-    submitted = st.form_submit_button("Registrar")
-    
-    if submitted:
-        if not conta_debito or not conta_credito:
-            st.error("Selecione ambas as contas!")
-        elif conta_debito == conta_credito:
-            st.error("Contas de débito e crédito não podem ser iguais!")
-        else:
-            # Inicializar contas se não existirem
-            for conta in [conta_debito, conta_credito]:
-                if conta not in st.session_state.dict_conta:
-                    st.session_state.dict_conta[conta] = {
-                        'débito': [],
-                        'crédito': []
-                    }
-            
-            # Registrar lançamento
-            st.session_state.dict_conta[conta_debito]['débito'].append((valor, data))
-            st.session_state.dict_conta[conta_credito]['crédito'].append((valor, data))
-            st.success("Lançamento registrado!")
-
-# Botões de limpeza e relatório
-if st.button("Limpar Lançamentos"):
-    st.session_state.dict_conta = {}
-    st.success("Lançamentos removidos!")
+data_balanco = st.date_input("Posição do balanço em", value=date.today(), format="DD/MM/YYYY")
 
 if st.button("Gerar Balanço"):
-    relatorio = gerar_relatorio_patrimonio()
-    
-    
-    st.subheader("Balanço Patrimonial")
+    with medir("relatorio", relatorio="balanco"):
+        relatorio = gerar_relatorio_patrimonio(diario_relatorios, data_balanco)
+        saldos = calcular_saldos(diario_relatorios, data_balanco)
 
-    saldos = calcular_saldos()
+    st.subheader(f"Balanço Patrimonial em {data_balanco:%d/%m/%Y}{em_reais_de}")
 
-    # Separar contas conforme estrutura contábil
+    # Separar contas conforme estrutura contábil. Cada lado mostra o saldo no seu
+    # sentido natural (devedor no Ativo, credor no Passivo e PL): contas redutoras
+    # e prejuízos aparecem negativos
     linhas_ativo = []
     linhas_passivo_pl = []
 
-    for conta_desc, saldo in saldos.items():
-        codigo = DESCRICAO_TO_CONTA.get(conta_desc, "")
-        if saldo == 0 or not codigo:
+    for codigo, saldo in saldos.items():
+        if saldo == 0 or codigo not in CONTAS:
             continue
 
-        linha = {"Conta": f"{conta_desc}", "Saldo": abs(saldo)}
-
         if codigo.startswith("1."):
-            linhas_ativo.append(linha)
+            linhas_ativo.append({"Conta": f"{CONTAS[codigo]}", "Saldo": saldo})
         elif codigo.startswith("2."):  # Passivo e Patrimônio Líquido
-            linhas_passivo_pl.append(linha)
-            
+            linhas_passivo_pl.append({"Conta": f"{CONTAS[codigo]}", "Saldo": -saldo})
+
+    # Contas de resultado acumuladas desde o início do livro, encerradas no Patrimônio Líquido
+    if relatorio["Resultado do Exercício"]:
+        linhas_passivo_pl.append({"Conta": "Lucros/Prejuízos Acumulados", "Saldo": relatorio["Resultado do Exercício"]})
+
     # Garantir alinhamento das tabelas
     len_max = max(len(linhas_ativo), len(linhas_passivo_pl))
     linhas_ativo += [{}] * (len_max - len(linhas_ativo))
@@ -507,93 +269,187 @@ if st.button("Gerar Balanço"):
         st.table(pd.DataFrame(linhas_passivo_pl))
 
     # Totais
-    totais = gerar_relatorio_patrimonio()
+    totais = relatorio
     col1, col2 = st.columns(2)
     with col1:
         st.metric("Total do Ativo", f"R$ {totais['Ativo Total']:,.2f}".replace(".", ","))
     with col2:
         st.metric("Total Passivo + PL", f"R$ {(totais['Passivo Total'] + totais['Patrimônio Líquido']):,.2f}".replace(".", ","))
-    
-    
+
+
     if relatorio['Patrimônio Líquido'] >= 0:
         st.success("Situação líquida positiva!")
     else:
         st.error("Situação líquida negativa!")
 
 # Exibir lançamentos
-if st.session_state.dict_conta:
-    st.subheader("Lançamentos Registrados")
-    
-    dados = []
-    saldos = calcular_saldos()
-    
-    for conta, movimentos in st.session_state.dict_conta.items():
-        codigo = DESCRICAO_TO_CONTA.get(conta, "N/A")
-        
-        for valor, data in movimentos['débito']:
-            dados.append({
-                "Data": data,
-                "Conta": f"{codigo} - {conta}",
-                "Débito": valor,
-                "Crédito": None
-            })
-        
-        for valor, data in movimentos['crédito']:
-            dados.append({
-                "Data": data,
-                "Conta": f"{codigo} - {conta}",
-                "Débito": None,
-                "Crédito": valor
-            })
-    
-    if dados:
-        df = pd.DataFrame(dados)
-        st.dataframe(df)
-    else:
-        st.info("Nenhum lançamento registrado.")
+diario = st.session_state.diario
+
+if len(diario):
+    # Movimento mensal: parte do último fechamento e lê só os lançamentos do mês
+    with st.expander("📅 Movimento mensal e fechamento de períodos"), medir("relatorio", relatorio="movimento_mensal"):
+        referencia = st.date_input("Mês de referência", value=date.today(), format="DD/MM/YYYY")
+        fim_mes = fim_do_mes(referencia)
+        inicio_mes = fim_mes.replace(day=1)
+        movimento = movimento_periodo(diario, inicio_mes, fim_mes)
+        movimento = movimento[(movimento != 0).any(axis=1)]
+        movimento.insert(0, "Conta", [CONTAS.get(codigo, "N/A") for codigo in movimento.index])
+        st.dataframe(
+            movimento,
+            use_container_width=True,
+            column_config={
+                coluna: st.column_config.NumberColumn(format="R$ %.2f")
+                for coluna in ["Saldo inicial", "Débitos", "Créditos", "Saldo final"]
+            },
+        )
 
-    # Exibir razonetes
-    st.subheader("Razonetes")
-    for conta, movimentos in st.session_state.dict_conta.items():
-        codigo = DESCRICAO_TO_CONTA.get(conta, "N/A")
-        saldo = saldos[conta]
-        
-        st.write(f"**{codigo} - {conta}**")
-        
+        limite = fechado_ate(diario)
+        st.caption(
+            f"Períodos fechados até {limite:%d/%m/%Y}." if limite is not None
+            else "Nenhum período fechado."
+        )
         col1, col2 = st.columns(2)
         with col1:
-            st.write("**Débito**")
-            for valor, data in movimentos['débito']:
-                st.write(f"R$ {valor:,.2f} - {data}")
-        
+            if st.button(f"Fechar até {fim_mes:%m/%Y}"):
+                try:
+                    diario.fechar_periodo(fim_mes)
+                except ValueError as erro:
+                    st.error(str(erro))
+                else:
+                    # Rerun para a legenda e o botão de reabrir já mostrarem o novo fechamento
+                    st.session_state.aviso_operacao = f"Período fechado até {fim_mes:%d/%m/%Y}."
+                    st.rerun()
         with col2:
-            st.write("**Crédito**")
-            for valor, data in movimentos['crédito']:
-                st.write(f"R$ {valor:,.2f} - {data}")
-        
-        st.write(f"**Saldo:** R$ {abs(saldo):,.2f} ({'Devedor' if saldo > 0 else 'Credor' if saldo < 0 else 'Zerado'})")
-        st.divider()
+            if limite is not None and st.button("Reabrir último fechamento"):
+                diario.reabrir_periodo()
+                st.session_state.aviso_operacao = "Último fechamento reaberto."
+                st.rerun()
+
+    # DRE e fluxo de caixa: uma agregação por conta no período, guardada por versão do livro
+    with st.expander("📑 DRE e Fluxo de Caixa"), medir("relatorio", relatorio="dre_fluxo_caixa"):
+        col1, col2 = st.columns(2)
+        with col1:
+            inicio_dre = st.date_input("De", value=date(date.today().year, 1, 1), format="DD/MM/YYYY")
+        with col2:
+            fim_dre = st.date_input("Até", value=date.today(), format="DD/MM/YYYY")
+        if inicio_dre > fim_dre:
+            st.error("A data inicial deve ser anterior à final.")
+        else:
+            demonstracoes = gerar_demonstracoes(diario_relatorios, inicio_dre, fim_dre)
+            formato_valor = {"Valor": st.column_config.NumberColumn(format="R$ %.2f")}
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown(f"#### Demonstração do Resultado{em_reais_de}")
+                st.dataframe(demonstracoes["dre"], hide_index=True, use_container_width=True, column_config=formato_valor)
+            with col2:
+                st.markdown("#### Fluxo de Caixa (indireto)")
+                st.dataframe(demonstracoes["fluxo_caixa"], hide_index=True, use_container_width=True, column_config=formato_valor)
+            resultado = demonstracoes["balanco"]["Resultado do Exercício"]
+            st.caption(
+                f"Resultado acumulado até {fim_dre:%d/%m/%Y}, encerrado no Patrimônio Líquido: "
+                f"R$ {resultado:,.2f}".replace(".", ",")
+            )
+
+    # Simples Nacional: RBT12 e DAS de cada mês, com a provisão em 2.1.4.01.01
+    with st.expander("🧾 Simples Nacional (DAS)"), medir("relatorio", relatorio="simples"):
+        col1, col2 = st.columns(2)
+        with col1:
+            regime = st.selectbox("Regime", REGIMES, key="regime_das")
+        with col2:
+            st.toggle(
+                "Provisionar o DAS a cada lançamento",
+                key="provisionar_das",
+                help="Lança a diferença de cada mês em aberto: D 3.1.2.01.01 / C 2.1.4.01.01, no último dia do mês.",
+            )
+        tabela = provisoes(diario, regime, fim_do_mes(date.today()))
+        if tabela.empty:
+            st.info("Nenhuma receita bruta (contas 3.1.1.01) lançada ainda.")
+        else:
+            atual = tabela.iloc[-1]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("RBT12", f"R$ {atual['RBT12']:,.2f}".replace(".", ","))
+            col2.metric("Alíquota efetiva", f"{atual['Alíquota efetiva']:.2%}".replace(".", ","))
+            col3.metric(f"DAS de {tabela.index[-1]:%m/%Y}", f"R$ {atual['DAS']:,.2f}".replace(".", ","))
+            if regime == "Simples Nacional" and (tabela["Faixa"] > 6).any():
+                st.error("A RBT12 passou de R$ 4,8 milhões em algum mês: a empresa fica fora do Simples Nacional.")
+            st.dataframe(
+                tabela.sort_index(ascending=False),
+                use_container_width=True,
+                column_config={
+                    "Mês": st.column_config.DateColumn(format="MM/YYYY"),
+                    "Alíquota efetiva": st.column_config.NumberColumn(format="%.4f"),
+                    **{coluna: st.column_config.NumberColumn(format="R$ %.2f")
+                       for coluna in ["Receita", "RBT12", "DAS", "Provisionado", "Diferença"]},
+                },
+            )
+            pendentes = int((tabela["Diferença"].abs() >= 0.01).sum())
+            if st.button(f"Provisionar diferenças ({pendentes})", disabled=not pendentes):
+                try:
+                    meses = provisionar(diario, regime, fim_do_mes(date.today()))
+                except ValueError as erro:
+                    st.error(str(erro))
+                else:
+                    st.session_state.aviso_operacao = f"DAS provisionado em {meses} {'mês' if meses == 1 else 'meses'}."
+                    st.rerun()
+            st.caption("Meses de períodos fechados não são ajustados. Anexo I para mercadorias, II para produtos "
+                       "e III para serviços.")
+
+    st.subheader("Lançamentos Registrados")
+
+    contas_usadas = diario.resumo_contas().index.tolist()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        filtro_conta = st.selectbox(
+            "Filtrar por conta",
+            options=[None] + contas_usadas,
+            format_func=lambda codigo: "Todas" if codigo is None else f"{codigo} - {CONTAS.get(codigo, 'N/A')}",
+        )
+    with col2:
+        ordenar_por = st.selectbox("Ordenar por", ["Lançamento", "Data", "Valor"])
+    with col3:
+        crescente = st.radio("Ordem", ["Crescente", "Decrescente"], horizontal=True) == "Crescente"
+
+    filtros = {"ordenar_por": ordenar_por, "crescente": crescente, "conta": filtro_conta}
+    _, total = diario.consultar(tamanho=0, **filtros)
+    total_paginas = max(1, -(-total // LANCAMENTOS_POR_PAGINA))
+    if st.session_state.get("lancamentos_pagina", 1) > total_paginas:
+        st.session_state.lancamentos_pagina = total_paginas
+
+    pagina_df, _ = diario.consultar(
+        pagina=st.session_state.get("lancamentos_pagina", 1) - 1,
+        tamanho=LANCAMENTOS_POR_PAGINA,
+        **filtros,
+    )
+
+    # Só as linhas da página recebem o rótulo "código - descrição"
+    def rotulo(codigos):
+        return SEPARADOR_CONTAS.join(
+            f"{codigo} - {CONTAS.get(codigo, 'N/A')}" for codigo in codigos.split(SEPARADOR_CONTAS)
+        )
+
+    pagina_df = pagina_df.assign(
+        **{
+            "Débito": pagina_df["Débito"].map(rotulo),
+            "Crédito": pagina_df["Crédito"].map(rotulo),
+        }
+    )
+    st.dataframe(
+        pagina_df,
+        use_container_width=True,
+        column_config={
+            "Data": st.column_config.DateColumn(format="DD/MM/YYYY"),
+            "Valor": st.column_config.NumberColumn(format="R$ %.2f"),
+        },
+    )
+    st.number_input("Página", min_value=1, max_value=total_paginas, step=1, key="lancamentos_pagina")
+    st.caption(f"{total} lançamentos em {total_paginas} página(s)")
+
+    # Exibir razonetes
+    st.subheader(f"Razonetes{em_reais_de}")
+    with medir("razonetes"):
+        exibir_razonetes(diario_relatorios, CONTAS)
 else:
     st.info("Nenhum lançamento registrado. Use o formulário acima para adicionar.")
 
 # Rodapé no final da página
-st.markdown("""
-<style>
-    .footer {
-        text-align: center;
-        padding: 10px;
-        margin-top: 50px;
-    }
-</style>
-<div class="footer">
-    <a rel="license" href="http://creativecommons.org/licenses/by/4.0/">
-        <img alt="Licença Creative Commons" style="border-width:0" 
-             src="https://i.creativecommons.org/l/by/4.0/88x31.png" />
-    </a>
-    <br />
-    Este trabalho está licenciado sob uma 
-    <a rel="license" href="http://creativecommons.org/licenses/by/4.0/">
-        Licença Creative Commons Atribuição 4.0 Internacional
-    </a>.
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+rodape()
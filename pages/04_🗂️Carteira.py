@@ -0,0 +1,107 @@
+import streamlit as st
+from datetime import date
+from helpmei.armazenamento import banco_compartilhado, nome_livro_sessao
+from helpmei.consolidacao import (
+    COLUNA_CAIXA,
+    COLUNAS,
+    adicionar_a_carteira,
+    consolidado,
+    consolidar,
+    livros_da_carteira,
+    remover_da_carteira,
+)
+from helpmei.layout import configurar_pagina, rodape
+from helpmei.metricas import faixa_quantidade, medir
+
+configurar_pagina("Carteira de Clientes", "🗂️", layout="wide")
+
+# Modo contador: Balanço e DRE de todos os livros de clientes acompanhados.
+# A carteira pertence ao mesmo dono do livro da Calculadora (e-mail ou código da URL).
+banco = banco_compartilhado()
+contador = nome_livro_sessao()
+
+st.title("🗂️ Carteira de Clientes")
+st.caption("Acompanhe os livros dos MEIs que você atende: demonstrações lado a lado e consolidadas.")
+
+with st.expander("➕ Adicionar ou remover clientes", expanded=not livros_da_carteira(banco, contador)):
+    with st.form("adicionar_cliente", clear_on_submit=True):
+        codigos = st.text_area(
+            "Códigos dos livros dos clientes",
+            help="O código é o valor depois de ?livro= na URL da Calculadora do cliente. Um por linha.",
+        )
+        if st.form_submit_button("Adicionar"):
+            erros = []
+            for codigo in codigos.split():
+                try:
+                    adicionar_a_carteira(banco, contador, codigo)
+                except ValueError as erro:
+                    erros.append(f"{codigo}: {erro}")
+            for erro in erros:
+                st.error(erro)
+
+    livros = livros_da_carteira(banco, contador)
+    if livros:
+        nomes = dict(banco.conexao().execute(
+            f"SELECT id, nome FROM livros WHERE id IN ({', '.join('?' * len(livros))})", tuple(livros)
+        ).fetchall())
+        remover = st.multiselect("Remover da carteira", livros, format_func=nomes.get)
+        if remover and st.button("Remover selecionados"):
+            remover_da_carteira(banco, contador, remover)
+            st.rerun()
+
+livros = livros_da_carteira(banco, contador)
+if not livros:
+    st.info("Sua carteira está vazia. Adicione os códigos dos livros dos seus clientes acima.")
+    rodape()
+    st.stop()
+
+coluna_inicio, coluna_fim = st.columns(2)
+inicio = coluna_inicio.date_input("Início do período", value=date(date.today().year, 1, 1), format="DD/MM/YYYY")
+fim = coluna_fim.date_input("Fim do período", value=date.today(), format="DD/MM/YYYY")
+if inicio > fim:
+    st.error("O início do período precisa ser anterior ao fim.")
+    rodape()
+    st.stop()
+
+# Só os livros alterados desde o último cálculo vão para o pool de processos
+with medir("consolidacao", livros=faixa_quantidade(len(livros))), st.spinner(f"Consolidando {len(livros)} livros..."):
+    comparativo = consolidar(banco, livros, inicio, fim)
+total = consolidado(comparativo)
+
+abas = st.tabs(["📋 Consolidado", "📊 Comparativo"])
+
+with abas[0]:
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Clientes", len(comparativo))
+    col2.metric("Receita Bruta", f"R$ {total['Receita Bruta']:,.2f}".replace(".", ","))
+    col3.metric("Resultado do período", f"R$ {total['= Resultado Líquido do Período']:,.2f}".replace(".", ","))
+    col4.metric("Ativo Total", f"R$ {total['Ativo Total']:,.2f}".replace(".", ","))
+
+    st.subheader(f"Demonstrações consolidadas de {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}")
+    st.dataframe(
+        total.rename("Valor").to_frame(),
+        column_config={"Valor": st.column_config.NumberColumn(format="R$ %.2f")},
+        use_container_width=True,
+    )
+
+with abas[1]:
+    linha = st.selectbox("Comparar por", COLUNAS, index=COLUNAS.index("= Resultado Líquido do Período"))
+    st.bar_chart(comparativo[linha].sort_values(ascending=False).head(50))
+    colunas_exibidas = ["Ativo Total", "Patrimônio Líquido", "Receita Bruta", "= Lucro Bruto",
+                        "= Resultado Líquido do Período", COLUNA_CAIXA]
+    if linha not in colunas_exibidas:
+        colunas_exibidas.append(linha)
+    st.dataframe(
+        comparativo.sort_values(linha, ascending=False),
+        column_order=colunas_exibidas,
+        column_config={coluna: st.column_config.NumberColumn(format="R$ %.2f") for coluna in COLUNAS},
+        use_container_width=True,
+    )
+    st.download_button(
+        "⬇️ Baixar comparativo (CSV)",
+        comparativo.to_csv(sep=";", decimal=",").encode("utf-8-sig"),
+        file_name=f"carteira_{inicio:%Y%m%d}_{fim:%Y%m%d}.csv",
+        mime="text/csv",
+    )
+
+rodape()
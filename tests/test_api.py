@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import pandas as pd
+from tornado.testing import AsyncHTTPTestCase
+from helpmei.api import chave_livro, criar_app
+from helpmei.armazenamento import BancoLivros
+
+SEGREDO = "segredo-de-teste"
+
+
+class IndicadoresFixos:
+    def obter(self):
+        datas = pd.date_range("2024-01-01", periods=3, freq="MS")
+        df = pd.DataFrame({"Date": datas, "SELIC": [11.0, 10.5, 10.0], "IPCA": [4.5, 4.2, 3.9],
+                           "Inadimplencia": [3.1, 3.0, 2.9], "Ano": datas.year})
+        return df, "v1"
+
+
+class TestApiLivros(AsyncHTTPTestCase):
+    def get_app(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.banco = BancoLivros(os.path.join(self.pasta.name, "api.db"))
+        diario = self.banco.diario("cliente@exemplo.com")
+        diario.lancar("2024-01-10", "1.1.1.01.01", "2.3.1.01.01", 1_000.0)
+        diario.lancar("2024-02-10", "1.1.1.01.01", "3.1.1.01.01", 250.0)
+        self.livro_id = diario.livro_id
+        return criar_app(IndicadoresFixos(), self.banco, segredo=SEGREDO)
+
+    def tearDown(self):
+        super().tearDown()
+        self.pasta.cleanup()
+
+    def pedir(self, caminho, chave=None):
+        cabecalhos = {"Authorization": f"Bearer {chave}"} if chave else {}
+        return self.fetch(caminho, headers=cabecalhos)
+
+    def test_sem_chave_ou_com_chave_de_outro_livro(self):
+        assert self.pedir(f"/livros/{self.livro_id}/saldos").code == 401
+        assert self.pedir(f"/livros/{self.livro_id}/saldos", chave_livro(self.livro_id + 1, SEGREDO)).code == 401
+        # Livro inexistente sem a chave certa também é 401: não revela quais ids existem
+        assert self.pedir("/livros/999/saldos").code == 401
+        assert self.pedir("/livros/999/saldos", chave_livro(999, SEGREDO)).code == 404
+
+    def test_nome_do_livro_fora_da_url(self):
+        assert self.pedir("/livros/cliente@exemplo.com/saldos", chave_livro(self.livro_id, SEGREDO)).code == 404
+
+    def test_saldos_com_chave_e_data_vazia(self):
+        chave = chave_livro(self.livro_id, SEGREDO)
+        resposta = self.pedir(f"/livros/{self.livro_id}/saldos?ate=", chave)
+        assert resposta.code == 200
+        saldos = {linha["conta"]: linha["saldo"] for linha in json.loads(resposta.body)}
+        assert saldos == {"1.1.1.01.01": 1_250.0, "2.3.1.01.01": -1_000.0, "3.1.1.01.01": -250.0}
+        resposta = self.pedir(f"/livros/{self.livro_id}/saldos?ate=2024-01-31", chave)
+        assert {linha["conta"] for linha in json.loads(resposta.body)} == {"1.1.1.01.01", "2.3.1.01.01"}
+        assert self.pedir(f"/livros/{self.livro_id}/saldos?ate=ontem", chave).code == 400
+
+    def test_demonstracoes(self):
+        resposta = self.pedir(f"/livros/{self.livro_id}/demonstracoes/balanco", chave_livro(self.livro_id, SEGREDO))
+        linhas = {linha["Linha"]: linha["Valor"] for linha in json.loads(resposta.body)}
+        assert linhas["Ativo Total"] == 1_250.0
+
+    def test_indicadores_com_data_vazia(self):
+        resposta = self.fetch("/indicadores?inicio=&fim=2024-02-01")
+        assert resposta.code == 200
+        assert len(json.loads(resposta.body)) == 2
+
+
+class TestApiSemSegredo(AsyncHTTPTestCase):
+    def get_app(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        return criar_app(IndicadoresFixos(), BancoLivros(os.path.join(self.pasta.name, "api.db")), segredo="")
+
+    def tearDown(self):
+        super().tearDown()
+        self.pasta.cleanup()
+
+    def test_rotas_de_livros_desligadas(self):
+        assert self.fetch("/livros/1/saldos", headers={"Authorization": f"Bearer {chave_livro(1, '')}"}).code == 403
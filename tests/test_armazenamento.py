@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+from types import SimpleNamespace
+import pytest
+from helpmei import armazenamento
+from helpmei.armazenamento import CODIGO_LIVRO, MIGRACOES, PREFIXO_USUARIO, BancoLivros, _comandos
+
+
+def tabelas(caminho):
+    with sqlite3.connect(caminho) as conexao:
+        return {nome for (nome,) in conexao.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def versao(caminho):
+    with sqlite3.connect(caminho) as conexao:
+        return conexao.execute("PRAGMA user_version").fetchone()[0]
+
+
+@pytest.fixture
+def banco_v2(tmp_path):
+    # Banco parado na versão 2: lançamentos ainda com débito e crédito na mesma linha
+    caminho = str(tmp_path / "antigo.db")
+    conexao = sqlite3.connect(caminho)
+    for script in MIGRACOES[:2]:
+        conexao.executescript(script)
+    conexao.execute("INSERT INTO livros (nome) VALUES ('antigo')")
+    conexao.execute("INSERT INTO lancamentos (livro_id, data, debito, credito, valor) "
+                    "VALUES (1, '2024-01-10', '1.1.1.01.01', '3.1.1.01.01', 150.0)")
+    conexao.execute("PRAGMA user_version=2")
+    conexao.commit()
+    conexao.close()
+    return caminho
+
+
+def test_banco_novo_chega_na_ultima_versao(tmp_path):
+    caminho = str(tmp_path / "novo.db")
+    BancoLivros(caminho)
+    assert versao(caminho) == len(MIGRACOES)
+    assert {"livros", "lancamentos", "partidas", "operacoes", "carteiras"} <= tabelas(caminho)
+    # Abrir de novo não reaplica nada
+    BancoLivros(caminho).diario("x").lancar("2024-01-10", "1.1.1.01.01", "3.1.1.01.01", 10.0)
+    assert versao(caminho) == len(MIGRACOES)
+
+
+def test_migra_lancamentos_antigos_para_partidas(banco_v2):
+    diario = BancoLivros(banco_v2).diario("antigo")
+    assert versao(banco_v2) == len(MIGRACOES)
+    assert diario.saldos().to_dict() == {"1.1.1.01.01": 150.0, "3.1.1.01.01": -150.0}
+    assert "lancamentos_novos" not in tabelas(banco_v2)
+
+
+def test_falha_no_meio_desfaz_a_migracao(banco_v2, monkeypatch):
+    monkeypatch.setattr("helpmei.armazenamento.MIGRACOES", [*MIGRACOES, "CREATE TABLE livros (id INTEGER);"])
+    with pytest.raises(sqlite3.OperationalError):
+        BancoLivros(banco_v2)
+    assert versao(banco_v2) == 2
+    assert "partidas" not in tabelas(banco_v2)
+
+
+def test_processos_abrindo_banco_antigo_ao_mesmo_tempo(banco_v2):
+    erros = []
+    barreira = threading.Barrier(4)
+
+    def abrir():
+        barreira.wait()
+        try:
+            BancoLivros(banco_v2)
+        except Exception as erro:
+            erros.append(erro)
+
+    threads = [threading.Thread(target=abrir) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert erros == []
+    assert versao(banco_v2) == len(MIGRACOES)
+    assert BancoLivros(banco_v2).diario("antigo").saldos()["1.1.1.01.01"] == 150.0
+
+
+def test_comandos_separa_o_script():
+    assert list(_comandos("CREATE TABLE a (x TEXT DEFAULT ';');\nINSERT INTO a VALUES (1);\n")) == [
+        "CREATE TABLE a (x TEXT DEFAULT ';');", "INSERT INTO a VALUES (1);",
+    ]
+
+
+def test_livros_de_usuarios_ganham_prefixo(tmp_path):
+    caminho = str(tmp_path / "v6.db")
+    conexao = sqlite3.connect(caminho)
+    for script in MIGRACOES[:6]:
+        conexao.executescript(script)
+    conexao.executemany("INSERT INTO livros (nome) VALUES (?)", [("alice@exemplo.com",), ("a" * 32,)])
+    conexao.execute("INSERT INTO carteiras (contador, livro_id) VALUES ('alice@exemplo.com', 2)")
+    conexao.execute("PRAGMA user_version=6")
+    conexao.commit()
+    conexao.close()
+    banco = BancoLivros(caminho)
+    assert [nome for (nome,) in banco.conexao().execute("SELECT nome FROM livros ORDER BY id")] == [
+        PREFIXO_USUARIO + "alice@exemplo.com", "a" * 32,
+    ]
+    assert banco.conexao().execute("SELECT contador FROM carteiras").fetchone()[0] == PREFIXO_USUARIO + "alice@exemplo.com"
+
+
+@pytest.mark.parametrize("parametro", [None, "alice@exemplo.com", "usuario:alice@exemplo.com", "A" * 32, "a" * 31])
+def test_livro_sem_login_so_aceita_codigo(monkeypatch, parametro):
+    consulta = {} if parametro is None else {"livro": parametro}
+    monkeypatch.setattr(armazenamento, "st", SimpleNamespace(user={"is_logged_in": False}, query_params=consulta))
+    nome = armazenamento.nome_livro_sessao()
+    assert CODIGO_LIVRO.fullmatch(nome) and nome != parametro
+    assert consulta["livro"] == nome
+    # O código emitido vale nas próximas execuções
+    assert armazenamento.nome_livro_sessao() == nome
+
+
+def test_livro_com_login_fica_fora_dos_codigos(monkeypatch):
+    usuario = {"is_logged_in": True, "email": "alice@exemplo.com"}
+    monkeypatch.setattr(armazenamento, "st", SimpleNamespace(user=usuario, query_params={"livro": "b" * 32}))
+    assert armazenamento.nome_livro_sessao() == PREFIXO_USUARIO + "alice@exemplo.com"
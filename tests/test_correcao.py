@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from helpmei.correcao import COLUNA_IPCA, corrigir, diario_corrigido, indice_em, indice_ipca
+from helpmei.diario import Diario
+from helpmei.relatorios import calcular_demonstracoes
+
+
+def indicadores(variacoes, inicio="2024-01-01"):
+    return pd.DataFrame({
+        "Date": pd.date_range(inicio, periods=len(variacoes), freq="MS"),
+        COLUNA_IPCA: variacoes,
+    })
+
+
+@pytest.fixture
+def diario():
+    diario = Diario()
+    diario.lancar("2024-01-10", "1.1.1.01.01", "2.3.1.01.01", 1_000.0)
+    diario.lancar("2024-03-20", "1.1.1.01.01", "3.1.1.01.01", 500.0)
+    return diario
+
+
+def test_indice_encadeia_a_variacao_mensal():
+    indice = indice_ipca(indicadores([1.0, 2.0, 3.0]), "encadeia")
+    np.testing.assert_allclose(indice["Índice"], [101.0, 103.02, 106.1106])
+    assert indice_em(indice, "2024-02-15") == pytest.approx(103.02)
+    # Antes do primeiro mês vale o primeiro, depois do último, o último
+    assert indice_em(indice, "2023-06-01") == pytest.approx(101.0)
+    assert indice_em(indice, "2030-01-01") == pytest.approx(106.1106)
+
+
+def test_correcao_para_o_mes_base(diario):
+    visao = diario_corrigido(diario, indicadores([1.0, 2.0, 3.0]), "base", "2024-03-31")
+    saldos = visao.saldos()
+    assert saldos["2.3.1.01.01"] == pytest.approx(-1_000.0 * 106.1106 / 101.0)
+    assert saldos["3.1.1.01.01"] == pytest.approx(-500.0)
+    # Cada lançamento continua fechando: o balanço bate depois da correção
+    balanco = calcular_demonstracoes(visao)["balanco"]
+    assert balanco["Ativo Total"] == pytest.approx(balanco["Passivo Total"] + balanco["Patrimônio Líquido"])
+
+
+def test_visao_guardada_por_versao_do_livro(diario):
+    df = indicadores([1.0, 2.0, 3.0])
+    primeira = diario_corrigido(diario, df, "guardada", "2024-03-01")
+    assert diario_corrigido(diario, df, "guardada", "2024-03-15") is primeira
+    diario.lancar("2024-03-25", "1.1.1.01.01", "3.1.1.01.01", 10.0)
+    assert diario_corrigido(diario, df, "guardada", "2024-03-01") is not primeira
+
+
+@pytest.mark.parametrize("df", [
+    indicadores([np.nan, np.nan]),
+    pd.DataFrame({"Date": pd.date_range("2024-01-01", periods=2, freq="MS"), "IPCA": [4.5, 4.6]}),
+])
+def test_sem_ipca_mensal_segue_nominal(diario, df):
+    indice = indice_ipca(df, f"vazio-{len(df.columns)}")
+    assert indice.empty and indice_em(indice, "2024-01-01") is None
+    partidas = diario.partidas()
+    assert corrigir(partidas, indice, "2024-01-01") is partidas
+    assert diario_corrigido(diario, df, f"vazio-{len(df.columns)}", "2024-01-01") is diario
@@ -0,0 +1,109 @@
+import pytest
+from helpmei.armazenamento import BancoLivros
+
+
+@pytest.fixture
+def diario(tmp_path):
+    diario = BancoLivros(str(tmp_path / "livros.db")).diario("teste")
+    diario.lancar("2024-01-05", "1.1.1.01.01", "2.3.1.01.01", 1_000.0, "capital")
+    diario.lancar("2024-01-10", "1.1.1.01.01", "3.1.1.01.01", 300.0, "venda")
+    return diario
+
+
+def saldos(diario):
+    serie = diario.saldos()
+    return serie[serie != 0].to_dict()
+
+
+def operacoes(diario):
+    return diario.banco.conexao().execute(
+        "SELECT tipo, origem FROM operacoes WHERE livro_id = ? ORDER BY id", (diario.livro_id,)
+    ).fetchall()
+
+
+def test_desfazer_e_refazer_gravam_estornos(diario):
+    assert diario.pode_desfazer() and not diario.pode_refazer()
+    diario.desfazer()
+    assert saldos(diario) == {"1.1.1.01.01": 1_000.0, "2.3.1.01.01": -1_000.0}
+    # Nada é apagado: o estorno entra como lançamento novo, com a data do original
+    assert len(diario) == 3
+    assert diario.frame()["Histórico"].iloc[-1] == "Estorno do lançamento 2"
+    assert diario.frame()["Data"].iloc[-1] == diario.frame()["Data"].iloc[1]
+    assert diario.pode_refazer()
+
+    diario.refazer()
+    assert saldos(diario) == {"1.1.1.01.01": 1_300.0, "2.3.1.01.01": -1_000.0, "3.1.1.01.01": -300.0}
+    assert diario.frame()["Histórico"].iloc[-1] == "venda"
+    assert not diario.pode_refazer()
+    assert [tipo for tipo, _ in operacoes(diario)] == ["lancamento", "lancamento", "desfazer", "refazer"]
+
+
+def test_desfazer_em_sequencia_e_sem_mais_nada(diario):
+    diario.desfazer()
+    diario.desfazer()
+    assert saldos(diario) == {}
+    assert not diario.pode_desfazer()
+    assert diario.desfazer() is None
+    # Refazer volta na ordem inversa: primeiro o último desfeito
+    diario.refazer()
+    assert saldos(diario) == {"1.1.1.01.01": 1_000.0, "2.3.1.01.01": -1_000.0}
+
+
+def test_desfazer_o_refazer(diario):
+    diario.desfazer()
+    diario.refazer()
+    diario.desfazer()
+    assert saldos(diario) == {"1.1.1.01.01": 1_000.0, "2.3.1.01.01": -1_000.0}
+    assert diario.pode_refazer()
+
+
+def test_lancamento_novo_descarta_o_refazer(diario):
+    diario.desfazer()
+    diario.lancar("2024-01-12", "3.3.1.01.01", "1.1.1.01.01", 50.0)
+    assert not diario.pode_refazer()
+    assert diario.refazer() is None
+
+
+def test_limpar_e_desfazer_a_limpeza(diario):
+    diario.fechar_periodo("2024-01-31")
+    diario.limpar()
+    assert saldos(diario) == {}
+    assert diario.periodos_fechados() == []
+    diario.desfazer()
+    assert saldos(diario) == {"1.1.1.01.01": 1_300.0, "2.3.1.01.01": -1_000.0, "3.1.1.01.01": -300.0}
+
+
+def test_periodo_fechado_bloqueia_o_desfazer(diario):
+    diario.fechar_periodo("2024-01-31")
+    with pytest.raises(ValueError, match="Período fechado"):
+        diario.desfazer()
+    assert [tipo for tipo, _ in operacoes(diario)] == ["lancamento", "lancamento"]
+    diario.reabrir_periodo()
+    assert diario.desfazer() is not None
+
+
+def test_fechamento_de_outra_sessao_antes_da_gravacao(diario, monkeypatch):
+    # Outra sessão fecha o período logo antes da trava de escrita deste lote
+    outra = BancoLivros(diario.banco.caminho).diario("teste")
+    transacao = diario.banco.transacao
+
+    def fechar_e_travar():
+        outra.fechar_periodo("2024-01-31")
+        return transacao()
+
+    monkeypatch.setattr(diario.banco, "transacao", fechar_e_travar)
+    with pytest.raises(ValueError, match="Período fechado"):
+        diario.lancar("2024-01-20", "1.1.1.01.01", "3.1.1.01.01", 50.0)
+    assert [tipo for tipo, _ in operacoes(diario)] == ["lancamento", "lancamento"]
+
+
+def test_instantaneos_seguem_o_registro(diario, monkeypatch):
+    monkeypatch.setattr("helpmei.armazenamento.INTERVALO_INSTANTANEO", 2)
+    for dia in range(11, 16):
+        diario.lancar(f"2024-01-{dia}", "1.1.1.01.01", "3.1.1.01.01", 10.0)
+        diario.desfazer()
+        diario.refazer()
+    assert diario.banco.conexao().execute("SELECT COUNT(*) FROM instantaneos").fetchone()[0] > 0
+    assert saldos(diario) == {"1.1.1.01.01": 1_350.0, "2.3.1.01.01": -1_000.0, "3.1.1.01.01": -350.0}
+    # Saldos no meio do registro: logo depois do desfazer do primeiro lançamento extra
+    assert diario.saldos_em(4)["3.1.1.01.01"] == -300.0
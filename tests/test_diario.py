@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from helpmei.armazenamento import BancoLivros
+from helpmei.diario import Diario, validar_lote
+
+
+def test_lote_achatado_em_arrays():
+    datas, historicos, indices, contas, valores = validar_lote([
+        ("2024-01-10", [("1.1.1.01.01", 100.0), ("3.1.1.01.01", -100.0)], "venda"),
+        ("2024-01-11", [("3.3.1.01.01", 60.0), ("1.1.1.01.01", -50.0), ("2.1.2.01.01", -10.0)], None),
+    ])
+    assert datas == ["2024-01-10", "2024-01-11"]
+    assert historicos == ["venda", ""]
+    np.testing.assert_array_equal(indices, [0, 0, 1, 1, 1])
+    assert contas == ["1.1.1.01.01", "3.1.1.01.01", "3.3.1.01.01", "1.1.1.01.01", "2.1.2.01.01"]
+    np.testing.assert_array_equal(valores, [100.0, -100.0, 60.0, -50.0, -10.0])
+
+
+def test_centavos_arredondados_antes_de_conferir():
+    *_, valores = validar_lote([("2024-01-10", [("1.1.1.01.01", 0.1 + 0.2), ("3.1.1.01.01", -0.3)], "")])
+    np.testing.assert_array_equal(valores, [0.3, -0.3])
+
+
+@pytest.mark.parametrize("lote, mensagem", [
+    ([], "Nenhum lançamento"),
+    ([("2024-01-10", [("", 10.0), ("3.1.1.01.01", -10.0)], "")], "precisam de uma conta"),
+    ([("2024-01-10", [("1.1.1.01.01", 0.0), ("3.1.1.01.01", 0.0)], "")], "valor zero"),
+    ([("2024-01-10", [("1.1.1.01.01", 10.0), ("1.1.2.01.01", 5.0)], "")], "Lançamento 1 .* débito e um crédito"),
+    ([
+        ("2024-01-10", [("1.1.1.01.01", 10.0), ("3.1.1.01.01", -10.0)], ""),
+        ("2024-01-11", [("1.1.1.01.01", 10.0), ("3.1.1.01.01", -9.99)], ""),
+    ], r"Lançamento 2 do lote não fecha: .* R\$ 0\.01"),
+])
+def test_lote_invalido(lote, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        validar_lote(lote)
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def diario(request, tmp_path):
+    if request.param == "memoria":
+        return Diario()
+    return BancoLivros(str(tmp_path / "livros.db")).diario("teste")
+
+
+def test_lote_com_erro_nao_grava_nada(diario):
+    diario.lancar("2024-01-05", "1.1.1.01.01", "2.3.1.01.01", 500.0)
+    with pytest.raises(ValueError):
+        diario.lancar_lote([
+            ("2024-01-10", [("1.1.1.01.01", 100.0), ("3.1.1.01.01", -100.0)], ""),
+            ("2024-01-11", [("1.1.1.01.01", 100.0), ("3.1.1.01.01", -90.0)], ""),
+        ])
+    assert len(diario) == 1
+    assert diario.saldos().to_dict() == {"1.1.1.01.01": 500.0, "2.3.1.01.01": -500.0}
+
+
+def test_lancamento_composto_fecha(diario):
+    diario.lancar_composto("2024-02-01", [("3.3.1.01.01", 1_000.0)],
+                           [("1.1.1.01.01", 920.0), ("2.1.2.01.01", 80.0)], "folha")
+    saldos = diario.saldos()
+    assert saldos.sum() == pytest.approx(0.0)
+    assert saldos["3.3.1.01.01"] == 1_000.0
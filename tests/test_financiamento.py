@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from helpmei.diario import Diario
+from helpmei.financiamento import (
+    CONTA_BANCO,
+    CONTA_EMPRESTIMO,
+    CONTA_JUROS,
+    cenarios,
+    contratar,
+    cronograma,
+    lancamentos_contrato,
+    taxa_mensal,
+)
+
+
+def test_price_parcela_fixa_pela_formula():
+    tabela = cronograma(10_000.0, 12, 12.0, "Price")
+    i = taxa_mensal(12.0)
+    np.testing.assert_allclose(tabela["Parcela"], 10_000.0 * i / (1 - (1 + i) ** -12))
+    assert tabela["Amortização"].sum() == pytest.approx(10_000.0)
+    assert tabela["Saldo"].iloc[-1] == pytest.approx(0.0, abs=1e-6)
+    # Os juros de cada mês incidem sobre o saldo do mês anterior
+    saldo_anterior = np.r_[10_000.0, tabela["Saldo"].to_numpy()[:-1]]
+    np.testing.assert_allclose(tabela["Juros"], saldo_anterior * i)
+
+
+def test_sac_amortizacao_constante():
+    tabela = cronograma(12_000.0, 12, 10.0, "SAC", inicio="2024-01-15")
+    np.testing.assert_allclose(tabela["Amortização"], 1_000.0)
+    np.testing.assert_allclose(tabela["Saldo"], 12_000.0 - 1_000.0 * np.arange(1, 13), atol=1e-9)
+    assert (np.diff(tabela["Parcela"]) < 0).all()
+    assert tabela["Vencimento"].iloc[0] == pd.Timestamp("2024-02-15")
+
+
+@pytest.mark.parametrize("sistema", ["Price", "SAC"])
+def test_taxa_zero_divide_o_valor(sistema):
+    tabela = cronograma(1_200.0, 12, 0.0, sistema)
+    np.testing.assert_allclose(tabela["Parcela"], 100.0)
+    assert tabela["Juros"].sum() == 0.0
+
+
+def test_cenarios_batem_com_o_cronograma_de_cada_um():
+    tabela = cenarios(50_000.0, {"atual": 10.5, "média": 11.0}, prazos=[12, 36], spreads=[4.0, 8.0])
+    assert len(tabela) == 2 * 2 * 2 * 2
+    for _, linha in tabela.iterrows():
+        individual = cronograma(50_000.0, linha["Prazo"], linha["Taxa a.a."], linha["Sistema"])
+        assert linha["Total de juros"] == pytest.approx(individual["Juros"].sum())
+        assert linha["Primeira parcela"] == pytest.approx(individual["Parcela"].iloc[0])
+        assert linha["Última parcela"] == pytest.approx(individual["Parcela"].iloc[-1])
+
+
+def test_prazos_e_valor_invalidos():
+    with pytest.raises(ValueError):
+        cenarios(1_000.0, {"atual": 10.0}, prazos=[0])
+    with pytest.raises(ValueError):
+        cenarios(0.0, {"atual": 10.0})
+    with pytest.raises(ValueError):
+        cenarios(1_000.0, {})
+
+
+@pytest.mark.parametrize("sistema", ["Price", "SAC"])
+def test_lancamentos_do_contrato_fecham(sistema):
+    lote = lancamentos_contrato(10_000.0, 7, 23.7, sistema, "2024-01-31")
+    assert len(lote) == 8
+    diario = Diario()
+    diario.lancar_lote(lote)
+    saldos = diario.saldos()
+    # Centavos arredondados pelo acumulado: o empréstimo zera exatamente
+    assert saldos[CONTA_EMPRESTIMO] == pytest.approx(0.0, abs=1e-9)
+    juros = round(cronograma(10_000.0, 7, 23.7, sistema)["Juros"].round(2).sum(), 2)
+    assert saldos[CONTA_JUROS] == pytest.approx(juros)
+    assert saldos[CONTA_BANCO] == pytest.approx(-juros)
+
+
+def test_contratar_so_as_parcelas_vencidas():
+    diario = Diario()
+    parcelas = contratar(diario, 6_000.0, 12, 15.0, "SAC", "2024-01-10", ate="2024-04-10")
+    assert parcelas == 3
+    assert len(diario) == 4
+    assert diario.saldos()[CONTA_EMPRESTIMO] == pytest.approx(-4_500.0)
@@ -0,0 +1,125 @@
+import json
+import pandas as pd
+import pytest
+from helpmei.armazenamento import BancoLivros
+from helpmei.focus import (
+    CAMINHO_FIXTURE,
+    INTERVALO_ATUALIZACAO,
+    JANELA_INICIAL,
+    atualizar_focus,
+    expectativas,
+    filtro_odata,
+    obter_fixture,
+    paginas,
+    ultima_atualizacao,
+    ultimas_medianas,
+)
+
+AGORA = pd.Timestamp("2026-10-18 09:00")
+ANOS = [str(ano) for ano in range(2026, 2030)]
+
+
+def gravados():
+    with open(CAMINHO_FIXTURE, encoding="utf-8") as arquivo:
+        return json.load(arquivo)["value"]
+
+
+def contando(obter):
+    # Guarda os parâmetros de cada pedido feito à API
+    pedidos = []
+
+    def contar(url, params, timeout=None):
+        pedidos.append(params)
+        return obter(url, params, timeout=timeout)
+
+    return contar, pedidos
+
+
+def esperados(desde, ate=None):
+    return {
+        (registro["Indicador"], registro["Data"], int(registro["DataReferencia"]))
+        for registro in gravados()
+        if registro["DataReferencia"] in ANOS and registro["Data"] > f"{desde:%Y-%m-%d}"
+        and (ate is None or registro["Data"] <= ate)
+    }
+
+
+def guardados(banco):
+    return set(banco.conexao().execute("SELECT indicador, data, ano_referencia FROM expectativas_focus"))
+
+
+@pytest.fixture
+def banco(tmp_path):
+    return BancoLivros(str(tmp_path / "focus.db"))
+
+
+@pytest.mark.parametrize("tamanho", [7, 50, 636])
+def test_paginas_percorrem_toda_a_consulta(tamanho):
+    obter, pedidos = contando(obter_fixture())
+    filtro = filtro_odata(["Selic", "IPCA"], ["2025", "2026"])
+    registros = [registro for pagina in paginas(filtro, obter=obter, tamanho=tamanho) for registro in pagina]
+    total = sum(registro["DataReferencia"] in ("2025", "2026") for registro in gravados())
+    assert len(registros) == total
+    assert [registro["Data"] for registro in registros] == sorted(registro["Data"] for registro in registros)
+    # Uma página incompleta encerra; múltiplo exato do tamanho pede uma página vazia a mais
+    assert len(pedidos) == total // tamanho + 1
+    assert [pedido["$skip"] for pedido in pedidos] == [tamanho * numero for numero in range(len(pedidos))]
+
+
+def test_primeira_carga_so_com_a_janela_inicial(banco):
+    obter, pedidos = contando(obter_fixture())
+    inseridas = atualizar_focus(banco, obter=obter, agora=AGORA)
+    assert len(pedidos) == 1
+    assert f"Data gt '{AGORA.normalize() - JANELA_INICIAL:%Y-%m-%d}'" in pedidos[0]["$filter"]
+    assert guardados(banco) == esperados(AGORA.normalize() - JANELA_INICIAL)
+    assert inseridas == len(guardados(banco))
+    assert ultima_atualizacao(banco) == AGORA
+
+
+def test_nova_consulta_so_depois_do_intervalo(banco):
+    obter, pedidos = contando(obter_fixture())
+    atualizar_focus(banco, obter=obter, agora=AGORA)
+    assert atualizar_focus(banco, obter=obter, agora=AGORA + INTERVALO_ATUALIZACAO - pd.Timedelta(minutes=1)) == 0
+    assert len(pedidos) == 1
+    atualizar_focus(banco, obter=obter, agora=AGORA + pd.Timedelta(minutes=1), forcar=True)
+    assert len(pedidos) == 2
+    # O intervalo conta a partir da última consulta, forçada ou não
+    atualizar_focus(banco, obter=obter, agora=AGORA + INTERVALO_ATUALIZACAO)
+    assert len(pedidos) == 2
+    atualizar_focus(banco, obter=obter, agora=AGORA + pd.Timedelta(minutes=1) + INTERVALO_ATUALIZACAO)
+    assert len(pedidos) == 3
+
+
+def test_atualizacao_incremental_sem_duplicar(banco, tmp_path):
+    # Primeira carga com a gravação cortada em junho; a segunda vê a gravação inteira
+    corte = "2026-06-30"
+    parcial = tmp_path / "focus_parcial.json"
+    parcial.write_text(json.dumps({"value": [registro for registro in gravados() if registro["Data"] <= corte]}))
+    inicio = pd.Timestamp("2026-07-01 09:00")
+    atualizar_focus(banco, obter=obter_fixture(str(parcial)), agora=inicio)
+    antes = guardados(banco)
+    assert antes == esperados(inicio.normalize() - JANELA_INICIAL, ate=corte)
+
+    obter, pedidos = contando(obter_fixture())
+    inseridas = atualizar_focus(banco, obter=obter, agora=AGORA)
+    ultima = max(data for _, data, _ in antes)
+    assert f"Data gt '{ultima}'" in pedidos[0]["$filter"]
+    assert inseridas == len(esperados(pd.Timestamp(ultima)))
+    depois = guardados(banco)
+    assert depois == antes | esperados(pd.Timestamp(ultima))
+    total = banco.conexao().execute("SELECT COUNT(*) FROM expectativas_focus").fetchone()[0]
+    assert total == len(depois)
+
+
+def test_expectativas_com_nomes_do_painel(banco):
+    atualizar_focus(banco, obter=obter_fixture(), agora=AGORA)
+    df = expectativas(banco, anos=[2027])
+    assert set(df["indicador"]) == {"SELIC", "IPCA"}
+    assert set(df["ano_referencia"]) == {2027}
+    medianas = ultimas_medianas(expectativas(banco))
+    assert list(medianas.index) == [2026, 2027, 2028, 2029]
+    ultima = max(
+        (registro for registro in gravados() if registro["Indicador"] == "Selic" and registro["DataReferencia"] == "2027"),
+        key=lambda registro: registro["Data"],
+    )
+    assert medianas.loc[2027, "SELIC"] == ultima["Mediana"]
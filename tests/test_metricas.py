@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+from helpmei import metricas
+from helpmei.metricas import LIMITE_TRECHOS, Registro, faixa_quantidade, medir
+
+
+def test_faixas_de_quantidade():
+    assert [faixa_quantidade(n) for n in (1, 5, 6, 20, 21, 5_000)] == ["1-5", "1-5", "6-20", "6-20", "21+", "21+"]
+
+
+def test_rotulo_em_faixas_limita_as_series():
+    registro = Registro()
+    for quantidade in range(1, 200):
+        registro.observar("consolidacao", {"livros": faixa_quantidade(quantidade)}, 0.01)
+    assert len(registro.series()) == 3
+
+
+def test_trechos_de_fragmentos_ficam_limitados(monkeypatch):
+    # Reexecuções de fragmento não chamam iniciar_execucao: a lista não cresce sem fim
+    estado = SimpleNamespace()
+    estado.setdefault = lambda chave, padrao: vars(estado).setdefault(chave, padrao)
+    monkeypatch.setattr(metricas, "st", SimpleNamespace(session_state=estado))
+    monkeypatch.setattr(metricas, "get_script_run_ctx", lambda suppress_warning: object())
+    monkeypatch.setattr(metricas, "REGISTRO", Registro())
+    for _ in range(3 * LIMITE_TRECHOS):
+        with medir("fragmento"):
+            pass
+    assert len(estado._trechos) == LIMITE_TRECHOS
@@ -0,0 +1,72 @@
+import fcntl
+import time
+import pandas as pd
+import pytest
+import requests
+from helpmei.indicadores import TIMEOUT_SGS, baixar_serie_bacen
+from helpmei.publicacao import IndicadoresMapeados, mapear, publicar
+
+
+class RespostaErro:
+    status_code = 503
+    content = b"<html>Servi\xc3\xa7o indispon\xc3\xadvel</html>"
+
+    def raise_for_status(self):
+        raise requests.HTTPError(f"{self.status_code} Server Error")
+
+
+def indicadores(valor):
+    return pd.DataFrame({"Date": pd.date_range("2024-01-01", periods=2, freq="MS"), "SELIC": [valor, valor]})
+
+
+def test_download_com_timeout_e_erro_http():
+    pedidos = []
+
+    def obter(url, timeout=None):
+        pedidos.append(timeout)
+        return RespostaErro()
+
+    # A página de erro não chega ao leitor do SGS
+    with pytest.raises(requests.HTTPError):
+        baixar_serie_bacen(4189, "SELIC", obter)
+    assert pedidos == [TIMEOUT_SGS]
+
+
+@pytest.fixture
+def publicados(tmp_path):
+    caminho = str(tmp_path / "indicadores.arrow")
+    publicar(indicadores(10.0), caminho)
+    return caminho
+
+
+def test_atualizar_agora_nao_espera_a_trava(publicados):
+    visao = IndicadoresMapeados(publicados, carregar=lambda: indicadores(11.0))
+    with open(publicados + ".trava", "a") as trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+        inicio = time.perf_counter()
+        assert visao.atualizar_agora() is False
+        df, _ = visao.obter()
+        assert time.perf_counter() - inicio < 1
+    assert df["SELIC"].tolist() == [10.0, 10.0]
+    assert visao.atualizar_agora() is True
+    assert visao.obter()[0]["SELIC"].tolist() == [11.0, 11.0]
+
+
+def test_falha_no_bacen_segue_com_a_publicacao(publicados):
+    def carregar():
+        raise requests.ConnectionError("sem rede")
+
+    visao = IndicadoresMapeados(publicados, carregar=carregar)
+    assert visao.atualizar_agora() is False
+    assert visao.obter(forcar=True)[0]["SELIC"].tolist() == [10.0, 10.0]
+
+
+def test_nan_volta_sem_copia(tmp_path):
+    caminho = str(tmp_path / "indicadores.arrow")
+    df = indicadores(10.5)
+    df.loc[1, "SELIC"] = float("nan")
+    publicar(df, caminho)
+    mapeado, _ = mapear(caminho)
+    pd.testing.assert_frame_equal(mapeado, df)
+    # Somente leitura: a coluna aponta para o mapeamento, não para uma cópia
+    assert not mapeado["SELIC"].to_numpy().flags.writeable
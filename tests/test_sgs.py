@@ -0,0 +1,46 @@
+import json
+import numpy as np
+import pytest
+from helpmei.indicadores import SERIES_BACEN, caminho_fixture_sgs
+from helpmei.sgs import ler_generico, ler_sgs
+
+
+def conteudo(*valores, compacto=True):
+    registros = [{"data": f"01/{mes:02d}/2020", "valor": valor} for mes, valor in enumerate(valores, start=1)]
+    return json.dumps(registros, separators=(",", ":") if compacto else None).encode()
+
+
+def comparar(bruto):
+    datas, valores = ler_sgs(bruto)
+    datas_esperadas, valores_esperados = ler_generico(bruto)
+    np.testing.assert_array_equal(datas, datas_esperadas)
+    np.testing.assert_array_equal(valores, valores_esperados)
+
+
+@pytest.mark.parametrize("valores", [
+    ("12.34", ""),
+    ("12.34", "1"),
+    ("1", "123456.789"),
+    ("", ""),
+    ("-0.5", "7"),
+    ("12.34", "12345678901234.5"),
+])
+def test_ultimo_valor_curto_vazio_ou_longo(valores):
+    comparar(conteudo(*valores))
+    comparar(conteudo(*valores, compacto=False))
+
+
+def test_valor_invalido_cai_no_generico():
+    comparar(conteudo("1.2.3", "4"))
+    comparar(conteudo("abc", "4"))
+
+
+def test_resposta_vazia():
+    datas, valores = ler_sgs(b"[]")
+    assert datas.size == 0 and valores.size == 0
+
+
+@pytest.mark.parametrize("codigo", SERIES_BACEN.values())
+def test_fixtures_gravadas(codigo):
+    with open(caminho_fixture_sgs(codigo), "rb") as arquivo:
+        comparar(arquivo.read())
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from helpmei.diario import Diario
+from helpmei.simples import (
+    CONTA_DAS,
+    CONTA_PROVISAO,
+    COLUNAS,
+    INSS_MEI,
+    SALARIO_MINIMO,
+    calcular_das,
+    provisionar,
+    provisoes,
+)
+
+SERVICO = "3.1.1.01.01"
+COMERCIO = "3.1.1.01.02"
+
+
+def receitas(meses, inicio="2024-01-01", **por_conta):
+    # Uma coluna por conta de receita, um livro só
+    datas = pd.date_range(inicio, periods=meses, freq="MS")
+    indice = pd.MultiIndex.from_arrays([["livro"] * meses, datas], names=["Livro", "Mês"])
+    return pd.DataFrame({conta: valores for conta, valores in por_conta.items()}, index=indice, dtype="float64")
+
+
+def test_rbt12_no_comeco_da_atividade():
+    apuracao = calcular_das(receitas(4, **{SERVICO: [10_000.0, 20_000.0, 0.0, 30_000.0]}))
+    # Primeiro mês: a própria receita × 12; depois, a média dos meses anteriores × 12
+    np.testing.assert_allclose(apuracao["RBT12"], [120_000.0, 120_000.0, 180_000.0, 120_000.0])
+
+
+def test_rbt12_usa_so_os_12_meses_anteriores():
+    apuracao = calcular_das(receitas(14, **{SERVICO: [1_000.0] * 12 + [50_000.0, 1_000.0]}))
+    assert apuracao["RBT12"].iloc[12] == pytest.approx(12_000.0)
+    assert apuracao["RBT12"].iloc[13] == pytest.approx(11 * 1_000.0 + 50_000.0)
+
+
+@pytest.mark.parametrize("conta, anexo_aliquota, anexo_deducao", [
+    (SERVICO, 0.112, 9_360.0),   # Anexo III, 2ª faixa
+    (COMERCIO, 0.073, 5_940.0),  # Anexo I, 2ª faixa
+])
+def test_aliquota_efetiva_pela_faixa_do_anexo(conta, anexo_aliquota, anexo_deducao):
+    apuracao = calcular_das(receitas(13, **{conta: [30_000.0] * 13}))
+    ultimo = apuracao.iloc[-1]
+    assert ultimo["RBT12"] == 360_000.0
+    # O limite da faixa ainda pertence a ela
+    assert ultimo["Faixa"] == 2
+    efetiva = (360_000.0 * anexo_aliquota - anexo_deducao) / 360_000.0
+    assert ultimo["Alíquota efetiva"] == pytest.approx(efetiva, abs=1e-4)
+    assert ultimo["DAS"] == pytest.approx(round(30_000.0 * efetiva, 2))
+
+
+def test_faixa_acima_do_teto_do_simples():
+    apuracao = calcular_das(receitas(1, **{SERVICO: [500_000.0]}))
+    assert apuracao["Faixa"].iloc[0] == 7
+    assert apuracao["DAS"].iloc[0] > 0
+
+
+def test_simei_valor_fixo_por_atividade():
+    tabela = calcular_das(receitas(3, **{SERVICO: [5_000.0, 0.0, 2_000.0], COMERCIO: [0.0, 3_000.0, 0.0]}), "MEI")
+    inss = round(INSS_MEI * SALARIO_MINIMO[2024], 2)
+    # Serviço paga ISS; a partir do mês com venda de mercadorias, também o ICMS
+    np.testing.assert_allclose(tabela["DAS"], [inss + 5.0, inss + 6.0, inss + 6.0])
+
+
+def test_simei_depois_do_ultimo_salario_minimo():
+    ultimo_ano = max(SALARIO_MINIMO)
+    tabela = calcular_das(receitas(1, inicio=f"{ultimo_ano + 3}-06-01", **{SERVICO: [1_000.0]}), "MEI")
+    assert tabela["DAS"].iloc[0] == pytest.approx(INSS_MEI * SALARIO_MINIMO[ultimo_ano] + 5.0)
+
+
+def test_sem_receita():
+    assert list(calcular_das(pd.DataFrame()).columns) == COLUNAS
+
+
+def test_provisao_fora_do_periodo_com_receita_e_estornada():
+    diario = Diario()
+    diario.lancar("2024-01-31", CONTA_DAS, CONTA_PROVISAO, 50.0)
+    diario.lancar("2024-03-10", "1.1.1.01.01", SERVICO, 10_000.0)
+    tabela = provisoes(diario, ate="2024-04-30")
+    assert not tabela.isna().any().any()
+    janeiro = tabela.loc["2024-01-01"]
+    assert (janeiro["Receita"], janeiro["RBT12"], janeiro["DAS"], janeiro["Faixa"]) == (0.0, 0.0, 0.0, 0)
+    assert janeiro["Diferença"] == -50.0
+    assert list(tabela.index) == list(pd.date_range("2024-01-01", "2024-04-01", freq="MS").drop("2024-02-01"))
+
+    # Janeiro estornado e março provisionado; abril, sem receita, não tem DAS
+    assert provisionar(diario, ate="2024-04-30") == 2
+    assert (provisoes(diario, ate="2024-04-30")["Diferença"] == 0).all()
+    assert diario.saldos()[CONTA_PROVISAO] == pytest.approx(-tabela["DAS"].sum())